@@ -0,0 +1,153 @@
+# concurrency_controller.py
+# 変換ジョブの同時実行数を、実測したスループット (出力フレーム/秒) とCPU使用率から調整するヘルパー
+# 少ない同時実行数から始め、1つずつ増やして効果がなくなった (または CPU/IO が飽和した) 所で止めます。
+
+import os
+
+CONCURRENCY_WINDOW_SEC = 8.0 # Throughput is measured over windows of this length (new jobs need time to ramp up)
+CONCURRENCY_MIN_GAIN = 0.05 # Adding a job must raise throughput by at least 5% to be kept
+CPU_SATURATION = 0.92 # Busy fraction above which adding jobs cannot help
+IO_WAIT_SATURATION = 0.15 # iowait fraction (Linux) above which the disks/network share is treated as saturated
+
+CONCURRENCY_REASON_PROBE = "probe"
+CONCURRENCY_REASON_NO_GAIN = "no_gain"
+CONCURRENCY_REASON_CPU_SATURATED = "cpu_saturated"
+CONCURRENCY_REASON_IO_SATURATED = "io_saturated"
+
+
+def read_cpu_times():
+    """
+    起動以降のCPU時間の累計を (busy, iowait, total) で返します。取得できない場合は None。
+    iowait は Linux のみ (他の環境では 0)。
+    """
+    if os.name == 'nt':
+        try:
+            import ctypes # pylint: disable=import-outside-toplevel
+            idle, kernel, user = ctypes.c_ulonglong(), ctypes.c_ulonglong(), ctypes.c_ulonglong()
+            if not ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user)):
+                return None
+            total = kernel.value + user.value # Kernel time includes idle time
+            return total - idle.value, 0, total
+        except (AttributeError, OSError):
+            return None
+    try:
+        with open("/proc/stat", "r", encoding="ascii") as f:
+            fields = [int(value) for value in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    if len(fields) < 5:
+        return None
+    idle, iowait = fields[3], fields[4]
+    total = sum(fields[:8])
+    return total - idle - iowait, iowait, total
+
+
+class HostUtilizationSampler:
+    """
+    前回の sample() からのCPU使用率と iowait の割合を返します。
+    """
+
+    def __init__(self):
+        self.last_times = read_cpu_times()
+
+    def sample(self):
+        """
+        Returns:
+            tuple: (cpu_busy, io_wait) の割合 (0.0-1.0)。取得できない場合は (None, None)。
+        """
+        times = read_cpu_times()
+        previous, self.last_times = self.last_times, times
+        if times is None or previous is None:
+            return None, None
+        total = times[2] - previous[2]
+        if total <= 0:
+            return None, None
+        return (times[0] - previous[0]) / total, (times[1] - previous[1]) / total
+
+
+class AdaptiveConcurrencyController:
+    """
+    同時実行ジョブ数の山登り制御。
+
+    initial_jobs から始め、実行中のジョブ数が目標の数にそろっている間だけ window_sec ごとに出力フレーム/秒を測り、
+        - 直前に増やして min_gain 以上速くならなかった → 1つ戻し、以後その数を上限にする
+        - CPU または IO が飽和している → 増やさない
+        - それ以外 → 1つ増やす (上限 max_jobs まで)
+    のいずれかを行います。減らす場合は新しいジョブの開始を控えるだけで、実行中のジョブは止めません。
+    ジョブ数が目標へ移る途中 (起動待ちや、減らした後に終了待ちのジョブがある間) の計測は比較に使いません。
+    """
+
+    def __init__(self, max_jobs, initial_jobs=None, window_sec=CONCURRENCY_WINDOW_SEC, min_gain=CONCURRENCY_MIN_GAIN):
+        self.max_jobs = max(1, int(max_jobs))
+        if initial_jobs is None:
+            initial_jobs = (self.max_jobs + 1) // 2
+        self.initial_jobs = max(1, min(self.max_jobs, int(initial_jobs)))
+        self.target = self.initial_jobs
+        self.ceiling = self.max_jobs
+        self.window_sec = window_sec
+        self.min_gain = min_gain
+        self.window_start = None
+        self.window_frames = 0
+        self.previous_target = None
+        self.previous_throughput = None
+        self.throughput = None
+        self.hold_reason = None
+
+    def observe(self, now, frames_total, cpu_busy=None, io_wait=None, running_jobs=None):
+        """
+        出力フレーム数の累計を渡します。ウィンドウが終わるたびに同時実行数を見直します。
+
+        Args:
+            running_jobs (int, optional): 現在実行中のジョブ数。目標の数と異なる間は計測せず、そろった時点から新しいウィンドウを始めます。
+                                          None の場合は常に目標の数で実行中とみなします。
+
+        Returns:
+            tuple or None: 同時実行数を変えた場合は (新しい同時実行数, 理由)。飽和で増やさなかった場合は
+                           (現在の同時実行数, 理由)。それ以外は None。
+        """
+        if running_jobs is not None and running_jobs != self.target:
+            # Only windows run entirely at the target count are comparable; start one once the pool has settled.
+            self.window_start = None
+            return None
+        if self.window_start is None:
+            self.window_start, self.window_frames = now, frames_total
+            return None
+        elapsed = now - self.window_start
+        if elapsed < self.window_sec:
+            return None
+        throughput = (frames_total - self.window_frames) / elapsed
+        self.window_start, self.window_frames = now, frames_total
+        if throughput <= 0:
+            return None # Jobs are still starting up (seeking, building tables); nothing to compare yet
+        self.throughput = throughput
+
+        if (self.previous_target is not None and self.previous_target < self.target and
+                throughput < self.previous_throughput * (1.0 + self.min_gain)):
+            # The last added job did not pay off; go back and stop probing above it.
+            self.ceiling = self.previous_target
+            return self._set_target(self.previous_target, throughput, CONCURRENCY_REASON_NO_GAIN)
+        if cpu_busy is not None and cpu_busy >= CPU_SATURATION:
+            return self._hold(throughput, CONCURRENCY_REASON_CPU_SATURATED)
+        if io_wait is not None and io_wait >= IO_WAIT_SATURATION:
+            return self._hold(throughput, CONCURRENCY_REASON_IO_SATURATED)
+        if self.target < self.ceiling:
+            return self._set_target(self.target + 1, throughput, CONCURRENCY_REASON_PROBE)
+        self._remember(throughput)
+        return None
+
+    def _remember(self, throughput):
+        self.previous_target, self.previous_throughput = self.target, throughput
+
+    def _hold(self, throughput, reason):
+        # Report a saturation only when it starts, not on every window.
+        self._remember(throughput)
+        if reason == self.hold_reason:
+            return None
+        self.hold_reason = reason
+        return self.target, reason
+
+    def _set_target(self, target, throughput, reason):
+        self._remember(throughput)
+        self.hold_reason = None
+        self.target = target
+        return target, reason
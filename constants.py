@@ -14,6 +14,19 @@ FFMPEG_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "mediu
 DEFAULT_PRESET = "medium"
 DEFAULT_RESOLUTION_WIDTH = 1920  # 解像度指定が無効な場合のフォールバック値
 HIGH_RESOLUTION_THRESHOLD = 4096 # この解像度を超える入力は高解像度とみなし、CUDA互換性テストの対象とする
+REMAP_CACHE_DIR_NAME = "remap_cache" # NumPy LUT再投影テーブルのキャッシュフォルダ (app_settings.json と同じ場所に作成)
+REMAP_CACHE_MAX_BYTES = 2 * 1024 ** 3 # キャッシュの合計サイズ上限。超えた分は最終使用日時の古いものから削除
+FRAME_SERVER_BUFFER_BYTES = 1024 ** 3 # フレームサーバーの共有メモリリングバッファの上限 (8K RGB で約11フレーム)
+CONVERSION_PLAN_HISTORY_FILE = "conversion_plan_history.jsonl" # 並列化の方針と所要時間の履歴 (実行同士の比較用、app_settings.json と同じ場所)
+
+# --- ログ関連定数 ---
+LOG_FILE_NAME = "insta360convert.log" # アプリログの全文 (app_settings.json と同じ場所)
+FFMPEG_LOG_FILE_NAME = "insta360convert_ffmpeg.log" # FFmpegログの全文
+STRUCTURED_LOG_FILE_NAME = "insta360convert_log.jsonl" # 全ログの JSON Lines 版 (時刻・サブシステム・視点/ステップ付き)
+LOG_FILE_MAX_BYTES = 10 * 1024 ** 2 # これを超えたらローテーション (.1, .2, ... に移動)
+LOG_FILE_BACKUP_COUNT = 3
+DEFAULT_LOG_WIDGET_MAX_LINES = 5000 # ログ欄に残す行数 (app_settings.json の "log_widget_max_lines" で変更可能)
+LOG_WIDGET_TRIM_LINES = 1000 # 上限をこの行数だけ超えたら、まとめて古い行を削除
 
 # --- COLMAP関連定数 ---
 COLMAP_DEFAULT_PRESET_KEY = "balanced"
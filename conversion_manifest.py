@@ -0,0 +1,196 @@
+# conversion_manifest.py
+# 中断した変換を再開するための、視点ごとの書き出し済みフレームの記録 (マニフェスト)
+# 入力ファイル (パス・サイズ・更新日時) と出力に影響する設定のハッシュごとにフォルダを分け、各タスクが自分のファイルを更新します。
+# 再開時は全ファイルを読み、視点ごとに書き出し済みのサンプル区間 (frame_samples / fps のサンプル番号) を合わせます。
+
+import hashlib
+import json
+import os
+import time
+
+RESUME_DIR_NAME = ".insta360convert_resume" # Created in the output folder; removed after a run that finishes without errors
+MANIFEST_FORMAT_VERSION = 1
+MANIFEST_WRITE_INTERVAL_SEC = 5.0 # A crash loses at most this much progress
+MANIFEST_UNCONFIRMED_FRAMES = 1 # The last frame FFmpeg reports may still be unwritten when the run is killed
+_MANIFEST_CONFIG_KEYS = ("output_resolution", "interp", "output_format", "output_mode", "frame_interval",
+                         "png_pred_option", "jpeg_quality", "frame_sampling", "motion_threshold", "motion_max_interval",
+                         "reprojection_backend")
+
+
+def manifest_key(worker_config, sample_count):
+    """
+    入力ファイルの同一性 (パス・サイズ・更新日時) と出力に影響する設定から、マニフェストのキー (SHA-256 の先頭) を返します。
+    並列数やスレッド数、時間分割数のように出力が変わらない設定は含めません。
+    """
+    input_file = worker_config["input_file"]
+    stat = os.stat(input_file)
+    payload = {
+        "version": MANIFEST_FORMAT_VERSION,
+        "input_file": os.path.abspath(input_file),
+        "input_size": stat.st_size,
+        "input_mtime": int(stat.st_mtime),
+        "output_folder": os.path.abspath(worker_config["output_folder"]),
+        "sample_count": int(sample_count),
+        "frame_samples": [[int(frame_number), round(float(timestamp), 6)]
+                          for frame_number, timestamp in worker_config.get("frame_samples") or []],
+    }
+    for key in _MANIFEST_CONFIG_KEYS:
+        value = worker_config.get(key)
+        payload[key] = list(value) if isinstance(value, tuple) else value
+    if worker_config.get("prescale_max_loss") is not None:
+        payload["prescale_max_loss"] = float(worker_config["prescale_max_loss"]) # Absent when off, so older keys stay valid
+    serialized = json.dumps(payload, sort_keys=True)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+
+
+def manifest_dir(output_folder, key):
+    return os.path.join(output_folder, RESUME_DIR_NAME, key)
+
+
+def viewpoint_key(viewpoint_data):
+    # Viewpoints are matched by their angles, not by their index in the list.
+    return (f"p{float(viewpoint_data.get('pitch', 0.0)):.3f}_y{float(viewpoint_data.get('yaw', 0.0)):.3f}"
+            f"_f{float(viewpoint_data.get('fov', 100.0)):.3f}")
+
+
+class TaskManifest:
+    """
+    1タスク (視点グループ × サンプル区間) の進捗ファイル。
+    update() で書き出し済みのサンプル数を受け取り、MANIFEST_WRITE_INTERVAL_SEC に1回まで (完了時は必ず) atomic に書き込みます。
+    書き込みに失敗しても変換は続けます (再開できなくなるだけ)。
+    """
+
+    def __init__(self, directory, run_id, viewpoints_data, start_sample, sample_count):
+        self.viewpoints = [viewpoint_key(viewpoint_data) for viewpoint_data in viewpoints_data]
+        self.start_sample = int(start_sample)
+        self.sample_count = int(sample_count)
+        views_hash = hashlib.sha1(",".join(self.viewpoints).encode("utf-8")).hexdigest()[:10]
+        self.path = os.path.join(directory, f"{run_id}_{self.start_sample:07d}_{views_hash}.json")
+        self.samples_done = 0
+        self.complete = False
+        self.dirty = False
+        self.failed = False
+        self.last_write_time = 0.0
+
+    def update(self, samples_done, complete=False):
+        samples_done = self.sample_count if complete else min(self.sample_count, max(0, int(samples_done)))
+        if samples_done <= self.samples_done and not (complete and not self.complete):
+            return
+        self.samples_done = samples_done
+        self.complete = self.complete or complete
+        self.dirty = True
+        if complete or time.monotonic() - self.last_write_time >= MANIFEST_WRITE_INTERVAL_SEC:
+            self.flush()
+
+    def flush(self):
+        if not self.dirty or self.failed:
+            return
+        payload = {"version": MANIFEST_FORMAT_VERSION, "viewpoints": self.viewpoints,
+                   "start_sample": self.start_sample, "sample_count": self.sample_count,
+                   "samples_done": self.samples_done, "complete": self.complete}
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            self.failed = True
+            return
+        self.dirty = False
+        self.last_write_time = time.monotonic()
+
+
+def open_task_manifest(config, viewpoints_data):
+    """
+    config["resume_manifest"] ({"dir", "run_id", "start_sample", "sample_count"}) があればタスクのマニフェストを返します。
+    再開に対応しない変換では None。
+    """
+    resume = config.get("resume_manifest")
+    if not resume or not viewpoints_data:
+        return None
+    return TaskManifest(resume["dir"], resume["run_id"], viewpoints_data, resume["start_sample"], resume["sample_count"])
+
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def load_done_intervals(directory):
+    """
+    マニフェストのフォルダを読み、視点キーごとの書き出し済みサンプル区間 [(開始, 終了), ...] (終了は含まない) を返します。
+    壊れたファイルは無視します。
+    """
+    done = {}
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return done
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry.get("version") != MANIFEST_FORMAT_VERSION:
+                continue
+            start = int(entry["start_sample"])
+            end = start + min(int(entry["sample_count"]), int(entry["samples_done"]))
+            viewpoints = list(entry["viewpoints"])
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        if end <= start:
+            continue
+        for key in viewpoints:
+            done.setdefault(key, []).append((start, end))
+    return {key: _merge_intervals(intervals) for key, intervals in done.items()}
+
+
+def _missing_intervals(done_intervals, total):
+    missing = []
+    position = 0
+    for start, end in done_intervals:
+        if start > position:
+            missing.append((position, min(start, total)))
+        position = max(position, end)
+        if position >= total:
+            break
+    if position < total:
+        missing.append((position, total))
+    return [(start, end) for start, end in missing if end > start]
+
+
+def plan_resume(directory, viewpoints, total_samples):
+    """
+    前回までの記録から、今回変換する範囲を決めます。
+
+    Args:
+        viewpoints (dict): {視点インデックス: 視点情報} (今回変換する視点)。
+        total_samples (int): 1視点あたりのサンプル数 (出力フレーム数)。
+
+    Returns:
+        dict: {"complete": 書き出し済みの視点インデックスのリスト,
+               "ranges": 残りの視点で変換するサンプル区間 [(開始, 数), ...] (各視点の未変換区間の和集合),
+               "done_samples": {視点インデックス: 今回は変換しないサンプル数}}。
+              記録がない場合は ranges が [(0, total_samples)] になります。
+    """
+    done = load_done_intervals(directory)
+    complete = []
+    missing_union = []
+    for vp_idx, viewpoint_data in viewpoints.items():
+        missing = _missing_intervals(done.get(viewpoint_key(viewpoint_data), []), total_samples)
+        if missing:
+            missing_union.extend(missing)
+        else:
+            complete.append(vp_idx)
+    ranges = [(start, end - start) for start, end in _merge_intervals(missing_union)]
+    remaining_samples = sum(count for _start, count in ranges)
+    done_samples = {vp_idx: total_samples if vp_idx in complete else total_samples - remaining_samples
+                    for vp_idx in viewpoints}
+    return {"complete": complete, "ranges": ranges, "done_samples": done_samples}
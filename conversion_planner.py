@@ -0,0 +1,238 @@
+# conversion_planner.py
+# 変換タスクの分割 (視点のデコードグループ化など) を行うヘルパー
+
+import json
+import math
+import os
+import time
+
+DECODE_MODE_PER_VIEWPOINT = "per_viewpoint"
+DECODE_MODE_PER_PITCH = "per_pitch"
+DECODE_MODE_GROUP_SIZE = "group_size"
+DECODE_MODE_SINGLE = "single_decode"
+DECODE_MODES = (
+    DECODE_MODE_PER_VIEWPOINT,
+    DECODE_MODE_PER_PITCH,
+    DECODE_MODE_GROUP_SIZE,
+    DECODE_MODE_SINGLE,
+)
+DEFAULT_DECODE_MODE = DECODE_MODE_PER_PITCH
+DEFAULT_VIEWS_PER_DECODE = 4
+
+PLAN_STRATEGY_PER_VIEWPOINT = "per_viewpoint"
+PLAN_STRATEGY_GROUPED = "grouped"
+PLAN_STRATEGY_TIME_SLICED = "time_sliced"
+# Decoding cost relative to H.264 at the same resolution (software decode)
+CODEC_DECODE_COST = {"h264": 1.0, "hevc": 1.6, "av1": 2.0, "vp9": 1.5, "prores": 0.8}
+DEFAULT_CODEC_DECODE_COST = 1.2
+# Decode is shared (split filter) once one decode costs more than this many reprojected output views.
+SHARED_DECODE_COST_RATIO = 1.0
+PLAN_FRAMES_IN_FLIGHT = 8 # Decoded frames buffered per FFmpeg process (decoder, filter and muxer queues)
+PLAN_MEMORY_RESERVE_FRACTION = 0.25 # Share of free RAM left for the OS and the GUI
+PLAN_MIN_SAMPLES_PER_SEGMENT = 8 # Fewer samples than this per segment makes the per-task seek/startup dominate
+
+
+def _pitch_key(viewpoint):
+    return round(float(viewpoint.get("pitch", 0.0)), 3)
+
+
+def _ordered_indices(viewpoints):
+    # Pitch-major, yaw-minor order keeps neighbouring views of the same ring together.
+    return sorted(range(len(viewpoints)),
+                  key=lambda i: (_pitch_key(viewpoints[i]), float(viewpoints[i].get("yaw", 0.0))))
+
+
+def group_viewpoints_by_pitch(viewpoints):
+    groups = {}
+    for index in _ordered_indices(viewpoints):
+        groups.setdefault(_pitch_key(viewpoints[index]), []).append(index)
+    return [groups[key] for key in sorted(groups)]
+
+
+def group_viewpoints_by_size(viewpoints, group_size):
+    size = max(1, int(group_size))
+    ordered = _ordered_indices(viewpoints)
+    return [ordered[start:start + size] for start in range(0, len(ordered), size)]
+
+
+def build_decode_groups(viewpoints, decode_mode=DEFAULT_DECODE_MODE, group_size=None):
+    if not viewpoints:
+        return []
+    if decode_mode == DECODE_MODE_SINGLE:
+        return [_ordered_indices(viewpoints)]
+    if decode_mode == DECODE_MODE_PER_PITCH:
+        return group_viewpoints_by_pitch(viewpoints)
+    if decode_mode == DECODE_MODE_GROUP_SIZE:
+        return group_viewpoints_by_size(viewpoints, group_size or DEFAULT_VIEWS_PER_DECODE)
+    return [[index] for index in range(len(viewpoints))]
+
+
+def limit_decode_group_count(groups, max_groups):
+    # Merge neighbouring groups (keeping pitch/yaw order) so that at most max_groups remain.
+    max_groups = max(1, int(max_groups))
+    if len(groups) <= max_groups:
+        return [list(group) for group in groups]
+    ordered = [index for group in groups for index in group]
+    base_size, remainder = divmod(len(ordered), max_groups)
+    merged = []
+    start = 0
+    for group_idx in range(max_groups):
+        size = base_size + (1 if group_idx < remainder else 0)
+        merged.append(ordered[start:start + size])
+        start += size
+    return merged
+
+
+def split_time_segments(sample_count, segment_count):
+    """
+    出力フレーム (サンプル) 0..sample_count-1 を、連続した最大 segment_count 個の区間に分けます。
+
+    Returns:
+        list: (先頭サンプル番号, サンプル数) のタプルのリスト。空の区間は含みません。
+    """
+    sample_count = max(0, int(sample_count))
+    segment_count = max(1, min(int(segment_count), sample_count))
+    base_size, remainder = divmod(sample_count, segment_count)
+    segments = []
+    start = 0
+    for segment_idx in range(segment_count):
+        size = base_size + (1 if segment_idx < remainder else 0)
+        if size > 0:
+            segments.append((start, size))
+        start += size
+    return segments
+
+
+def get_available_memory_bytes():
+    """
+    空きメモリ (バイト) を返します。取得できない場合は None。
+    """
+    if os.name == 'nt':
+        try:
+            import ctypes # pylint: disable=import-outside-toplevel
+
+            class _MemoryStatusEx(ctypes.Structure):
+                _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                            ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                            ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                            ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                            ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+            status = _MemoryStatusEx()
+            status.dwLength = ctypes.sizeof(_MemoryStatusEx)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return int(status.ullAvailPhys)
+        except (AttributeError, OSError):
+            return None
+        return None
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE"))
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _estimate_process_memory(input_size, output_size, views_per_process):
+    input_width, input_height = input_size
+    output_width, output_height = output_size
+    decoded_frame_bytes = input_width * input_height * 3 // 2 # yuv420p
+    view_frame_bytes = output_width * output_height * 3
+    return PLAN_FRAMES_IN_FLIGHT * (decoded_frame_bytes + views_per_process * view_frame_bytes)
+
+
+def plan_parallel_conversion(cpu_count, available_memory, input_size, input_codec, duration, frame_interval,
+                             viewpoints, output_size, output_format, can_time_slice):
+    """
+    CPUコア数・空きメモリ・入力 (解像度/コーデック/長さ)・視点数・出力形式から並列化の方針を決めます。
+
+    方針は次の3つのいずれかです。
+        per_viewpoint: 視点ごとに1プロセス (デコードが軽く、視点数がコア数に近い場合)
+        grouped: ピッチごと (または全視点で1回) にデコードを共有 (デコードが重い場合)
+        time_sliced: 上記に加えて時間方向に分割 (ジョブ数がコア数より少ない場合)
+
+    Args:
+        available_memory (int or None): 空きメモリ (バイト)。None ならメモリによる制限をしません。
+        can_time_slice (bool): 現在の出力設定で時間分割が使えるか (PNG/JPEG + v360)。
+
+    Returns:
+        dict: strategy, decode_mode, parallel, time_segments, threads_per_job と、
+              判断理由 reasons ((文字列キー, 引数dict) のリスト) を含む辞書。
+    """
+    cpu_count = max(1, int(cpu_count or 1))
+    view_count = len(viewpoints)
+    input_width, input_height = int(input_size[0] or 0), int(input_size[1] or 0)
+    output_width, output_height = int(output_size[0] or 0), int(output_size[1] or 0)
+    reasons = []
+
+    codec_cost = CODEC_DECODE_COST.get((input_codec or "").lower(), DEFAULT_CODEC_DECODE_COST)
+    decode_cost = input_width * input_height * codec_cost
+    view_cost = max(1, output_width * output_height)
+    pitch_groups = group_viewpoints_by_pitch(viewpoints)
+    share_decode = view_count > 1 and decode_cost > SHARED_DECODE_COST_RATIO * view_cost
+    if share_decode and len(pitch_groups) > 1:
+        decode_mode = DECODE_MODE_PER_PITCH
+        job_count = len(pitch_groups)
+    elif share_decode:
+        decode_mode = DECODE_MODE_SINGLE
+        job_count = 1
+    else:
+        decode_mode = DECODE_MODE_PER_VIEWPOINT
+        job_count = view_count
+    reasons.append(("plan_reason_decode_format",
+                    {"ratio": decode_cost / view_cost, "codec": input_codec or "?", "mode": decode_mode,
+                     "jobs": job_count}))
+
+    views_per_job = max(1, -(-view_count // max(1, job_count)))
+    process_memory = _estimate_process_memory((input_width, input_height), (output_width, output_height), views_per_job)
+    max_parallel = cpu_count
+    if available_memory:
+        memory_limit = max(1, int(available_memory * (1.0 - PLAN_MEMORY_RESERVE_FRACTION) // max(1, process_memory)))
+        if memory_limit < max_parallel:
+            reasons.append(("plan_reason_memory_limit_format",
+                            {"limit": memory_limit, "free_gb": available_memory / (1024 ** 3),
+                             "process_mb": process_memory / (1024 ** 2)}))
+        max_parallel = min(max_parallel, memory_limit)
+
+    time_segments = 1
+    sample_count = int(duration / frame_interval) if duration > 0 and frame_interval > 1e-6 else 0
+    if job_count < max_parallel:
+        if not can_time_slice:
+            reasons.append(("plan_reason_time_slice_unavailable", {}))
+        elif sample_count < 2 * PLAN_MIN_SAMPLES_PER_SEGMENT:
+            reasons.append(("plan_reason_time_slice_too_short_format", {"samples": sample_count}))
+        else:
+            time_segments = min(math.ceil(max_parallel / job_count), sample_count // PLAN_MIN_SAMPLES_PER_SEGMENT)
+            reasons.append(("plan_reason_time_slice_format", {"jobs": job_count, "cores": max_parallel,
+                                                              "segments": time_segments}))
+    parallel = max(1, min(max_parallel, job_count * time_segments))
+    threads_per_job = max(1, cpu_count // parallel)
+    if time_segments > 1:
+        strategy = PLAN_STRATEGY_TIME_SLICED
+    elif decode_mode == DECODE_MODE_PER_VIEWPOINT:
+        strategy = PLAN_STRATEGY_PER_VIEWPOINT
+    else:
+        strategy = PLAN_STRATEGY_GROUPED
+    return {
+        "strategy": strategy,
+        "decode_mode": decode_mode,
+        "parallel": parallel,
+        "time_segments": time_segments,
+        "threads_per_job": threads_per_job,
+        "inputs": {
+            "cpu_count": cpu_count, "available_memory": available_memory,
+            "input_size": [input_width, input_height], "input_codec": input_codec, "duration": duration,
+            "frame_interval": frame_interval, "viewpoints": view_count, "pitch_groups": len(pitch_groups),
+            "output_size": [output_width, output_height], "output_format": output_format,
+            "can_time_slice": bool(can_time_slice),
+        },
+        "reasons": reasons,
+    }
+
+
+def append_plan_record(history_path, record):
+    """
+    変換1回分の方針と結果を JSON Lines で追記します (後で実行同士を比較するため)。
+    """
+    record = dict(record, recorded_at=time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()))
+    os.makedirs(os.path.dirname(history_path) or ".", exist_ok=True)
+    with open(history_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,309 @@
+# equirect_remap.py
+# NumPyによるエクイレクタングラー→ピンホール再投影 (リマップLUT) ヘルパー
+# NumPy は任意の依存関係です。未インストールの場合は is_numpy_available() が False を返します。
+
+import hashlib
+import json
+import math
+import os
+import time
+
+from colmap_rig_export import cam_from_rig_rotation_quaternion, compute_pinhole_camera_params
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; the v360 backend does not need it
+    np = None
+
+REPROJECTION_BACKEND_V360 = "v360"
+REPROJECTION_BACKEND_NUMPY_REMAP = "numpy_remap"
+DEFAULT_REPROJECTION_BACKEND = REPROJECTION_BACKEND_V360
+
+REMAP_INTERP_NEAREST = "nearest"
+REMAP_INTERP_LINEAR = "linear"
+REMAP_WEIGHT_SCALE = 256 # Bilinear weights are stored as 8-bit fixed point
+REMAP_BUILD_ROWS_PER_CHUNK = 256 # Rows evaluated per step while building a table (bounds temporary memory)
+REMAP_TABLE_FORMAT_VERSION = 1 # Bump when the table layout or the projection math changes (invalidates the cache)
+REMAP_CACHE_INDICES_SUFFIX = ".indices.npy"
+REMAP_CACHE_WEIGHTS_SUFFIX = ".weights.npy"
+
+
+def is_numpy_available():
+    return np is not None
+
+
+def remap_interp_for(interp):
+    # v360 offers cubic/lanczos as well; the LUT backend approximates them with bilinear sampling.
+    return REMAP_INTERP_NEAREST if interp == "nearest" else REMAP_INTERP_LINEAR
+
+
+def rig_from_cam_rotation_matrix(yaw_deg, pitch_deg, roll_deg=0.0):
+    # Same convention as the rig_config.json export: q_rig_from_cam = q_yaw * q_pitch * q_roll,
+    # with camera axes x=right, y=down, z=forward (this is also ffmpeg v360's "ypr" order).
+    w, x, y, z = cam_from_rig_rotation_quaternion(yaw_deg, pitch_deg, roll_deg)
+    x, y, z = -x, -y, -z # conjugate -> rig_from_cam
+    return [
+        [1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y - w * z), 2.0 * (x * z + w * y)],
+        [2.0 * (x * y + w * z), 1.0 - 2.0 * (x * x + z * z), 2.0 * (y * z - w * x)],
+        [2.0 * (x * z - w * y), 2.0 * (y * z + w * x), 1.0 - 2.0 * (x * x + y * y)],
+    ]
+
+
+def padded_frame_shape(input_size):
+    input_width, input_height = input_size
+    return (input_height + 1, input_width + 1, 3)
+
+
+def pad_equirect_frame(frame, out=None):
+    """
+    RGB24 のエクイレクタングラーフレームに、右端へ1列 (左端の複製: 経度方向の折り返し) と
+    下端へ1行 (最下行の複製) を追加します。バイリニア補間で隣接画素の境界判定を不要にするためです。
+    """
+    height, width = frame.shape[:2]
+    if out is None:
+        out = np.empty((height + 1, width + 1, 3), dtype=np.uint8)
+    out[:height, :width] = frame
+    out[:height, width] = frame[:, 0]
+    out[height] = out[height - 1]
+    return out
+
+
+class RemapTable:
+    """
+    1視点分の equirect→pinhole リマップテーブル。
+
+    indices はパディング済み入力フレーム (pad_equirect_frame) 上の画素の一次元インデックス、
+    weights はバイリニア補間用の (fx, fy) 8bit 固定小数点値です (nearest の場合は None)。
+    """
+
+    def __init__(self, indices, weights, output_size, input_size):
+        self.indices = indices
+        self.weights = weights
+        self.output_size = tuple(output_size)
+        self.input_size = tuple(input_size)
+
+    @property
+    def interp(self):
+        return REMAP_INTERP_NEAREST if self.weights is None else REMAP_INTERP_LINEAR
+
+    @property
+    def nbytes(self):
+        return int(self.indices.nbytes + (self.weights.nbytes if self.weights is not None else 0))
+
+    def apply(self, padded_frame):
+        output_width, output_height = self.output_size
+        flat = padded_frame.reshape(-1, 3)
+        if self.weights is None:
+            return np.take(flat, self.indices, axis=0).reshape(output_height, output_width, 3)
+
+        row_stride = self.input_size[0] + 1
+        idx = self.indices
+        fx = self.weights[0][:, None].astype(np.uint16)
+        fy = self.weights[1][:, None].astype(np.uint32)
+        inv_fx = REMAP_WEIGHT_SCALE - fx
+        top = np.take(flat, idx, axis=0) * inv_fx
+        top += np.take(flat[1:], idx, axis=0) * fx
+        bottom = np.take(flat[row_stride:], idx, axis=0) * inv_fx
+        bottom += np.take(flat[row_stride + 1:], idx, axis=0) * fx
+        blended = top * (REMAP_WEIGHT_SCALE - fy)
+        blended += bottom * fy
+        blended += (REMAP_WEIGHT_SCALE * REMAP_WEIGHT_SCALE) // 2
+        blended >>= 16
+        return blended.astype(np.uint8).reshape(output_height, output_width, 3)
+
+
+def build_remap_table(viewpoint_data, output_size, input_size, interp=REMAP_INTERP_LINEAR):
+    """
+    視点情報 (ffmpeg_worker_process に渡すものと同じ dict) からリマップテーブルを生成します。
+
+    Args:
+        viewpoint_data (dict): 視点情報 (fov, pitch, yaw)。
+        output_size (tuple): 出力解像度 (width, height)。
+        input_size (tuple): 入力エクイレクタングラーの解像度 (width, height)。
+        interp (str): "nearest" または "linear" (remap_interp_for で変換した値)。
+
+    Returns:
+        RemapTable: 生成したテーブル。
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for the remap reprojection backend.")
+    output_width, output_height = int(output_size[0]), int(output_size[1])
+    input_width, input_height = int(input_size[0]), int(input_size[1])
+    if output_width <= 0 or output_height <= 0 or input_width <= 1 or input_height <= 1:
+        raise ValueError(f"Invalid remap sizes: output={output_size}, input={input_size}")
+
+    fov = float(viewpoint_data.get("fov", 100.0))
+    fx, fy, cx, cy = compute_pinhole_camera_params(output_width, output_height, fov)
+    rotation = np.array(rig_from_cam_rotation_matrix(viewpoint_data.get("yaw", 0.0),
+                                                     viewpoint_data.get("pitch", 0.0)), dtype=np.float64)
+    row_stride = input_width + 1
+    use_linear = interp != REMAP_INTERP_NEAREST
+
+    total = output_width * output_height
+    indices = np.empty(total, dtype=np.int32)
+    weights = np.empty((2, total), dtype=np.uint8) if use_linear else None
+
+    # Pixel centres in the COLMAP PINHOLE convention used for rig_config.json.
+    ray_x = ((np.arange(output_width, dtype=np.float64) + 0.5) - cx) / fx
+    for row_start in range(0, output_height, REMAP_BUILD_ROWS_PER_CHUNK):
+        row_end = min(output_height, row_start + REMAP_BUILD_ROWS_PER_CHUNK)
+        ray_y = ((np.arange(row_start, row_end, dtype=np.float64) + 0.5) - cy) / fy
+        grid_x, grid_y = np.meshgrid(ray_x, ray_y)
+        dir_x = rotation[0, 0] * grid_x + rotation[0, 1] * grid_y + rotation[0, 2]
+        dir_y = rotation[1, 0] * grid_x + rotation[1, 1] * grid_y + rotation[1, 2]
+        dir_z = rotation[2, 0] * grid_x + rotation[2, 1] * grid_y + rotation[2, 2]
+        longitude = np.arctan2(dir_x, dir_z)
+        latitude = np.arctan2(dir_y, np.hypot(dir_x, dir_z)) # y points down, so +latitude is below the horizon
+
+        src_x = (longitude / (2.0 * math.pi) + 0.5) * input_width - 0.5
+        src_y = (latitude / math.pi + 0.5) * input_height - 0.5
+
+        chunk = slice(row_start * output_width, row_end * output_width)
+        if use_linear:
+            x0 = np.floor(src_x)
+            y0 = np.floor(src_y)
+            frac_x = src_x - x0
+            frac_y = src_y - y0
+            x0 = np.mod(x0, input_width).astype(np.int64) # Column input_width is the wrapped copy of column 0
+            y0 = y0.astype(np.int64)
+            top_clamped = y0 < 0
+            bottom_clamped = y0 >= input_height - 1
+            frac_y[top_clamped | bottom_clamped] = 0.0
+            y0 = np.clip(y0, 0, input_height - 1)
+            weights[0, chunk] = np.clip(np.rint(frac_x * REMAP_WEIGHT_SCALE), 0, 255).astype(np.uint8).ravel()
+            weights[1, chunk] = np.clip(np.rint(frac_y * REMAP_WEIGHT_SCALE), 0, 255).astype(np.uint8).ravel()
+        else:
+            x0 = np.mod(np.floor(src_x + 0.5), input_width).astype(np.int64)
+            y0 = np.clip(np.floor(src_y + 0.5), 0, input_height - 1).astype(np.int64)
+        indices[chunk] = (y0 * row_stride + x0).astype(np.int32).ravel()
+
+    return RemapTable(indices, weights, (output_width, output_height), (input_width, input_height))
+
+
+def remap_table_cache_key(viewpoint_data, output_size, input_size, interp):
+    """
+    リマップテーブルのキャッシュキー (SHA-256) を返します。
+    テーブルに影響する値 (fov, pitch, yaw, 出力/入力解像度, 補間) のみを使用するため、
+    同じ視点配置であれば別のクリップでも同じキーになります。
+    """
+    payload = {
+        "version": REMAP_TABLE_FORMAT_VERSION,
+        "fov": round(float(viewpoint_data.get("fov", 100.0)), 6),
+        "pitch": round(float(viewpoint_data.get("pitch", 0.0)), 6),
+        "yaw": round(float(viewpoint_data.get("yaw", 0.0)), 6),
+        "output_size": [int(output_size[0]), int(output_size[1])],
+        "input_size": [int(input_size[0]), int(input_size[1])],
+        "interp": interp,
+    }
+    serialized = json.dumps(payload, sort_keys=True)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def _cache_entry_paths(cache_dir, key):
+    base = os.path.join(cache_dir, key)
+    return base + REMAP_CACHE_INDICES_SUFFIX, base + REMAP_CACHE_WEIGHTS_SUFFIX
+
+
+def _save_npy_atomic(path, array):
+    # Several workers may build the same entry at once; the last rename wins and readers never see a partial file.
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(temp_path, path)
+
+
+def _load_cached_remap_table(cache_dir, key, output_size, input_size, interp):
+    indices_path, weights_path = _cache_entry_paths(cache_dir, key)
+    if not os.path.exists(indices_path):
+        return None
+    use_linear = interp != REMAP_INTERP_NEAREST
+    if use_linear and not os.path.exists(weights_path):
+        return None
+    try:
+        # Memory-mapped, so workers using the same layout share the page cache instead of holding private copies.
+        indices = np.load(indices_path, mmap_mode="r")
+        weights = np.load(weights_path, mmap_mode="r") if use_linear else None
+    except (OSError, ValueError):
+        return None
+    total = int(output_size[0]) * int(output_size[1])
+    if indices.shape != (total,) or (weights is not None and weights.shape != (2, total)):
+        return None
+    now = time.time()
+    for path in (indices_path, weights_path) if use_linear else (indices_path,):
+        try:
+            os.utime(path, (now, now)) # Mark as recently used for the LRU pruning
+        except OSError:
+            pass
+    return RemapTable(indices, weights, output_size, input_size)
+
+
+def prune_remap_cache(cache_dir, max_bytes, keep_keys=()):
+    """
+    キャッシュディレクトリの合計サイズが max_bytes 以下になるまで、最終使用日時の古いエントリから削除します。
+
+    Returns:
+        int: 削除したエントリ数。
+    """
+    if not cache_dir or not os.path.isdir(cache_dir):
+        return 0
+    entries = {}
+    for name in os.listdir(cache_dir):
+        for suffix in (REMAP_CACHE_INDICES_SUFFIX, REMAP_CACHE_WEIGHTS_SUFFIX):
+            if name.endswith(suffix):
+                path = os.path.join(cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entry = entries.setdefault(name[:-len(suffix)], {"paths": [], "size": 0, "last_used": 0.0})
+                entry["paths"].append(path)
+                entry["size"] += stat.st_size
+                entry["last_used"] = max(entry["last_used"], stat.st_mtime)
+    total_size = sum(entry["size"] for entry in entries.values())
+    removed = 0
+    for key, entry in sorted(entries.items(), key=lambda item: item[1]["last_used"]):
+        if total_size <= max_bytes:
+            break
+        if key in keep_keys:
+            continue
+        try:
+            for path in entry["paths"]:
+                os.remove(path)
+        except OSError:
+            continue # Still mapped by another process (Windows); try again on a later run
+        total_size -= entry["size"]
+        removed += 1
+    return removed
+
+
+def load_or_build_remap_table(viewpoint_data, output_size, input_size, interp=REMAP_INTERP_LINEAR,
+                              cache_dir=None, max_cache_bytes=None):
+    """
+    ディスクキャッシュにテーブルがあれば memory-map で読み込み、なければ生成してキャッシュへ保存します。
+    cache_dir が None の場合はキャッシュを使用しません。
+
+    Returns:
+        tuple: (RemapTable, キャッシュヒットした場合 True)。
+    """
+    if not cache_dir:
+        return build_remap_table(viewpoint_data, output_size, input_size, interp), False
+    key = remap_table_cache_key(viewpoint_data, output_size, input_size, interp)
+    table = _load_cached_remap_table(cache_dir, key, output_size, input_size, interp)
+    if table is not None:
+        return table, True
+
+    table = build_remap_table(viewpoint_data, output_size, input_size, interp)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        indices_path, weights_path = _cache_entry_paths(cache_dir, key)
+        if table.weights is not None:
+            _save_npy_atomic(weights_path, table.weights)
+        _save_npy_atomic(indices_path, table.indices) # Written last: its presence marks a complete entry
+        if max_cache_bytes is not None:
+            prune_remap_cache(cache_dir, max_cache_bytes, keep_keys=(key,))
+        cached_table = _load_cached_remap_table(cache_dir, key, output_size, input_size, interp)
+        if cached_table is not None:
+            table = cached_table
+    except OSError:
+        pass # The cache is an optimization only; keep the in-memory table
+    return table, False
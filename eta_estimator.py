@@ -0,0 +1,99 @@
+# eta_estimator.py
+# 出力フレーム数にもとづく残り時間の推定
+# 実測の出力フレーム/秒を指数移動平均 (EWMA) で平滑化し、残りのジョブ数に応じた並列度で残りフレームを割ります。
+# フレームの進みを測れない間は、完了した視点の平均所要時間による推定 (task_average_remaining_seconds) を使います。
+
+import math
+
+ETA_RATE_SMOOTHING_SEC = 10.0 # Time constant of the throughput EWMA
+ETA_SMOOTHING_SEC = 5.0 # Time constant of the EWMA applied to the estimate itself
+ETA_MIN_UPDATE_SEC = 0.5
+
+
+def _ewma_weight(elapsed, time_constant):
+    # Weight of a new sample taken elapsed seconds after the previous one (independent of the update rate).
+    return 1.0 - math.exp(-max(0.0, elapsed) / time_constant)
+
+
+def task_average_remaining_seconds(average_task_seconds, remaining_tasks, concurrency):
+    """
+    完了した視点の平均所要時間から残り時間を推定します。出力フレーム数が事前に分からない場合や、
+    FrameEtaEstimator がまだフレームの進みを測れていない間の代わりに使います。
+
+    Args:
+        average_task_seconds (float): 視点1つあたりの平均所要時間 (秒)。
+        remaining_tasks (int): 未完了の視点の数。
+        concurrency (int): 同時実行数 (現在の値)。
+
+    Returns:
+        float or None: 残り秒数。平均所要時間がまだない場合は None。
+    """
+    if average_task_seconds <= 0:
+        return None
+    if remaining_tasks <= 0:
+        return 0.0
+    return remaining_tasks * average_task_seconds / min(max(1, concurrency), remaining_tasks)
+
+
+class FrameEtaEstimator:
+    """
+    残り時間 = 残りフレーム数 / (1ジョブあたりのフレーム/秒 × 今後の同時実行ジョブ数)。
+
+    1ジョブあたりのフレーム/秒は、全体の出力フレーム/秒 (EWMA) を実行中のジョブ数で割った値です。
+    今後の同時実行ジョブ数は min(同時実行数, 未完了のジョブ数) なので、終盤にジョブが減る分も見込みます。
+    推定値もさらに EWMA で平滑化し (経過時間分は差し引いてから混ぜる)、急に跳ねないようにします。
+    """
+
+    def __init__(self, total_frames):
+        self.total_frames = max(0, int(total_frames))
+        self.last_time = None
+        self.last_frames = 0
+        self.frame_rate = None
+        self.estimate = None
+        self.estimate_time = None
+
+    def update(self, now, frames_done, running_jobs, concurrency, unfinished_jobs):
+        """
+        Args:
+            frames_done (int): 書き出し済みの出力フレーム数 (全視点の合計)。
+            running_jobs (int): 実行中のジョブ数。
+            concurrency (int): 同時実行数の上限 (現在の値)。
+            unfinished_jobs (int): 未完了のジョブ数 (実行中 + 未開始)。
+
+        Returns:
+            float or None: 残り秒数。フレームの進みをまだ測れていない場合は None。
+        """
+        if self.last_time is None:
+            self.last_time, self.last_frames = now, frames_done
+            return None
+        elapsed = now - self.last_time
+        if elapsed < ETA_MIN_UPDATE_SEC:
+            return self.current(now)
+        sample_rate = (frames_done - self.last_frames) / elapsed
+        self.last_time, self.last_frames = now, frames_done
+        if self.frame_rate is None:
+            if sample_rate <= 0:
+                return None # Nothing written yet (seeking, startup)
+            self.frame_rate = sample_rate
+        else:
+            self.frame_rate += _ewma_weight(elapsed, ETA_RATE_SMOOTHING_SEC) * (sample_rate - self.frame_rate)
+        if self.frame_rate <= 0:
+            return self.current(now)
+
+        per_job_rate = self.frame_rate / max(1, running_jobs)
+        future_parallelism = max(1, min(max(1, concurrency), max(1, unfinished_jobs)))
+        remaining_frames = max(0, self.total_frames - frames_done)
+        raw_estimate = remaining_frames / (per_job_rate * future_parallelism)
+        previous = self.current(now)
+        if previous is None:
+            self.estimate = raw_estimate
+        else:
+            self.estimate = previous + _ewma_weight(elapsed, ETA_SMOOTHING_SEC) * (raw_estimate - previous)
+        self.estimate_time = now
+        return self.estimate
+
+    def current(self, now):
+        # The last estimate counted down by the time since it was made.
+        if self.estimate is None:
+            return None
+        return max(0.0, self.estimate - (now - self.estimate_time))
@@ -0,0 +1,30 @@
+# ffmpeg_version.py
+# FFmpeg のバージョン (ffmpeg -version の1行目) に応じて、古いビルドにないオプションを置き換えるヘルパー
+
+import re
+
+FPS_MODE_MIN_VERSION = (5, 1) # -fps_mode was added in FFmpeg 5.1; older builds only know -vsync
+
+
+def parse_ffmpeg_version(version_line):
+    """
+    "ffmpeg version 4.4.2-0ubuntu0.22.04.1 ..." のような行から (メジャー, マイナー) を返します。
+    git ビルド ("N-113000-g...", "2024-01-01-git-...") など番号のない場合は None。
+    """
+    match = re.search(r"version\s+n?(\d+)\.(\d+)", version_line or "")
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def supports_fps_mode(ffmpeg_version):
+    # Unknown versions are git builds, which are newer than any release that lacks -fps_mode.
+    return ffmpeg_version is None or tuple(ffmpeg_version) >= FPS_MODE_MIN_VERSION
+
+
+def passthrough_sync_args(ffmpeg_version=None):
+    """
+    フレームを入力のタイムスタンプのまま (複製/間引きなしで) 出力する引数を返します。
+    FFmpeg 5.1 以降は -fps_mode、それより古いビルドは -vsync を使います。
+    """
+    if supports_fps_mode(ffmpeg_version):
+        return ["-fps_mode", "passthrough"]
+    return ["-vsync", "passthrough"]
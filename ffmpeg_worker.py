@@ -2,17 +2,60 @@
 # FFmpegのワーカープロセスと関連ヘルパー関数
 
 import subprocess
+import math
 import os
+import re
 import time
+import threading
 import traceback # 例外発生時のスタックトレース取得用
+from collections import deque
 from colmap_rig_export import (
     DEFAULT_RIG_NAME,
     build_colmap_output_dir,
     build_frame_filename_pattern,
     camera_name_for_index
 )
+from conversion_manifest import MANIFEST_UNCONFIRMED_FRAMES, open_task_manifest
+from equirect_remap import (
+    is_numpy_available,
+    load_or_build_remap_table,
+    pad_equirect_frame,
+    padded_frame_shape,
+    remap_interp_for
+)
+from ffmpeg_version import passthrough_sync_args
+from frame_server import FrameRing, FRAME_RING_STATE_FAILED
+from frame_sampling import (
+    FIRST_FRAME_NUMBER,
+    FRAME_SAMPLING_KEYFRAMES,
+    frame_times_path,
+    parse_showinfo_frame_time,
+    write_frame_times
+)
 # strings モジュールはインポートしない (マルチプロセスでの共有が複雑なため)
 
+PRESCALE_MIN_REDUCTION = 0.1 # Smaller reductions save less than the extra scale pass costs
+PRESCALE_MAX_LOSS_PERCENT = 90.0
+PRESCALE_SCALE_FLAGS = "area" # Averages the dropped pixels instead of skipping them, so v360 samples a band-limited source
+SEEK_TIMESTAMP_TOLERANCE_SEC = 0.001 # Seek this much before a sample time; frames are never closer than 1 ms
+_OUTPUT_LINE_SPLIT_RE = re.compile(rb"[\r\n]") # FFmpeg ends its periodic stats lines with \r, not \n
+PROGRESS_ARGS = ["-nostats", "-progress", "pipe:1"] # key=value progress blocks on stdout instead of the stats line
+PROGRESS_EVENT_INTERVAL_SEC = 0.25 # At most this many progress events per second and FFmpeg process (plus the final one)
+FFMPEG_LOG_QUIET = "quiet" # Nothing forwarded; errors only kept in the tail buffer
+FFMPEG_LOG_ERRORS = "errors"
+FFMPEG_LOG_PROGRESS = "progress" # Warnings, errors and one progress summary line per FFmpeg run
+FFMPEG_LOG_FULL = "full" # Every line, FFmpeg's own log level and banner (previous behaviour)
+FFMPEG_LOG_VERBOSITIES = (FFMPEG_LOG_QUIET, FFMPEG_LOG_ERRORS, FFMPEG_LOG_PROGRESS, FFMPEG_LOG_FULL)
+DEFAULT_FFMPEG_LOG_VERBOSITY = FFMPEG_LOG_PROGRESS
+_FFMPEG_LOG_LEVELS = {FFMPEG_LOG_QUIET: "error", FFMPEG_LOG_ERRORS: "error", FFMPEG_LOG_PROGRESS: "warning"}
+_LOG_LEVEL_SEVERITY = {"panic": 0, "fatal": 1, "error": 2, "warning": 3, "info": 4, "verbose": 5, "debug": 6, "trace": 7}
+_LOG_LEVEL_TAG_RE = re.compile(r"\[(panic|fatal|error|warning|info|verbose|debug|trace)\] ") # Added by -loglevel level+...
+FFMPEG_ERROR_TAIL_LINES = 20 # Last warning/error lines of an FFmpeg process, attached to a failed task_result
+_worker_channels = {"log": None, "progress": None, "cancel": None, "frame_ring_condition": None,
+                    "log_verbosity": DEFAULT_FFMPEG_LOG_VERBOSITY}
+_PROGRESS_KEY_RE = re.compile(r"^(frame|fps|bitrate|total_size|out_time_us|out_time_ms|out_time|dup_frames|"
+                              r"drop_frames|speed|progress|stream_\d+_\d+_q)=(.*)$")
+
 # Constants for FFmpeg error detection (can be expanded)
 CUDA_ERROR_PATTERNS = [
     "hwaccel initialisation returned error",
@@ -25,6 +68,22 @@ CUDA_ERROR_PATTERNS = [
     "error parsing filterchain"
 ]
 
+def init_worker_channels(log_queue, progress_queue, cancel_event, frame_ring_condition=None,
+                         log_verbosity=DEFAULT_FFMPEG_LOG_VERBOSITY):
+    """
+    Pool の initializer。multiprocessing.Queue/Event/Condition は apply_async の引数では渡せない (継承のみ) ため、
+    ワーカープロセスの起動時に受け取って保持します。各ワーカー関数はキュー引数が None の場合にこれを使います。
+    log_verbosity (FFMPEG_LOG_VERBOSITIES のいずれか) は、このプールで起動する FFmpeg のログの出し方です。
+    """
+    _worker_channels.update(log=log_queue, progress=progress_queue, cancel=cancel_event,
+                            frame_ring_condition=frame_ring_condition, log_verbosity=log_verbosity)
+
+def resolve_worker_channels(log_queue_mp=None, progress_queue_mp=None, cancel_event_mp=None):
+    # Explicit arguments (e.g. Manager proxies) take precedence over the channels given to the pool initializer.
+    return (log_queue_mp if log_queue_mp is not None else _worker_channels["log"],
+            progress_queue_mp if progress_queue_mp is not None else _worker_channels["progress"],
+            cancel_event_mp if cancel_event_mp is not None else _worker_channels["cancel"])
+
 def check_for_cuda_fallback_error(ffmpeg_output_str):
     """
     FFmpegの出力文字列を解析し、CUDA関連のエラーや
@@ -54,7 +113,624 @@ def check_for_cuda_fallback_error(ffmpeg_output_str):
                 return True
     return False
 
-def ffmpeg_worker_process(viewpoint_idx, viewpoint_data, config, log_queue_mp, progress_queue_mp, cancel_event_mp):
+def normalize_ffmpeg_yaw(yaw):
+    """
+    ヨー角をFFmpeg v360フィルター向けに -180～180 の範囲へ正規化します。
+    """
+    ffmpeg_yaw = yaw % 360
+    if ffmpeg_yaw > 180:
+        ffmpeg_yaw -= 360
+    elif ffmpeg_yaw < -180: # Handle cases like -270
+        ffmpeg_yaw += 360
+    return ffmpeg_yaw
+
+def build_v360_filter_params(viewpoint_data, output_resolution, interp):
+    """
+    1視点分の v360 フィルターパラメータ文字列を生成します。
+
+    Args:
+        viewpoint_data (dict): 視点情報 (fov, pitch, yaw)。
+        output_resolution (tuple): 出力解像度 (width, height)。
+        interp (str): v360 の補間方式。
+
+    Returns:
+        str: "e:flat:yaw=..." 形式のパラメータ文字列。
+    """
+    output_width, output_height = output_resolution
+    fov = viewpoint_data.get("fov", 100.0) # Default FOV if missing
+    pitch = viewpoint_data.get("pitch", 0.0)
+    ffmpeg_yaw = normalize_ffmpeg_yaw(viewpoint_data.get("yaw", 0.0))
+    return (
+        f"e:flat:yaw={ffmpeg_yaw:.2f}:pitch={pitch:.2f}:h_fov={fov:.2f}:v_fov={fov:.2f}"
+        f":w={output_width}:h={output_height}:interp={interp}"
+    )
+
+def _view_pixels_per_radian(fov, output_resolution):
+    # (centre, corner) pixel density of a flat view; a flat projection packs more pixels per radian towards the corners.
+    if not 0.0 < fov < 180.0:
+        return None
+    half_tan = math.tan(math.radians(fov) / 2.0)
+    focal = max(output_resolution) / 2.0 / half_tan
+    # Radial density at angle t from the centre is focal / cos^2(t); at the corner tan^2(t) = 2 * half_tan^2.
+    return focal, focal * (1.0 + 2.0 * half_tan * half_tan)
+
+def plan_prescale(input_resolution, viewpoints_data, output_resolution, max_loss_percent):
+    """
+    v360 の前に入力の正距円筒図法を縮小できる幅を求めます。
+    各視点で最も画素の細かい四隅の角密度 (1ラジアンあたりの画素数) を、縮小後の入力の角密度 (幅 / 2π) が下回る割合を
+    解像度の低下とし、全視点でそれが max_loss_percent 以下になる最小の幅にします (0 なら低下なし)。
+
+    Returns:
+        dict or None: width, height (偶数), lossless_width (低下なしで縮小できる幅),
+                      loss (四隅での低下 %), center_loss (中心での低下 %)。
+                      縮小の効果がない (PRESCALE_MIN_REDUCTION 未満) 場合や計算できない場合は None。
+    """
+    input_width, input_height = int(input_resolution[0] or 0), int(input_resolution[1] or 0)
+    if input_width <= 0 or input_height <= 0 or not viewpoints_data:
+        return None
+    densities = [_view_pixels_per_radian(float(viewpoint_data.get("fov", 100.0)), output_resolution)
+                 for viewpoint_data in viewpoints_data]
+    if any(density is None for density in densities):
+        return None
+    lossless_width = 2.0 * math.pi * max(corner for _centre, corner in densities)
+    centre_width = 2.0 * math.pi * max(centre for centre, _corner in densities)
+    allowed_loss = min(PRESCALE_MAX_LOSS_PERCENT, max(0.0, float(max_loss_percent))) / 100.0
+    # Rounding up to even sizes only adds pixels, so the loss never exceeds the allowed one.
+    width = 2 * math.ceil(lossless_width * (1.0 - allowed_loss) / 2.0)
+    if width > input_width * (1.0 - PRESCALE_MIN_REDUCTION):
+        return None
+    height = 2 * math.ceil(width * input_height / input_width / 2.0)
+    return {"width": width, "height": height, "lossless_width": math.ceil(lossless_width),
+            "loss": max(0.0, 1.0 - width / lossless_width) * 100.0,
+            "center_loss": max(0.0, 1.0 - width / centre_width) * 100.0}
+
+def build_prescale_filter_parts(viewpoint_data, config):
+    """
+    config["prescale_max_loss"] (許容する解像度の低下 %) が設定されていれば、視点の v360 の前に入力を縮小する scale フィルターを返します。
+    縮小後のサイズはその視点の設定だけで決まるため、同じグループの他の視点によって出力が変わることはありません。
+    """
+    max_loss = config.get("prescale_max_loss")
+    if max_loss is None:
+        return []
+    prescale = plan_prescale(config.get("input_resolution") or (0, 0), [viewpoint_data], config["output_resolution"],
+                             max_loss)
+    if prescale is None:
+        return []
+    return [f"scale={prescale['width']}:{prescale['height']}:flags={PRESCALE_SCALE_FLAGS}"]
+
+def build_decode_filter_parts(config):
+    """
+    デコード直後に1回だけ適用するフィルター (フレーム間引き、CUDAからのダウンロード) を返します。
+    複数視点で共有する場合は split の手前に置かれます。
+    """
+    parts = []
+    output_format = config["output_format"]
+    frame_interval_val = config.get("frame_interval", 0)
+    if output_format in ["png", "jpeg"] and frame_interval_val > 0:
+        # Ensure frame_interval_val is positive to avoid division by zero or invalid fps
+        safe_fps = 1.0 / frame_interval_val if frame_interval_val > 1e-6 else 1.0 # Default to 1fps if interval is tiny/zero
+        lead_in = _time_segment_lead_in(config)
+        if lead_in > 0:
+            # The input was seeked lead_in seconds before the segment start; keep the sample grid on the segment start.
+            parts.append(f"fps=fps={safe_fps:.6f}:start_time={lead_in:.6f}")
+        else:
+            parts.append(f"fps=fps={safe_fps:.6f}")
+    if config["use_cuda"]:
+        # Order for CUDA: hwdownload (if needed), format (CPU format like nv12), v360, format (CPU for encoder), hwupload (if encoding on GPU)
+        parts.extend(["hwdownload", "format=nv12"]) # Download to system memory, NV12 is common for v360
+    return parts
+
+def _time_segment_start_sample(config):
+    segment = config.get("time_segment") or {}
+    return int(segment.get("start_sample", 0))
+
+def _time_segment_lead_in(config):
+    # Seek half a frame early so that the fps filter picks the frame nearest to the segment start, as a full run would.
+    if _time_segment_start_sample(config) <= 0:
+        return 0.0
+    input_fps = config.get("input_fps") or 0.0
+    return 0.5 / input_fps if input_fps > 0 else 0.0
+
+def build_time_segment_input_args(config):
+    """
+    時間分割タスク (config["time_segment"]) の入力側オプション (区間の先頭へのシーク) を返します。
+    """
+    start_sample = _time_segment_start_sample(config)
+    if start_sample <= 0:
+        return []
+    start_time = start_sample * config["frame_interval"] - _time_segment_lead_in(config)
+    return ["-ss", f"{max(0.0, start_time):.6f}"]
+
+def build_time_segment_output_args(config):
+    """
+    時間分割タスクの出力側オプションを返します。全体を1回で変換した場合と同じ連番で、区間のフレーム数だけ書き出します。
+    """
+    segment = config.get("time_segment") or {}
+    if "sample_count" not in segment:
+        return []
+    return ["-frames:v", str(int(segment["sample_count"])),
+            "-start_number", str(FIRST_FRAME_NUMBER + _time_segment_start_sample(config))]
+
+def time_segment_label(config):
+    segment = config.get("time_segment")
+    if not segment:
+        return ""
+    return f" [segment {segment['index'] + 1}/{segment['count']}]"
+
+def task_thread_allocation(config, output_count=1):
+    """
+    config["thread_budget"] (thread_budget.ThreadBudget) から、このジョブのスレッド配分を取得します。
+    予算がない場合は None (従来どおり threads_ffmpeg をエンコーダーに使用)。
+    """
+    budget = config.get("thread_budget")
+    if budget is None:
+        return None
+    return budget.allocation(output_count, config["use_cuda"])
+
+def build_thread_input_args(allocation):
+    # -filter_threads/-filter_complex_threads are global options; -threads before -i sets the decoder threads.
+    if not allocation:
+        return []
+    return ["-filter_threads", str(allocation["filter"]), "-filter_complex_threads", str(allocation["filter"]),
+            "-threads", str(allocation["decode"])]
+
+def _start_budget_task(config):
+    budget = config.get("thread_budget")
+    if budget is not None:
+        budget.start_task()
+
+def _finish_budget_task(config):
+    budget = config.get("thread_budget")
+    if budget is None:
+        return
+    try:
+        budget.finish_task()
+    except Exception: # pylint: disable=broad-except
+        pass # The manager is gone (cancelled/closing); nothing left to rebalance
+
+def build_view_filter_parts(viewpoint_data, config):
+    """
+    視点ごとのフィルター (v360 と出力向けピクセルフォーマット変換) を返します。
+    """
+    output_format = config["output_format"]
+    parts = [f"v360={build_v360_filter_params(viewpoint_data, config['output_resolution'], config['interp'])}"]
+    if output_format == "png":
+        parts.append("format=rgb24") # PNG needs RGB
+    elif output_format == "jpeg":
+        parts.append("format=yuvj420p") # JPEG often uses YUVJ420P
+    elif output_format == "video":
+        if config["use_cuda"]: # Assuming HEVC_NVENC
+            parts.extend(["format=nv12", "hwupload_cuda"]) # Upload back to GPU for NVENC
+        else: # Assuming libx265
+            parts.append("format=yuv420p") # Common for libx265
+    return parts
+
+def build_output_codec_args(config, allocation=None):
+    """
+    出力ファイル1つ分のエンコーダー関連オプションを返します (出力パスは含みません)。
+    allocation (task_thread_allocation の戻り値) があれば、そのエンコードスレッド数を使用します。
+    """
+    output_format = config["output_format"]
+    use_cuda = config["use_cuda"]
+    threads_ffmpeg = allocation["encode"] if allocation else config["threads_ffmpeg"]
+    args = []
+    if output_format in ["png", "jpeg"]:
+        if not use_cuda: # Threads option is typically for CPU encoders
+            args.extend(["-threads", str(threads_ffmpeg)])
+        if output_format == "png":
+            args.extend(["-pred", config.get("png_pred_option", "3")]) # PNG specific prediction filter
+        else:
+            # Convert 1-100 quality to FFmpeg's qscale:v range (typically 1-31, lower is better).
+            # Quality 100 -> q ~1-2; Quality 1 -> q ~31
+            jpeg_quality = config.get("jpeg_quality", 90) # Default quality 90
+            q_val = max(1, min(31, int(round(1 + (100 - jpeg_quality) * 30 / 99.0))))
+            args.extend(["-qscale:v", str(q_val)])
+    elif output_format == "video":
+        if use_cuda:
+            args.extend(["-c:v", "hevc_nvenc"])
+        else:
+            args.extend(["-c:v", "libx265", "-threads", str(threads_ffmpeg)])
+        # CQ for NVENC, CRF for libx265
+        quality_param = "-cq" if use_cuda else "-crf"
+        args.extend([quality_param, str(config["video_cq"]), "-preset", config["video_preset"], "-an"])
+    return args
+
+def viewpoint_output_path(viewpoint_data, config):
+    """
+    視点の出力パス (連番パターンまたは動画ファイル) を決定します。フォルダは作成しません。
+
+    Returns:
+        tuple: 成功時は (output_path, None)。
+               失敗時は (None, (ログ用メッセージ, task_result用エラーメッセージ))。
+    """
+    input_file = config["input_file"]
+    output_folder = config["output_folder"]
+    output_format = config["output_format"]
+    output_mode = config.get("output_mode", "standard")
+    pitch = viewpoint_data.get("pitch", 0.0)
+    yaw = viewpoint_data.get("yaw", 0.0)
+
+    base_input_name = os.path.splitext(os.path.basename(input_file))[0]
+    # Format pitch: remove decimal, pad with leading zeros, replace minus with 'm'
+    pitch_folder_str = f"{int(round(pitch)):03d}".replace("-", "m")
+    yaw_folder_str = f"{int(round(yaw)):03d}".replace("-", "m") # Also handle yaw for consistency if it can be negative
+
+    if output_format == "video":
+        view_file_name = f"{base_input_name}_p{pitch_folder_str}_y{yaw_folder_str}.mp4"
+        return os.path.join(output_folder, view_file_name), None
+
+    file_ext = "jpg" if output_format == "jpeg" else "png"
+    if output_mode == "colmap_rig":
+        camera_name = viewpoint_data.get("camera_name")
+        if not camera_name:
+            camera_index = viewpoint_data.get("camera_index")
+            if camera_index is None:
+                return None, ("COLMAP Rig mode requires camera_name/camera_index in viewpoint data.",
+                              "Missing camera metadata for COLMAP Rig.")
+            camera_name = camera_name_for_index(int(camera_index), int(camera_index))
+        output_dir_for_viewpoint = build_colmap_output_dir(output_folder, config.get("colmap_rig_name", DEFAULT_RIG_NAME),
+                                                           camera_name)
+        filename_pattern = build_frame_filename_pattern(file_ext, session_prefix=config.get("colmap_session_prefix", ""))
+    else:
+        img_type_suffix = '_jpeg' if output_format == 'jpeg' else '_png' # More explicit suffix
+        folder_label = f"{base_input_name}_p{pitch_folder_str}_y{yaw_folder_str}{img_type_suffix}"
+        output_dir_for_viewpoint = os.path.join(output_folder, folder_label)
+        # Use a consistent base name for images within the folder
+        image_base_name = f"{base_input_name}_p{pitch_folder_str}_y{yaw_folder_str}"
+        filename_pattern = f"{image_base_name}_%05d.{file_ext}"
+    return os.path.join(output_dir_for_viewpoint, filename_pattern), None
+
+def prepare_viewpoint_output(viewpoint_data, config):
+    """
+    視点の出力先フォルダを作成し、出力パス (連番パターンまたは動画ファイル) を決定します。
+
+    Returns:
+        tuple: 成功時は (output_path, None)。
+               失敗時は (None, (ログ用メッセージ, task_result用エラーメッセージ))。
+    """
+    output_path, output_error = viewpoint_output_path(viewpoint_data, config)
+    if output_error or config["output_format"] == "video":
+        return output_path, output_error
+    output_dir_for_viewpoint = os.path.dirname(output_path)
+    try:
+        os.makedirs(output_dir_for_viewpoint, exist_ok=True)
+    except OSError as e:
+        folder_label = os.path.basename(output_dir_for_viewpoint)
+        return None, (f"Failed to create output folder ({folder_label}): {e}",
+                      f"Output folder creation failed: {e}")
+    return output_path, None
+
+def _make_group_reporter(viewpoint_indices, progress_queue_mp, start_time):
+    """
+    複数視点をまとめて処理するワーカー用に、視点ごとの task_result を送る report(indices, success, **extra) を作ります。
+    各視点の duration はグループの経過時間を視点数で等分した値です
+    (1視点1プロセスのモードと視点あたりの ETA の平均を比較できるようにするため)。
+
+    Returns:
+        tuple: (report, pending_indices)。pending_indices はまだ結果を送っていない視点のリストで、report が更新します。
+    """
+    pending_indices = list(viewpoint_indices)
+
+    def report(indices, success, **extra):
+        group_duration = time.time() - start_time
+        share = group_duration / max(1, len(viewpoint_indices))
+        for vp_idx in indices:
+            result = {"type": "task_result", "viewpoint_index": vp_idx, "success": success,
+                      "duration": share, "group_duration": group_duration}
+            result.update(extra)
+            progress_queue_mp.put(result)
+            if vp_idx in pending_indices:
+                pending_indices.remove(vp_idx)
+
+    return report, pending_indices
+
+def _prepare_group_outputs(viewpoint_indices, viewpoints_data, config, log_queue_mp, report):
+    """
+    各視点の出力先を準備します。失敗した視点はその場で失敗として報告し、残りの視点だけを返します。
+
+    Returns:
+        tuple: (active_indices, active_viewpoints, output_paths)。すべて失敗した場合は空のリスト。
+    """
+    active_indices = []
+    active_viewpoints = []
+    output_paths = []
+    for vp_idx, viewpoint_data in zip(viewpoint_indices, viewpoints_data):
+        output_path, output_error = prepare_viewpoint_output(viewpoint_data, config)
+        if output_error:
+            log_message, error_message = output_error
+            log_queue_mp.put({"type": "log", "level": "ERROR", "message": log_message})
+            report([vp_idx], False, error_message=error_message)
+            continue
+        active_indices.append(vp_idx)
+        active_viewpoints.append(viewpoint_data)
+        output_paths.append(output_path)
+    return active_indices, active_viewpoints, output_paths
+
+def _report_group_failure(report, log_queue_mp, worker_label, indices, error_message, error_tail, log_detail=None):
+    # One ERROR line for the whole group plus a failed task_result (with the FFmpeg output tail) per viewpoint.
+    view_labels = ", ".join(f"{vp_idx + 1}" for vp_idx in indices)
+    log_queue_mp.put({"type": "log", "level": "ERROR",
+                      "message": f"FFmpeg error ({worker_label}, viewpoints {view_labels}): {log_detail or error_message}"})
+    report(indices, False, error_message=error_message, error_tail=error_tail)
+
+def _report_group_exception(report, pending_indices, log_queue_mp, worker_label, error):
+    # Unexpected errors fail every viewpoint of the group that has not been reported yet.
+    if isinstance(error, KeyError): # Missing key in config or viewpoint_data
+        error_msg = f"{worker_label} configuration error: Missing key {error}"
+        result_message = error_msg
+    else:
+        error_msg = f"{worker_label} encountered an exception: {error}"
+        result_message = str(error)
+    log_queue_mp.put({"type": "log", "level": "CRITICAL", "message": error_msg})
+    log_queue_mp.put({"type": "log", "level": "DEBUG", "message": traceback.format_exc()})
+    report(list(pending_indices), False, error_message=result_message)
+
+def _put_raw_line(log_queue_mp, line_str, viewpoint_idx, viewpoint_indices):
+    raw_entry = {"type": "ffmpeg_raw", "line": line_str.strip(), "viewpoint_index": viewpoint_idx}
+    if viewpoint_indices is not None:
+        raw_entry["viewpoint_indices"] = viewpoint_indices
+    log_queue_mp.put(raw_entry)
+
+def apply_ffmpeg_log_verbosity(command, verbosity=None, keep_info=False):
+    """
+    ログの出し方に合わせて -hide_banner と -loglevel level+<レベル> を設定したコマンドを返します (full の場合はそのまま)。
+    level+ を付けると各行に [error] などのレベルが付くため、ワーカー側で転送する行を選べます。
+
+    Args:
+        verbosity (str or None): FFMPEG_LOG_VERBOSITIES のいずれか。None なら Pool の initializer で受け取った値。
+        keep_info (bool): info レベルの行 (showinfo フィルターの出力など) を line_callback で読む場合は True。
+    """
+    verbosity = verbosity or _worker_channels["log_verbosity"]
+    if verbosity not in _FFMPEG_LOG_LEVELS:
+        return list(command)
+    level = "info" if keep_info else _FFMPEG_LOG_LEVELS[verbosity]
+    options = []
+    skip_next = False
+    for arg in command[1:]:
+        if skip_next:
+            skip_next = False
+        elif arg == "-loglevel":
+            skip_next = True # Replaced below
+        elif arg != "-hide_banner":
+            options.append(arg)
+    return [command[0], "-hide_banner", "-loglevel", f"level+{level}"] + options
+
+def _output_line_severity(line_str):
+    match = _LOG_LEVEL_TAG_RE.search(line_str)
+    # Untagged lines come from commands run at FFmpeg's own log level; treat them like errors so they are not lost.
+    return _LOG_LEVEL_SEVERITY[match.group(1)] if match else _LOG_LEVEL_SEVERITY["error"]
+
+def ffmpeg_line_level(line_str):
+    # "ERROR", "WARNING", ... from the level+ tag of a forwarded FFmpeg line; None when the line has no tag.
+    match = _LOG_LEVEL_TAG_RE.search(line_str)
+    return match.group(1).upper() if match else None
+
+def _handle_output_line(log_queue_mp, line_str, viewpoint_idx, viewpoint_indices, output_tail):
+    # Keep warnings and errors in the process's own tail for the failure report; forward only what the verbosity asks for.
+    verbosity = _worker_channels["log_verbosity"]
+    if verbosity == FFMPEG_LOG_FULL:
+        output_tail.append(line_str.strip())
+        _put_raw_line(log_queue_mp, line_str, viewpoint_idx, viewpoint_indices)
+        return
+    severity = _output_line_severity(line_str)
+    if severity <= _LOG_LEVEL_SEVERITY["warning"]:
+        output_tail.append(line_str.strip())
+    if verbosity != FFMPEG_LOG_QUIET and severity <= _LOG_LEVEL_SEVERITY[_FFMPEG_LOG_LEVELS[verbosity]]:
+        _put_raw_line(log_queue_mp, line_str, viewpoint_idx, viewpoint_indices)
+
+def _new_output_tail():
+    # One per FFmpeg process: reader threads of concurrent processes must not mix their lines.
+    return deque(maxlen=FFMPEG_ERROR_TAIL_LINES)
+
+def _get_hidden_startupinfo():
+    if os.name == 'nt': # Hide console window on Windows
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        startupinfo.wShowWindow = subprocess.SW_HIDE
+        return startupinfo
+    return None
+
+def _iter_output_lines(stream):
+    # Split on both \r and \n so that the stats line is seen every time FFmpeg refreshes it.
+    read_chunk = getattr(stream, "read1", stream.read)
+    pending = b""
+    while True:
+        chunk = read_chunk(65536)
+        if not chunk:
+            break
+        parts = _OUTPUT_LINE_SPLIT_RE.split(pending + chunk)
+        pending = parts.pop()
+        for part in parts:
+            if part:
+                yield part
+    if pending:
+        yield pending
+
+def _parse_progress_number(value, suffix=""):
+    value = value.strip()
+    if suffix and value.endswith(suffix):
+        value = value[:-len(suffix)]
+    try:
+        return float(value)
+    except ValueError:
+        return None # "N/A" until the first frame is written
+
+class FfmpegProgressTracker:
+    """
+    -progress の key=value ブロックを読み、数値だけの進捗イベントにまとめます。
+    イベントは PROGRESS_EVENT_INTERVAL_SEC に1回まで (最後のブロックは必ず) 送ります。
+
+    イベント: {"type": "frame_progress", "task": ワーカー名, "viewpoint_indices": [...],
+               "frames": 前回からの増分 (出力1つあたり), "frame": 累計, "fps": 実測fps,
+               "out_time": 出力の位置 (秒), "speed": 再生速度比, "final": ブロックが progress=end か}
+    """
+
+    def __init__(self, progress_queue_mp, worker_label, viewpoint_indices):
+        self.progress_queue_mp = progress_queue_mp
+        self.worker_label = worker_label
+        self.viewpoint_indices = list(viewpoint_indices)
+        self.fields = {}
+        self.frames_reported = 0
+        self.last_event_time = 0.0
+
+    def feed(self, line_str):
+        """
+        進捗の行なら取り込んで True を返します (ログへは転送しない)。
+        """
+        match = _PROGRESS_KEY_RE.match(line_str.strip())
+        if not match:
+            return False
+        key, value = match.groups()
+        self.fields[key] = value
+        if key == "progress":
+            final = value.strip() == "end"
+            now = time.monotonic()
+            if final or now - self.last_event_time >= PROGRESS_EVENT_INTERVAL_SEC:
+                self.last_event_time = now
+                self._send(final)
+        return True
+
+    def frames_written(self):
+        # Latest frame count FFmpeg has printed, also between (throttled) events.
+        return int(_parse_progress_number(self.fields.get("frame", "0")) or 0)
+
+    def _send(self, final):
+        frame = self.frames_written()
+        out_time_us = _parse_progress_number(self.fields.get("out_time_us", ""))
+        self.progress_queue_mp.put({
+            "type": "frame_progress", "task": self.worker_label, "viewpoint_indices": self.viewpoint_indices,
+            "frames": max(0, frame - self.frames_reported), "frame": frame,
+            "fps": _parse_progress_number(self.fields.get("fps", "")),
+            "out_time": out_time_us / 1e6 if out_time_us is not None and out_time_us >= 0 else None,
+            "speed": _parse_progress_number(self.fields.get("speed", ""), suffix="x"),
+            "final": final,
+        })
+        self.frames_reported = max(self.frames_reported, frame)
+
+    def summary_line(self):
+        if not self.fields:
+            return None
+        return (f"frame={self.fields.get('frame', '?')} fps={self.fields.get('fps', '?')} "
+                f"time={self.fields.get('out_time', '?')} speed={self.fields.get('speed', '?').strip()}")
+
+class PipedFrameProgressTracker:
+    """
+    リマップバックエンドが視点ごとのエンコーダーへ渡したフレーム数を数え、FfmpegProgressTracker と同じ形の
+    frame_progress イベントとして送ります。イベントは PROGRESS_EVENT_INTERVAL_SEC に1回まで (最後は必ず) 送り、
+    渡したフレーム数の異なる視点 (途中でエンコーダーが止まった視点など) は別のイベントにします。
+    """
+
+    def __init__(self, progress_queue_mp, worker_label, viewpoint_indices, frame_rate=None):
+        self.progress_queue_mp = progress_queue_mp
+        self.worker_label = worker_label
+        self.frame_rate = frame_rate # Output frame rate, for out_time and speed
+        self.frames_piped = dict.fromkeys(viewpoint_indices, 0)
+        self.frames_reported = dict.fromkeys(viewpoint_indices, 0)
+        self.start_time = time.monotonic()
+        self.last_event_time = 0.0
+
+    def add_frame(self, vp_idx):
+        self.frames_piped[vp_idx] += 1
+
+    def send(self, final=False):
+        """
+        前回のイベントから PROGRESS_EVENT_INTERVAL_SEC 以上経っていれば (final なら常に) イベントを送ります。
+        """
+        now = time.monotonic()
+        if not final and now - self.last_event_time < PROGRESS_EVENT_INTERVAL_SEC:
+            return
+        self.last_event_time = now
+        elapsed = now - self.start_time
+        groups = {}
+        for vp_idx, frame in self.frames_piped.items():
+            groups.setdefault((frame, frame - self.frames_reported[vp_idx]), []).append(vp_idx)
+        for (frame, increment), indices in groups.items():
+            if not increment and not final:
+                continue
+            out_time = frame / self.frame_rate if self.frame_rate else None
+            self.progress_queue_mp.put({
+                "type": "frame_progress", "task": self.worker_label, "viewpoint_indices": indices,
+                "frames": increment, "frame": frame, "fps": frame / elapsed if elapsed > 0 else None,
+                "out_time": out_time, "speed": out_time / elapsed if out_time is not None and elapsed > 0 else None,
+                "final": final,
+            })
+            for vp_idx in indices:
+                self.frames_reported[vp_idx] = frame
+
+def _run_ffmpeg_and_stream_output(command, worker_label, viewpoint_idx, log_queue_mp, cancel_event_mp, viewpoint_indices=None,
+                                  line_callback=None, progress_queue_mp=None, task_manifest=None, output_tail=None):
+    """
+    FFmpegを起動し、出力を1行ずつログキューへ転送します。
+    キャンセルが要求された場合はプロセスを停止します。
+    line_callback を指定すると、各行 (デコード済み文字列) がその関数にも渡されます。
+    progress_queue_mp を指定すると FFmpeg を -nostats -progress pipe:1 付きで起動し、進捗を
+    FfmpegProgressTracker のイベントとして送ります。進捗の行はログへ転送せず、終了時に要約を1行だけ転送します。
+    転送する行はログの出し方 (apply_ffmpeg_log_verbosity) で決まり、警告/エラーの行は失敗時の報告用に直近分を保持します。
+    task_manifest (conversion_manifest.TaskManifest) を指定すると、進捗のフレーム数を再開用の記録にも反映します。
+    output_tail (deque) を指定すると、このプロセスの警告/エラーの直近の行がそこに残ります (開始時にクリアされます)。
+
+    Returns:
+        int or None: FFmpegの終了コード (キャンセル時も待機後の値)。
+    """
+    ffmpeg_process = None
+    progress_tracker = None
+    if output_tail is None:
+        output_tail = _new_output_tail()
+    output_tail.clear()
+    command = apply_ffmpeg_log_verbosity(command, keep_info=line_callback is not None)
+    if progress_queue_mp is not None:
+        command = [command[0]] + PROGRESS_ARGS + list(command[1:])
+        progress_tracker = FfmpegProgressTracker(progress_queue_mp, worker_label,
+                                                 viewpoint_indices if viewpoint_indices else [viewpoint_idx])
+    try:
+        ffmpeg_process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, # Redirect stderr to stdout to capture all output
+            universal_newlines=False, # Read as bytes
+            startupinfo=_get_hidden_startupinfo()
+        )
+
+        if ffmpeg_process.stdout:
+            for line_bytes in _iter_output_lines(ffmpeg_process.stdout):
+                if cancel_event_mp.is_set():
+                    log_queue_mp.put({"type": "log", "level": "INFO",
+                                      "message": f"{worker_label} processing cancelled."})
+                    ffmpeg_process.terminate() # Send SIGTERM
+                    try:
+                        ffmpeg_process.wait(timeout=5) # Wait a bit for graceful termination
+                    except subprocess.TimeoutExpired:
+                        log_queue_mp.put({"type": "log", "level": "WARNING",
+                                          "message": f"{worker_label} did not terminate gracefully, killing."})
+                        ffmpeg_process.kill() # Force kill if not terminated
+                    break
+                # Decode line by line, replacing errors
+                line_str = line_bytes.decode(encoding='utf-8', errors='replace')
+                if line_callback is not None:
+                    line_callback(line_str)
+                if progress_tracker is not None and progress_tracker.feed(line_str):
+                    if task_manifest is not None:
+                        task_manifest.update(progress_tracker.frames_written() - MANIFEST_UNCONFIRMED_FRAMES)
+                    continue
+                _handle_output_line(log_queue_mp, line_str, viewpoint_idx, viewpoint_indices, output_tail)
+        if (progress_tracker is not None and progress_tracker.summary_line() and
+                _worker_channels["log_verbosity"] in (FFMPEG_LOG_PROGRESS, FFMPEG_LOG_FULL)):
+            _put_raw_line(log_queue_mp, progress_tracker.summary_line(), viewpoint_idx, viewpoint_indices)
+        ffmpeg_process.wait() # Wait for the process to complete if not cancelled
+        return ffmpeg_process.returncode
+    finally:
+        # Ensure stdout is closed if process was opened
+        if ffmpeg_process and ffmpeg_process.stdout and not ffmpeg_process.stdout.closed:
+            ffmpeg_process.stdout.close()
+        # Ensure process is cleaned up if it's still running (e.g., due to an error before wait)
+        if ffmpeg_process and ffmpeg_process.poll() is None:
+            log_queue_mp.put({"type": "log", "level": "WARNING",
+                              "message": f"{worker_label} FFmpeg process still running in finally block, attempting kill."})
+            ffmpeg_process.kill()
+            ffmpeg_process.wait()
+
+def ffmpeg_worker_process(viewpoint_idx, viewpoint_data, config, log_queue_mp=None, progress_queue_mp=None,
+                          cancel_event_mp=None):
     """
     個別の視点に対するFFmpeg変換処理をサブプロセスとして実行します。
     マルチプロセッシングプールから呼び出されることを想定しています。
@@ -66,38 +742,22 @@ def ffmpeg_worker_process(viewpoint_idx, viewpoint_data, config, log_queue_mp, p
         log_queue_mp (multiprocessing.Queue): ログメッセージをGUIプロセスに送るためのキュー。
         progress_queue_mp (multiprocessing.Queue): 進捗情報をGUIプロセスに送るためのキュー。
         cancel_event_mp (multiprocessing.Event): キャンセル指示を検知するためのイベント。
+        キュー/イベントを省略した場合は init_worker_channels で受け取ったものを使います。
     """
+    log_queue_mp, progress_queue_mp, cancel_event_mp = resolve_worker_channels(log_queue_mp, progress_queue_mp,
+                                                                               cancel_event_mp)
     process_start_time = time.time()
+    pitch = viewpoint_data.get("pitch", 0.0)
+    yaw = viewpoint_data.get("yaw", 0.0)
+    task_manifest = None
+    output_tail = _new_output_tail()
     try:
+        _start_budget_task(config)
         ffmpeg_path = config["ffmpeg_path"]
         input_file = config["input_file"]
-        output_folder = config["output_folder"]
-        output_width, output_height = config["output_resolution"]
-        interp = config["interp"]
-        threads_ffmpeg = config["threads_ffmpeg"]
         use_cuda = config["use_cuda"]
         output_format = config["output_format"]
         output_mode = config.get("output_mode", "standard")
-        colmap_rig_name = config.get("colmap_rig_name", DEFAULT_RIG_NAME)
-        colmap_session_prefix = config.get("colmap_session_prefix", "")
-        frame_interval_val = config.get("frame_interval", 0) # Default to 0 if not present
-        video_preset = config["video_preset"]
-        video_cq = config["video_cq"]
-        # Use .get() for potentially missing keys with defaults
-        png_pred_option = config.get("png_pred_option", "3") # Default to 'average'
-        jpeg_quality = config.get("jpeg_quality", 90) # Default quality 90
-
-        fov = viewpoint_data.get("fov", 100.0) # Default FOV if missing
-        pitch = viewpoint_data.get("pitch", 0.0)
-        yaw = viewpoint_data.get("yaw", 0.0)
-
-        # Normalize yaw for FFmpeg v360 filter (-180 to 180 range is typical)
-        ffmpeg_yaw = yaw % 360
-        if ffmpeg_yaw > 180:
-            ffmpeg_yaw -= 360
-        elif ffmpeg_yaw < -180: # Handle cases like -270
-             ffmpeg_yaw += 360
-
 
         if output_mode == "colmap_rig" and output_format == "video":
             log_queue_mp.put({"type": "log", "level": "ERROR",
@@ -109,185 +769,59 @@ def ffmpeg_worker_process(viewpoint_idx, viewpoint_data, config, log_queue_mp, p
             })
             return
 
-        v360_filter_params = (
-            f"e:flat:yaw={ffmpeg_yaw:.2f}:pitch={pitch:.2f}:h_fov={fov:.2f}:v_fov={fov:.2f}"
-            f":w={output_width}:h={output_height}:interp={interp}"
-        )
+        filter_complex_parts = (build_decode_filter_parts(config) + build_prescale_filter_parts(viewpoint_data, config) +
+                                build_view_filter_parts(viewpoint_data, config))
+        allocation = task_thread_allocation(config)
         command = [ffmpeg_path, "-y"] # -y to overwrite output files without asking
-        filter_complex_parts = []
-
         if use_cuda:
             command.extend(["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"])
         # Always specify input file after potential hwaccel options
+        command.extend(build_thread_input_args(allocation))
+        command.extend(build_time_segment_input_args(config))
         command.extend(["-i", input_file])
 
+        output_path, output_error = prepare_viewpoint_output(viewpoint_data, config)
+        if output_error:
+            log_message, error_message = output_error
+            log_queue_mp.put({"type": "log", "level": "ERROR", "message": log_message})
+            progress_queue_mp.put({
+                "type": "task_result", "viewpoint_index": viewpoint_idx, "success": False,
+                "error_message": error_message,
+                "duration": time.time() - process_start_time
+            })
+            return
 
-        if output_format in ["png", "jpeg"] and frame_interval_val > 0:
-            # Ensure frame_interval_val is positive to avoid division by zero or invalid fps
-            safe_fps = 1.0 / frame_interval_val if frame_interval_val > 1e-6 else 1.0 # Default to 1fps if interval is tiny/zero
-            filter_complex_parts.append(f"fps=fps={safe_fps:.6f}")
-
-
-        if use_cuda:
-            # Order for CUDA: hwdownload (if needed), format (CPU format like nv12), v360, format (CPU for encoder), hwupload (if encoding on GPU)
-            filter_complex_parts.extend(["hwdownload", "format=nv12"]) # Download to system memory, NV12 is common for v360
-            filter_complex_parts.append(f"v360={v360_filter_params}")
-            if output_format == "png":
-                filter_complex_parts.append("format=rgb24") # PNG needs RGB
-            elif output_format == "jpeg":
-                filter_complex_parts.append("format=yuvj420p") # JPEG often uses YUVJ420P
-            elif output_format == "video": # Assuming HEVC_NVENC
-                filter_complex_parts.extend(["format=nv12", "hwupload_cuda"]) # Upload back to GPU for NVENC
-        else: # CPU processing path
-            filter_complex_parts.append(f"v360={v360_filter_params}")
-            if output_format == "png":
-                filter_complex_parts.append("format=rgb24")
-            elif output_format == "jpeg":
-                filter_complex_parts.append("format=yuvj420p")
-            elif output_format == "video": # Assuming libx265
-                filter_complex_parts.append("format=yuv420p") # Common for libx265
-
-        base_input_name = os.path.splitext(os.path.basename(input_file))[0]
-        # Format pitch: remove decimal, pad with leading zeros, replace minus with 'm'
-        pitch_folder_str = f"{int(round(pitch)):03d}".replace("-", "m")
-        yaw_folder_str = f"{int(round(yaw)):03d}".replace("-", "m") # Also handle yaw for consistency if it can be negative
-
-        if output_format in ["png", "jpeg"]:
-            if output_mode == "colmap_rig":
-                camera_name = viewpoint_data.get("camera_name")
-                if not camera_name:
-                    camera_index = viewpoint_data.get("camera_index")
-                    if camera_index is None:
-                        log_queue_mp.put({"type": "log", "level": "ERROR",
-                                          "message": "COLMAP Rig mode requires camera_name/camera_index in viewpoint data."})
-                        progress_queue_mp.put({
-                            "type": "task_result", "viewpoint_index": viewpoint_idx, "success": False,
-                            "error_message": "Missing camera metadata for COLMAP Rig.",
-                            "duration": time.time() - process_start_time
-                        })
-                        return
-                    camera_name = camera_name_for_index(int(camera_index), int(camera_index))
-
-                output_dir_for_viewpoint = build_colmap_output_dir(output_folder, colmap_rig_name, camera_name)
-                try:
-                    os.makedirs(output_dir_for_viewpoint, exist_ok=True)
-                except OSError as e:
-                    log_queue_mp.put({"type": "log", "level": "ERROR",
-                                      "message": f"Failed to create output folder ({camera_name}): {e}"})
-                    progress_queue_mp.put({
-                        "type": "task_result", "viewpoint_index": viewpoint_idx, "success": False,
-                        "error_message": f"Output folder creation failed: {e}",
-                        "duration": time.time() - process_start_time
-                    })
-                    return
-
-                file_ext = "jpg" if output_format == "jpeg" else "png"
-                output_filename_pattern = os.path.join(
-                    output_dir_for_viewpoint,
-                    build_frame_filename_pattern(file_ext, session_prefix=colmap_session_prefix)
-                )
-            else:
-                img_type_suffix = '_jpeg' if output_format == 'jpeg' else '_png' # More explicit suffix
-                view_folder_name = f"{base_input_name}_p{pitch_folder_str}_y{yaw_folder_str}{img_type_suffix}"
-                output_dir_for_viewpoint = os.path.join(output_folder, view_folder_name)
-
-                try:
-                    os.makedirs(output_dir_for_viewpoint, exist_ok=True)
-                except OSError as e:
-                    log_queue_mp.put({"type": "log", "level": "ERROR",
-                                      "message": f"Failed to create output folder ({view_folder_name}): {e}"})
-                    progress_queue_mp.put({
-                        "type": "task_result", "viewpoint_index": viewpoint_idx, "success": False,
-                        "error_message": f"Output folder creation failed: {e}",
-                        "duration": time.time() - process_start_time
-                    })
-                    return
-
-                file_ext = "jpg" if output_format == "jpeg" else "png"
-                # Use a consistent base name for images within the folder
-                image_base_name = f"{base_input_name}_p{pitch_folder_str}_y{yaw_folder_str}"
-                output_filename_pattern = os.path.join(output_dir_for_viewpoint, f"{image_base_name}_%05d.{file_ext}")
-
-            command.extend(["-vf", ",".join(filter_complex_parts)])
-            if not use_cuda: # Threads option is typically for CPU encoders
-                command.extend(["-threads", str(threads_ffmpeg)])
-
-            if output_format == "png":
-                command.extend(["-pred", png_pred_option]) # PNG specific prediction filter
-            elif output_format == "jpeg":
-                # Convert 1-100 quality to FFmpeg's qscale:v range (typically 1-31 for M superbly, 2-5 good)
-                # Lower qscale means higher quality for JPEG.
-                # A common mapping: q = 31 - (quality * 30 / 100) roughly.
-                # Let's use a slightly adjusted mapping to ensure q is at least 1.
-                # Quality 100 -> q ~1-2; Quality 1 -> q ~31
-                q_val = max(1, min(31, int(round(1 + (100 - jpeg_quality) * 30 / 99.0))))
-                command.extend(["-qscale:v", str(q_val)])
-
-            command.append(output_filename_pattern)
-        elif output_format == "video":
-            command.extend(["-vf", ",".join(filter_complex_parts)])
-            if use_cuda:
-                command.extend(["-c:v", "hevc_nvenc"])
-            else:
-                command.extend(["-c:v", "libx265", "-threads", str(threads_ffmpeg)])
-
-            view_file_name = f"{base_input_name}_p{pitch_folder_str}_y{yaw_folder_str}.mp4"
-            output_file_path = os.path.join(output_folder, view_file_name)
-            # CQ for NVENC, CRF for libx265
-            quality_param = "-cq" if use_cuda else "-crf"
-            command.extend([quality_param, str(video_cq), "-preset", video_preset, "-an", output_file_path])
+        task_manifest = open_task_manifest(config, [viewpoint_data])
+        command.extend(["-vf", ",".join(filter_complex_parts)])
+        command.extend(build_output_codec_args(config, allocation))
+        command.extend(build_time_segment_output_args(config))
+        command.append(output_path)
 
         log_queue_mp.put({"type": "log", "level": "DEBUG",
-                          "message": f"Worker {viewpoint_idx + 1} (CUDA: {use_cuda}) command: {' '.join(command)}"})
+                          "message": f"Worker {viewpoint_idx + 1}{time_segment_label(config)} (CUDA: {use_cuda}) command: {' '.join(command)}"})
 
-        ffmpeg_process = None
-        startupinfo = None
-        if os.name == 'nt': # Hide console window on Windows
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE
-
-        # Ensure encoding is robust for FFmpeg output
-        ffmpeg_process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT, # Redirect stderr to stdout to capture all output
-            universal_newlines=False, # Read as bytes
-            startupinfo=startupinfo
-            # encoding='utf-8', errors='replace' # Let's decode manually
+        returncode = _run_ffmpeg_and_stream_output(
+            command, f"Worker {viewpoint_idx + 1} (P{pitch:.1f} Y{yaw:.1f}){time_segment_label(config)}", viewpoint_idx,
+            log_queue_mp, cancel_event_mp, progress_queue_mp=progress_queue_mp, task_manifest=task_manifest,
+            output_tail=output_tail
         )
 
-        if ffmpeg_process.stdout:
-            for line_bytes in iter(ffmpeg_process.stdout.readline, b''):
-                if cancel_event_mp.is_set():
-                    log_queue_mp.put({"type": "log", "level": "INFO",
-                                      "message": f"Worker {viewpoint_idx + 1} (P{pitch:.1f} Y{yaw:.1f}) processing cancelled."})
-                    ffmpeg_process.terminate() # Send SIGTERM
-                    try:
-                        ffmpeg_process.wait(timeout=5) # Wait a bit for graceful termination
-                    except subprocess.TimeoutExpired:
-                        log_queue_mp.put({"type": "log", "level": "WARNING",
-                                          "message": f"Worker {viewpoint_idx + 1} did not terminate gracefully, killing."})
-                        ffmpeg_process.kill() # Force kill if not terminated
-                    break
-                # Decode line by line, replacing errors
-                line_str = line_bytes.decode(encoding='utf-8', errors='replace')
-                log_queue_mp.put({"type": "ffmpeg_raw", "line": line_str.strip(), "viewpoint_index": viewpoint_idx})
-        ffmpeg_process.wait() # Wait for the process to complete if not cancelled
-
         if cancel_event_mp.is_set(): # Check again after loop/wait
             progress_queue_mp.put({"type": "task_result", "viewpoint_index": viewpoint_idx, "success": False,
                                    "cancelled": True, "duration": time.time() - process_start_time})
             return
 
-        if ffmpeg_process.returncode == 0:
+        if returncode == 0:
+            if task_manifest is not None:
+                task_manifest.update(0, complete=True)
             progress_queue_mp.put({"type": "task_result", "viewpoint_index": viewpoint_idx, "success": True,
                                    "duration": time.time() - process_start_time})
         else:
             log_queue_mp.put({"type": "log", "level": "ERROR",
-                              "message": f"FFmpeg error (Worker {viewpoint_idx + 1}, P{pitch:.1f} Y{yaw:.1f}): Exit Code {ffmpeg_process.returncode}"})
+                              "message": f"FFmpeg error (Worker {viewpoint_idx + 1}, P{pitch:.1f} Y{yaw:.1f}): Exit Code {returncode}"})
             progress_queue_mp.put({"type": "task_result", "viewpoint_index": viewpoint_idx, "success": False,
-                                   "error_message": f"FFmpeg failed (code {ffmpeg_process.returncode})",
+                                   "error_message": f"FFmpeg failed (code {returncode})",
+                                   "error_tail": list(output_tail),
                                    "duration": time.time() - process_start_time})
 
     except KeyError as e: # Handle missing keys in config or viewpoint_data
@@ -303,12 +837,749 @@ def ffmpeg_worker_process(viewpoint_idx, viewpoint_data, config, log_queue_mp, p
         progress_queue_mp.put({"type": "task_result", "viewpoint_index": viewpoint_idx, "success": False,
                                "error_message": str(e), "duration": time.time() - process_start_time})
     finally:
-        # Ensure stdout is closed if process was opened
-        if ffmpeg_process and ffmpeg_process.stdout and not ffmpeg_process.stdout.closed:
-            ffmpeg_process.stdout.close()
-        # Ensure process is cleaned up if it's still running (e.g., due to an error before wait)
-        if ffmpeg_process and ffmpeg_process.poll() is None:
+        if task_manifest is not None:
+            task_manifest.flush() # Keep what was written before a cancel or failure
+        _finish_budget_task(config)
+
+def build_multi_view_filter_graph(viewpoints_data, config, extra_decode_parts=None):
+    """
+    1回のデコード結果を split で複数視点へ分配する filter_complex 文字列を生成します。
+    extra_decode_parts はデコード直後 (split の手前) に追加するフィルターです。
+    自動プリスケールのサイズが同じ視点は、1回の scale を共有します。
+
+    Returns:
+        tuple: (filter_complex文字列, 各視点の出力ラベルのリスト)
+    """
+    decode_parts = build_decode_filter_parts(config) + list(extra_decode_parts or [])
+    output_labels = [f"[v{k}]" for k in range(len(viewpoints_data))]
+    branches = {}
+    for k, viewpoint_data in enumerate(viewpoints_data):
+        branches.setdefault(tuple(build_prescale_filter_parts(viewpoint_data, config)), []).append(k)
+
+    graph_parts = []
+    if len(branches) == 1:
+        (prescale_parts, indices), = branches.items()
+        branch_inputs = [("[0:v]", decode_parts + list(prescale_parts), indices)]
+    else:
+        branch_labels = "".join(f"[b{branch_idx}]" for branch_idx in range(len(branches)))
+        graph_parts.append(f"[0:v]{','.join(decode_parts + [f'split={len(branches)}'])}{branch_labels}")
+        branch_inputs = [(f"[b{branch_idx}]", list(prescale_parts), indices)
+                         for branch_idx, (prescale_parts, indices) in enumerate(branches.items())]
+    for input_label, head_parts, indices in branch_inputs:
+        if len(indices) == 1:
+            k = indices[0]
+            chain = ",".join(head_parts + build_view_filter_parts(viewpoints_data[k], config))
+            graph_parts.append(f"{input_label}{chain}{output_labels[k]}")
+            continue
+        split_labels = "".join(f"[s{k}]" for k in indices)
+        graph_parts.append(f"{input_label}{','.join(head_parts + [f'split={len(indices)}'])}{split_labels}")
+        for k in indices:
+            graph_parts.append(f"[s{k}]{','.join(build_view_filter_parts(viewpoints_data[k], config))}{output_labels[k]}")
+    return ";".join(graph_parts), output_labels
+
+def ffmpeg_multi_view_worker_process(task_idx, viewpoint_indices, viewpoints_data, config,
+                                     log_queue_mp=None, progress_queue_mp=None, cancel_event_mp=None):
+    """
+    複数視点を1つのFFmpegプロセスで変換します。入力は1回だけデコードされ、
+    split フィルターで各視点の v360 に分配されます。
+    結果は視点ごとの task_result として progress_queue_mp に送られます。
+
+    Args:
+        task_idx (int): デコードグループのインデックス (ログ表示用)。
+        viewpoint_indices (list): 各視点の全体インデックス。
+        viewpoints_data (list): 視点情報 (fov, pitch, yaw) のリスト。viewpoint_indices と同じ順序。
+        config (dict): 変換設定 (ffmpeg_worker_process と同じ)。
+        log_queue_mp (multiprocessing.Queue): ログメッセージ用キュー。
+        progress_queue_mp (multiprocessing.Queue): 進捗情報用キュー。
+        cancel_event_mp (multiprocessing.Event): キャンセル指示を検知するためのイベント。
+    """
+    log_queue_mp, progress_queue_mp, cancel_event_mp = resolve_worker_channels(log_queue_mp, progress_queue_mp,
+                                                                               cancel_event_mp)
+    process_start_time = time.time()
+    worker_label = f"Decode group {task_idx + 1}{time_segment_label(config)}"
+    report, pending_indices = _make_group_reporter(viewpoint_indices, progress_queue_mp, process_start_time)
+    task_manifest = None
+    output_tail = _new_output_tail()
+
+    try:
+        _start_budget_task(config)
+        ffmpeg_path = config["ffmpeg_path"]
+        input_file = config["input_file"]
+        use_cuda = config["use_cuda"]
+        output_format = config["output_format"]
+        output_mode = config.get("output_mode", "standard")
+
+        if output_mode == "colmap_rig" and output_format == "video":
+            log_queue_mp.put({"type": "log", "level": "ERROR",
+                              "message": "COLMAP Rig mode does not support video output."})
+            report(viewpoint_indices, False, error_message="Invalid output format for COLMAP Rig.")
+            return
+
+        active_indices, active_viewpoints, output_paths = _prepare_group_outputs(
+            viewpoint_indices, viewpoints_data, config, log_queue_mp, report)
+        if not active_indices:
+            return
+
+        filter_graph, output_labels = build_multi_view_filter_graph(active_viewpoints, config)
+        task_manifest = open_task_manifest(config, active_viewpoints)
+        allocation = task_thread_allocation(config, len(active_indices))
+        command = [ffmpeg_path, "-y"]
+        if use_cuda:
+            command.extend(["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"])
+        command.extend(build_thread_input_args(allocation))
+        command.extend(build_time_segment_input_args(config))
+        command.extend(["-i", input_file, "-filter_complex", filter_graph])
+        codec_args = build_output_codec_args(config, allocation) + build_time_segment_output_args(config)
+        for output_label, output_path in zip(output_labels, output_paths):
+            command.extend(["-map", output_label])
+            command.extend(codec_args)
+            command.append(output_path)
+
+        log_queue_mp.put({"type": "log", "level": "DEBUG",
+                          "message": f"{worker_label} ({len(active_indices)} viewpoints, CUDA: {use_cuda}) command: {' '.join(command)}"})
+
+        returncode = _run_ffmpeg_and_stream_output(
+            command, worker_label, active_indices[0], log_queue_mp, cancel_event_mp,
+            viewpoint_indices=active_indices, progress_queue_mp=progress_queue_mp, task_manifest=task_manifest,
+            output_tail=output_tail
+        )
+
+        if cancel_event_mp.is_set():
+            report(active_indices, False, cancelled=True)
+            return
+
+        if returncode == 0:
+            if task_manifest is not None:
+                task_manifest.update(0, complete=True)
+            report(active_indices, True)
+        else:
+            _report_group_failure(report, log_queue_mp, worker_label, active_indices,
+                                  f"FFmpeg failed (code {returncode})", list(output_tail),
+                                  log_detail=f"Exit Code {returncode}")
+
+    except Exception as e: # Includes KeyError for missing keys in config or viewpoint_data
+        _report_group_exception(report, pending_indices, log_queue_mp, worker_label, e)
+    finally:
+        if task_manifest is not None:
+            task_manifest.flush()
+        _finish_budget_task(config)
+
+def build_seek_sample_command(config, filter_graph, output_labels, output_paths, frame_number, timestamp,
+                              allocation=None):
+    """
+    指定時刻へシークして1フレームだけデコードし、各視点の出力へ frame_number の番号で書き出すコマンドを生成します。
+    """
+    command = [config["ffmpeg_path"], "-y", "-nostdin", "-hide_banner", "-loglevel", "warning"]
+    if config["use_cuda"]:
+        command.extend(["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"])
+    command.extend(build_thread_input_args(allocation))
+    # Input-side -ss seeks to the keyframe before the target and decodes forward to it (accurate seek).
+    # Aim slightly early so that a timestamp taken from the frame itself never rounds past that frame.
+    seek_time = max(0.0, timestamp - SEEK_TIMESTAMP_TOLERANCE_SEC)
+    command.extend(["-ss", f"{seek_time:.6f}", "-i", config["input_file"], "-filter_complex", filter_graph])
+    codec_args = build_output_codec_args(config, allocation)
+    for output_label, output_path in zip(output_labels, output_paths):
+        command.extend(["-map", output_label, "-frames:v", "1", "-start_number", str(frame_number)])
+        command.extend(codec_args)
+        command.append(output_path)
+    return command
+
+def ffmpeg_seek_worker_process(task_idx, viewpoint_indices, viewpoints_data, config,
+                               log_queue_mp=None, progress_queue_mp=None, cancel_event_mp=None):
+    """
+    config["frame_samples"] の各時刻へシークし、その1フレームだけをデコードして複数視点へ書き出します。
+    デコード量は動画の長さではなく出力フレーム数 (とGOP長) に比例します。PNG/JPEG 出力専用です。
+
+    Args:
+        config (dict): ffmpeg_worker_process の設定に加えて frame_samples ((フレーム番号, 秒) のリスト) を使用します。
+        その他の引数は ffmpeg_multi_view_worker_process と同じです。
+    """
+    log_queue_mp, progress_queue_mp, cancel_event_mp = resolve_worker_channels(log_queue_mp, progress_queue_mp,
+                                                                               cancel_event_mp)
+    process_start_time = time.time()
+    worker_label = f"Seek group {task_idx + 1}{time_segment_label(config)}"
+    report, pending_indices = _make_group_reporter(viewpoint_indices, progress_queue_mp, process_start_time)
+    task_manifest = None
+    output_tail = _new_output_tail()
+
+    try:
+        _start_budget_task(config)
+        if config["output_format"] not in ["png", "jpeg"]:
+            log_queue_mp.put({"type": "log", "level": "ERROR",
+                              "message": f"{worker_label}: seek sampling supports image output only."})
+            report(viewpoint_indices, False, error_message="Seek sampling requires PNG/JPEG output.")
+            return
+        frame_samples = config.get("frame_samples") or []
+
+        active_indices, active_viewpoints, output_paths = _prepare_group_outputs(
+            viewpoint_indices, viewpoints_data, config, log_queue_mp, report)
+        if not active_indices:
+            return
+
+        # Sampling is done by seeking, so the decode chain must not thin frames again.
+        filter_graph, output_labels = build_multi_view_filter_graph(active_viewpoints, dict(config, frame_interval=0))
+        task_manifest = open_task_manifest(config, active_viewpoints)
+        for sample_position, (frame_number, timestamp) in enumerate(frame_samples):
+            if cancel_event_mp.is_set():
+                break
+            # Re-read the budget for every sample so that cores freed by finished workers are picked up.
+            allocation = task_thread_allocation(config, len(active_indices))
+            command = build_seek_sample_command(config, filter_graph, output_labels, output_paths,
+                                                frame_number, timestamp, allocation)
+            if sample_position == 0:
+                log_queue_mp.put({"type": "log", "level": "DEBUG",
+                                  "message": f"{worker_label} ({len(active_indices)} viewpoints, {len(frame_samples)} samples) first command: {' '.join(command)}"})
+            returncode = _run_ffmpeg_and_stream_output(
+                command, worker_label, active_indices[0], log_queue_mp, cancel_event_mp,
+                viewpoint_indices=active_indices, progress_queue_mp=progress_queue_mp, output_tail=output_tail
+            )
+            if cancel_event_mp.is_set():
+                break
+            if returncode != 0:
+                _report_group_failure(report, log_queue_mp, worker_label, active_indices,
+                                      f"FFmpeg failed at {timestamp:.3f}s (code {returncode})", list(output_tail),
+                                      log_detail=f"frame {frame_number} at {timestamp:.3f}s, Exit Code {returncode}")
+                return
+            if task_manifest is not None:
+                task_manifest.update(sample_position + 1)
+
+        if cancel_event_mp.is_set():
+            report(active_indices, False, cancelled=True)
+            return
+        if task_manifest is not None:
+            task_manifest.update(0, complete=True)
+        report(active_indices, True)
+
+    except Exception as e: # Includes KeyError for missing keys in config or viewpoint_data
+        _report_group_exception(report, pending_indices, log_queue_mp, worker_label, e)
+    finally:
+        if task_manifest is not None:
+            task_manifest.flush()
+        _finish_budget_task(config)
+
+def build_keyframe_command(config, filter_graph, output_labels, output_paths, allocation=None):
+    """
+    キーフレームだけをデコード (-skip_frame nokey) して各視点の出力へ書き出すコマンドを生成します。
+    """
+    command = [config["ffmpeg_path"], "-y", "-nostdin"]
+    command.extend(build_thread_input_args(allocation))
+    command.extend(["-skip_frame", "nokey"])
+    if config["use_cuda"]:
+        command.extend(["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"])
+    command.extend(["-i", config["input_file"], "-filter_complex", filter_graph])
+    codec_args = build_output_codec_args(config, allocation)
+    for output_label, output_path in zip(output_labels, output_paths):
+        # Keyframes are irregularly spaced; passthrough keeps the image2 muxer from duplicating frames to a constant rate.
+        command.extend(["-map", output_label] + passthrough_sync_args(config.get("ffmpeg_version")))
+        command.extend(codec_args)
+        command.append(output_path)
+    return command
+
+def ffmpeg_keyframe_worker_process(task_idx, viewpoint_indices, viewpoints_data, config,
+                                   log_queue_mp=None, progress_queue_mp=None, cancel_event_mp=None):
+    """
+    キーフレームだけをデコードし、通常と同じ v360 チェーンとフォルダ構成で複数視点へ書き出します (下見用の粗い画像セット)。
+    showinfo フィルターで各フレームの実時刻を取得し、frame_sampling.frame_times_path のファイルに記録します。
+    PNG/JPEG 出力専用です。引数は ffmpeg_multi_view_worker_process と同じです。
+    """
+    log_queue_mp, progress_queue_mp, cancel_event_mp = resolve_worker_channels(log_queue_mp, progress_queue_mp,
+                                                                               cancel_event_mp)
+    process_start_time = time.time()
+    worker_label = f"Keyframe group {task_idx + 1}"
+    report, pending_indices = _make_group_reporter(viewpoint_indices, progress_queue_mp, process_start_time)
+    frame_times = {}
+    output_tail = _new_output_tail()
+
+    def collect_frame_time(line):
+        frame_time = parse_showinfo_frame_time(line)
+        if frame_time is not None:
+            frame_times[frame_time[0]] = frame_time[1]
+
+    try:
+        _start_budget_task(config)
+        if config["output_format"] not in ["png", "jpeg"]:
+            log_queue_mp.put({"type": "log", "level": "ERROR",
+                              "message": f"{worker_label}: keyframe sampling supports image output only."})
+            report(viewpoint_indices, False, error_message="Keyframe sampling requires PNG/JPEG output.")
+            return
+
+        active_indices, active_viewpoints, output_paths = _prepare_group_outputs(
+            viewpoint_indices, viewpoints_data, config, log_queue_mp, report)
+        if not active_indices:
+            return
+
+        filter_graph, output_labels = build_multi_view_filter_graph(active_viewpoints, dict(config, frame_interval=0),
+                                                                    extra_decode_parts=["showinfo"])
+        command = build_keyframe_command(config, filter_graph, output_labels, output_paths,
+                                         task_thread_allocation(config, len(active_indices)))
+        log_queue_mp.put({"type": "log", "level": "DEBUG",
+                          "message": f"{worker_label} ({len(active_indices)} viewpoints) command: {' '.join(command)}"})
+        returncode = _run_ffmpeg_and_stream_output(
+            command, worker_label, active_indices[0], log_queue_mp, cancel_event_mp,
+            viewpoint_indices=active_indices, line_callback=collect_frame_time, progress_queue_mp=progress_queue_mp,
+            output_tail=output_tail
+        )
+
+        if cancel_event_mp.is_set():
+            report(active_indices, False, cancelled=True)
+            return
+        if returncode != 0:
+            _report_group_failure(report, log_queue_mp, worker_label, active_indices,
+                                  f"FFmpeg failed (code {returncode})", list(output_tail),
+                                  log_detail=f"Exit Code {returncode}")
+            return
+
+        times_path = frame_times_path(config)
+        try:
+            write_frame_times(times_path, list(frame_times.items()), FRAME_SAMPLING_KEYFRAMES, config["input_file"])
+            log_queue_mp.put({"type": "log", "level": "INFO",
+                              "message": f"{worker_label}: {len(frame_times)} keyframes extracted; timestamps written to {times_path}"})
+        except OSError as e:
             log_queue_mp.put({"type": "log", "level": "WARNING",
-                              "message": f"Worker {viewpoint_idx + 1} FFmpeg process still running in finally block, attempting kill."})
-            ffmpeg_process.kill()
-            ffmpeg_process.wait()
+                              "message": f"{worker_label}: could not write keyframe timestamps ({times_path}): {e}"})
+        report(active_indices, True)
+
+    except Exception as e: # Includes KeyError for missing keys in config or viewpoint_data
+        _report_group_exception(report, pending_indices, log_queue_mp, worker_label, e)
+    finally:
+        _finish_budget_task(config)
+
+def build_rawvideo_decode_command(config):
+    """
+    入力動画をデコードし、RGB24 の rawvideo として標準出力へ流す FFmpeg コマンドを生成します。
+    """
+    command = [config["ffmpeg_path"], "-nostdin", "-hide_banner"]
+    if config["use_cuda"]:
+        # Let FFmpeg download decoded frames to system memory; the remap runs on the CPU.
+        command.extend(["-hwaccel", "cuda"])
+    command.extend(["-i", config["input_file"]])
+    filter_parts = build_decode_filter_parts(dict(config, use_cuda=False))
+    filter_parts.append("format=rgb24")
+    command.extend(["-vf", ",".join(filter_parts), "-an", "-sn", "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1"])
+    return command
+
+def _rawvideo_frame_rate(config):
+    # Rate of the frames the remap backend pipes to each encoder (the decoder already thins by frame_interval).
+    input_fps = config.get("input_fps") or 0.0
+    frame_interval_val = config.get("frame_interval", 0)
+    if config["output_format"] in ["png", "jpeg"] and frame_interval_val > 1e-6:
+        input_fps = 1.0 / frame_interval_val
+    return input_fps if input_fps > 0 else 30.0
+
+def build_rawvideo_encode_command(config, output_path):
+    """
+    標準入力から RGB24 の rawvideo を受け取り、1視点分の出力を書き出す FFmpeg コマンドを生成します。
+    """
+    output_width, output_height = config["output_resolution"]
+    output_format = config["output_format"]
+    input_fps = _rawvideo_frame_rate(config)
+    command = [config["ffmpeg_path"], "-y", "-nostdin", "-hide_banner", "-loglevel", "error",
+               "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{output_width}x{output_height}",
+               "-framerate", f"{input_fps:.6f}", "-i", "pipe:0"]
+    if output_format == "jpeg":
+        command.extend(["-pix_fmt", "yuvj420p"])
+    elif output_format == "video":
+        command.extend(["-pix_fmt", "yuv420p"])
+    command.extend(build_output_codec_args(config))
+    command.append(output_path)
+    return command
+
+def _forward_pipe_lines(pipe, log_queue_mp, viewpoint_idx, viewpoint_indices, output_tail):
+    try:
+        for line_bytes in iter(pipe.readline, b''):
+            line_str = line_bytes.decode(encoding='utf-8', errors='replace')
+            _handle_output_line(log_queue_mp, line_str, viewpoint_idx, viewpoint_indices, output_tail)
+    except (OSError, ValueError):
+        pass # Pipe closed while the process was being torn down
+
+def _read_exact_into(stream, buffer_view):
+    total = 0
+    size = len(buffer_view)
+    while total < size:
+        read = stream.readinto(buffer_view[total:])
+        if not read:
+            break
+        total += read
+    return total
+
+class _DecoderFrameSource:
+    """
+    このプロセス内で FFmpeg デコーダーを起動し、フレームをパディングして返すフレームソース。
+    """
+
+    def __init__(self, config, worker_label, log_queue_mp, viewpoint_indices):
+        self.config = config
+        self.worker_label = worker_label
+        self.log_queue_mp = log_queue_mp
+        self.viewpoint_indices = viewpoint_indices
+        self.process = None
+        self.reader = None
+        self.frame = None
+        self.frame_view = None
+        self.padded = None
+        self.output_tail = _new_output_tail()
+
+    def start(self):
+        import numpy as np # Guarded by is_numpy_available() in the callers
+        input_width, input_height = self.config["input_resolution"]
+        self.frame = np.empty((input_height, input_width, 3), dtype=np.uint8)
+        self.frame_view = memoryview(self.frame).cast("B")
+        self.padded = np.empty(padded_frame_shape((input_width, input_height)), dtype=np.uint8)
+        decode_command = apply_ffmpeg_log_verbosity(build_rawvideo_decode_command(self.config))
+        self.log_queue_mp.put({"type": "log", "level": "DEBUG",
+                               "message": f"{self.worker_label} ({len(self.viewpoint_indices)} viewpoints) decoder command: {' '.join(decode_command)}"})
+        self.process = subprocess.Popen(decode_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        startupinfo=_get_hidden_startupinfo())
+        self.reader = threading.Thread(target=_forward_pipe_lines,
+                                       args=(self.process.stderr, self.log_queue_mp, self.viewpoint_indices[0],
+                                             self.viewpoint_indices, self.output_tail),
+                                       daemon=True)
+        self.reader.start()
+
+    def next_frame(self, cancel_event_mp): # pylint: disable=unused-argument
+        bytes_read = _read_exact_into(self.process.stdout, self.frame_view)
+        if bytes_read < len(self.frame_view):
+            if bytes_read:
+                self.log_queue_mp.put({"type": "log", "level": "WARNING",
+                                       "message": f"{self.worker_label}: incomplete trailing frame ({bytes_read} bytes) ignored."})
+            return None
+        return pad_equirect_frame(self.frame, out=self.padded)
+
+    def release(self):
+        pass
+
+    def stop(self, abandoned):
+        # abandoned: cancelled, or no view is reading any more; the decoder is stopped and its exit code ignored.
+        if abandoned and self.process.poll() is None:
+            self.process.terminate()
+        if self.process.stdout:
+            self.process.stdout.close()
+        try:
+            returncode = self.process.wait(timeout=5 if abandoned else None)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            returncode = self.process.wait()
+        self.reader.join(timeout=1) # Let the reader take the decoder's last lines into output_tail
+        if not abandoned and returncode != 0:
+            return f"FFmpeg decoder failed (code {returncode})"
+        return None
+
+    def kill(self):
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        if self.reader:
+            self.reader.join(timeout=1)
+
+class _RingFrameSource:
+    """
+    フレームサーバー (frame_server_decoder_process) が共有メモリに書いたフレームを、コピーせずに返すフレームソース。
+    """
+
+    def __init__(self, ring_layout, consumer_idx, condition):
+        self.ring_layout = ring_layout
+        self.consumer_idx = consumer_idx
+        self.condition = condition
+        self.ring = None
+        self.output_tail = _new_output_tail() # The decoder's output is in frame_server_decoder_process's log
+
+    def start(self):
+        self.ring = FrameRing.attach(self.ring_layout)
+
+    def next_frame(self, cancel_event_mp):
+        return self.ring.wait_for_frame(self.consumer_idx, self.condition, cancel_event_mp)
+
+    def release(self):
+        self.ring.release(self.consumer_idx, self.condition)
+
+    def stop(self, abandoned):
+        error_message = None
+        if not abandoned and self.ring.state == FRAME_RING_STATE_FAILED:
+            error_message = "Frame server decoder failed"
+        self.kill()
+        return error_message
+
+    def kill(self):
+        # Stop holding slots so the decoder is never blocked by a consumer that has gone away,
+        # including one that returned before start() (e.g. all of its output folders failed).
+        try:
+            if self.ring is None:
+                self.ring = FrameRing.attach(self.ring_layout)
+            self.ring.detach(self.consumer_idx, self.condition)
+        except Exception: # pylint: disable=broad-except
+            pass # Ring already gone (conversion ended or cancelled)
+        finally:
+            if self.ring is not None:
+                self.ring.close()
+                self.ring = None
+
+def _run_remap_views(worker_label, viewpoint_indices, viewpoints_data, config, frame_source,
+                     log_queue_mp, progress_queue_mp, cancel_event_mp):
+    """
+    frame_source から受け取ったパディング済みフレームにリマップテーブルを適用し、
+    視点ごとのFFmpegエンコーダーへ標準入力経由で渡します。結果は視点ごとの task_result として送られます。
+    """
+    process_start_time = time.time()
+    report, pending_indices = _make_group_reporter(viewpoint_indices, progress_queue_mp, process_start_time)
+    encoders = []
+    encoder_tails = []
+    reader_threads = []
+
+    try:
+        output_format = config["output_format"]
+        if config.get("output_mode", "standard") == "colmap_rig" and output_format == "video":
+            log_queue_mp.put({"type": "log", "level": "ERROR",
+                              "message": "COLMAP Rig mode does not support video output."})
+            report(viewpoint_indices, False, error_message="Invalid output format for COLMAP Rig.")
+            return
+        if not is_numpy_available():
+            log_queue_mp.put({"type": "log", "level": "ERROR",
+                              "message": f"{worker_label}: NumPy is not installed; the remap backend is unavailable."})
+            report(viewpoint_indices, False, error_message="NumPy is not installed.")
+            return
+        input_width, input_height = config.get("input_resolution") or (0, 0)
+        if input_width <= 1 or input_height <= 1:
+            log_queue_mp.put({"type": "log", "level": "ERROR",
+                              "message": f"{worker_label}: Input resolution is unknown; cannot build remap tables."})
+            report(viewpoint_indices, False, error_message="Unknown input resolution.")
+            return
+
+        interp = remap_interp_for(config["interp"])
+        if interp != config["interp"]:
+            log_queue_mp.put({"type": "log", "level": "DEBUG",
+                              "message": f"{worker_label}: interp '{config['interp']}' is approximated with '{interp}' by the remap backend."})
+
+        startupinfo = _get_hidden_startupinfo()
+        active_indices, active_viewpoints, output_paths = _prepare_group_outputs(
+            viewpoint_indices, viewpoints_data, config, log_queue_mp, report)
+        if not active_indices:
+            return
+        tables = []
+        for vp_idx, viewpoint_data, output_path in zip(active_indices, active_viewpoints, output_paths):
+            table_start_time = time.time()
+            table, cache_hit = load_or_build_remap_table(viewpoint_data, config["output_resolution"],
+                                                         (input_width, input_height), interp,
+                                                         cache_dir=config.get("remap_cache_dir"),
+                                                         max_cache_bytes=config.get("remap_cache_max_bytes"))
+            tables.append(table)
+            table_source = "loaded from cache" if cache_hit else "built"
+            log_queue_mp.put({"type": "log", "level": "DEBUG",
+                              "message": f"{worker_label}: remap table for viewpoint {vp_idx + 1} {table_source} in {time.time() - table_start_time:.2f}s"})
+            encode_command = apply_ffmpeg_log_verbosity(build_rawvideo_encode_command(config, output_path))
+            log_queue_mp.put({"type": "log", "level": "DEBUG",
+                              "message": f"{worker_label} encoder {vp_idx + 1} command: {' '.join(encode_command)}"})
+            encoder = subprocess.Popen(encode_command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.PIPE, startupinfo=startupinfo)
+            encoder_tail = _new_output_tail()
+            reader = threading.Thread(target=_forward_pipe_lines,
+                                      args=(encoder.stderr, log_queue_mp, vp_idx, [vp_idx], encoder_tail), daemon=True)
+            reader.start()
+            reader_threads.append(reader)
+            encoders.append(encoder)
+            encoder_tails.append(encoder_tail)
+
+        progress_tracker = PipedFrameProgressTracker(progress_queue_mp, worker_label, active_indices,
+                                                     _rawvideo_frame_rate(config))
+        frame_source.start()
+        failed_views = {}
+        frames_done = 0
+        while True:
+            if cancel_event_mp.is_set():
+                log_queue_mp.put({"type": "log", "level": "INFO", "message": f"{worker_label} processing cancelled."})
+                break
+            padded = frame_source.next_frame(cancel_event_mp)
+            if padded is None:
+                break
+            remapped = [None if position in failed_views else table.apply(padded)
+                        for position, table in enumerate(tables)]
+            padded = None
+            frame_source.release() # The remapped views are private copies; the input frame can be reused now
+            for position, (encoder, view) in enumerate(zip(encoders, remapped)):
+                if view is None:
+                    continue
+                try:
+                    encoder.stdin.write(view.tobytes())
+                    progress_tracker.add_frame(active_indices[position])
+                except (BrokenPipeError, OSError) as e:
+                    failed_views[position] = f"Encoder pipe closed: {e}"
+            frames_done += 1
+            progress_tracker.send()
+            if len(failed_views) == len(encoders):
+                break
+        progress_tracker.send(final=True)
+
+        for encoder in encoders:
+            try:
+                encoder.stdin.close()
+            except OSError:
+                pass
+        cancelled = cancel_event_mp.is_set()
+        if cancelled:
+            frame_source.stop(True)
+            for encoder in encoders:
+                if encoder.poll() is None:
+                    encoder.terminate()
+            for encoder in encoders:
+                try:
+                    encoder.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    encoder.kill()
+            report(active_indices, False, cancelled=True)
+            return
+
+        log_queue_mp.put({"type": "log", "level": "DEBUG",
+                          "message": f"{worker_label}: {frames_done} frames remapped for {len(active_indices)} viewpoints."})
+        # Encoders first: when they have all died the decoder fails on the broken pipe, and that exit code
+        # must not hide the encoders' own errors. The decoder failure only counts for views whose encoder was fine.
+        encoder_returncodes = [encoder.wait() for encoder in encoders]
+        source_error = frame_source.stop(len(failed_views) == len(encoders))
+        for position, (vp_idx, encoder_returncode) in enumerate(zip(active_indices, encoder_returncodes)):
+            reader_threads[position].join(timeout=1) # Let the reader take the encoder's last lines into its tail
+            error_tail = encoder_tails[position]
+            if encoder_returncode != 0:
+                error_message = f"FFmpeg encoder failed (code {encoder_returncode})"
+            elif position in failed_views:
+                error_message = failed_views[position]
+            else:
+                error_message = source_error
+                error_tail = frame_source.output_tail
+            if error_message:
+                _report_group_failure(report, log_queue_mp, worker_label, [vp_idx], error_message, list(error_tail))
+            else:
+                report([vp_idx], True)
+
+    except Exception as e: # Includes KeyError for missing keys in config or viewpoint_data
+        _report_group_exception(report, pending_indices, log_queue_mp, worker_label, e)
+    finally:
+        frame_source.kill() # Also releases a frame server slot claim when returning before the loop
+        for encoder in encoders:
+            if encoder.poll() is None:
+                log_queue_mp.put({"type": "log", "level": "WARNING",
+                                  "message": f"{worker_label} FFmpeg process still running in finally block, attempting kill."})
+                encoder.kill()
+                encoder.wait()
+        for reader in reader_threads:
+            reader.join(timeout=1)
+
+def ffmpeg_remap_worker_process(task_idx, viewpoint_indices, viewpoints_data, config,
+                                log_queue_mp=None, progress_queue_mp=None, cancel_event_mp=None):
+    """
+    NumPy リマップLUTバックエンドで複数視点を変換します。
+    1つのFFmpegでデコードした rawvideo フレームに、視点ごとに事前計算したリマップテーブルを適用し、
+    視点ごとのFFmpegエンコーダーへ標準入力経由で渡します。
+    結果は視点ごとの task_result として progress_queue_mp に送られます。
+
+    Args:
+        task_idx (int): デコードグループのインデックス (ログ表示用)。
+        viewpoint_indices (list): 各視点の全体インデックス。
+        viewpoints_data (list): 視点情報 (fov, pitch, yaw) のリスト。
+        config (dict): 変換設定。ffmpeg_worker_process の設定に加えて
+                       input_resolution (入力の幅, 高さ) と input_fps を使用します。
+        log_queue_mp (multiprocessing.Queue): ログメッセージ用キュー。
+        progress_queue_mp (multiprocessing.Queue): 進捗情報用キュー。
+        cancel_event_mp (multiprocessing.Event): キャンセル指示を検知するためのイベント。
+    """
+    log_queue_mp, progress_queue_mp, cancel_event_mp = resolve_worker_channels(log_queue_mp, progress_queue_mp,
+                                                                               cancel_event_mp)
+    worker_label = f"Remap group {task_idx + 1}"
+    frame_source = _DecoderFrameSource(config, worker_label, log_queue_mp, viewpoint_indices)
+    _run_remap_views(worker_label, viewpoint_indices, viewpoints_data, config, frame_source,
+                     log_queue_mp, progress_queue_mp, cancel_event_mp)
+
+def frame_server_consumer_process(consumer_idx, ring_layout, viewpoint_indices, viewpoints_data, config,
+                                  condition_mp=None, log_queue_mp=None, progress_queue_mp=None, cancel_event_mp=None):
+    """
+    フレームサーバーのコンシューマー。共有メモリのリングバッファからフレームを読み (コピーなし)、
+    担当する視点を再投影してエンコードします。ring_layout.consumer_count 個すべてが同時に動作している必要があります。
+
+    Args:
+        consumer_idx (int): コンシューマー番号 (0 から ring_layout["consumer_count"] - 1)。
+        ring_layout (dict): frame_server.FrameRing.create で作成したリングの layout。
+        condition_mp (multiprocessing.Condition): リングの待機/通知に使う Condition (省略時は init_worker_channels のもの)。
+        その他の引数は ffmpeg_remap_worker_process と同じです。
+    """
+    log_queue_mp, progress_queue_mp, cancel_event_mp = resolve_worker_channels(log_queue_mp, progress_queue_mp,
+                                                                               cancel_event_mp)
+    if condition_mp is None:
+        condition_mp = _worker_channels["frame_ring_condition"]
+    worker_label = f"Frame server worker {consumer_idx + 1}"
+    frame_source = _RingFrameSource(ring_layout, consumer_idx, condition_mp)
+    _run_remap_views(worker_label, viewpoint_indices, viewpoints_data, config, frame_source,
+                     log_queue_mp, progress_queue_mp, cancel_event_mp)
+
+def frame_server_decoder_process(ring_layout, config, condition_mp=None, log_queue_mp=None, cancel_event_mp=None):
+    """
+    フレームサーバーのプロデューサー。入力を1回だけ rawvideo としてデコードし、パディング済みフレームを
+    共有メモリのリングバッファへ書き込みます。空きスロットがない間は待機し、フレームを捨てることはありません。
+    結果の報告は各コンシューマーが視点ごとに行うため、このプロセスは task_result を送りません。
+    """
+    log_queue_mp, _, cancel_event_mp = resolve_worker_channels(log_queue_mp, None, cancel_event_mp)
+    if condition_mp is None:
+        condition_mp = _worker_channels["frame_ring_condition"]
+    worker_label = "Frame server decoder"
+    ring = None
+    decoder_process = None
+    reader = None
+    failed = True
+    try:
+        import numpy as np # The GUI only starts the frame server when NumPy is available
+        ring = FrameRing.attach(ring_layout)
+        input_width, input_height = config["input_resolution"]
+        frame = np.empty((input_height, input_width, 3), dtype=np.uint8)
+        frame_view = memoryview(frame).cast("B")
+        decode_command = apply_ffmpeg_log_verbosity(build_rawvideo_decode_command(config))
+        log_queue_mp.put({"type": "log", "level": "DEBUG",
+                          "message": f"{worker_label} command ({ring_layout['slots']} slots, {ring_layout['consumer_count']} consumers): {' '.join(decode_command)}"})
+        decoder_process = subprocess.Popen(decode_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                           startupinfo=_get_hidden_startupinfo())
+        reader = threading.Thread(target=_forward_pipe_lines,
+                                  args=(decoder_process.stderr, log_queue_mp, -1, [], _new_output_tail()), daemon=True)
+        reader.start()
+
+        frames_done = 0
+        wait_seconds = 0.0
+        stopped_early = False
+        while True:
+            bytes_read = _read_exact_into(decoder_process.stdout, frame_view)
+            if bytes_read < len(frame_view):
+                if bytes_read:
+                    log_queue_mp.put({"type": "log", "level": "WARNING",
+                                      "message": f"{worker_label}: incomplete trailing frame ({bytes_read} bytes) ignored."})
+                break
+            wait_start_time = time.time()
+            slot = ring.wait_for_free_slot(condition_mp, cancel_event_mp)
+            wait_seconds += time.time() - wait_start_time
+            if slot is None: # Cancelled, or every consumer has stopped reading
+                stopped_early = True
+                break
+            pad_equirect_frame(frame, out=slot)
+            del slot
+            ring.publish(condition_mp)
+            frames_done += 1
+
+        if stopped_early and decoder_process.poll() is None:
+            decoder_process.terminate()
+        decoder_process.stdout.close()
+        try:
+            returncode = decoder_process.wait(timeout=5 if stopped_early else None)
+        except subprocess.TimeoutExpired:
+            decoder_process.kill()
+            returncode = decoder_process.wait()
+        failed = not stopped_early and returncode != 0
+        if failed:
+            log_queue_mp.put({"type": "log", "level": "ERROR",
+                              "message": f"FFmpeg error ({worker_label}): decoder failed (code {returncode})"})
+        log_queue_mp.put({"type": "log", "level": "DEBUG",
+                          "message": f"{worker_label}: {frames_done} frames served, {wait_seconds:.1f}s waiting for free slots."})
+    except Exception as e: # Consumers must be released even when the decoder cannot start
+        log_queue_mp.put({"type": "log", "level": "CRITICAL", "message": f"{worker_label} encountered an exception: {e}"})
+        log_queue_mp.put({"type": "log", "level": "DEBUG", "message": traceback.format_exc()})
+    finally:
+        if decoder_process and decoder_process.poll() is None:
+            decoder_process.kill()
+            decoder_process.wait()
+        if reader:
+            reader.join(timeout=1)
+        if ring is not None:
+            ring.finish(condition_mp, failed=failed)
+            ring.close()
@@ -0,0 +1,215 @@
+# frame_dedup.py
+# COLMAP Rig 出力から、ほぼ同じ内容のリグフレーム (全カメラ分) を取り除くヘルパー
+# 基準カメラ (cam01) の画像の知覚ハッシュを、直前に残したフレームと比較します。
+
+import csv
+import os
+import subprocess
+
+from colmap_rig_export import COLMAP_IMAGES_DIRNAME, DEFAULT_RIG_NAME
+from ffmpeg_version import passthrough_sync_args
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; only the duplicate suppression pass needs it
+    np = None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+HASH_METHOD_PHASH = "phash"
+HASH_METHOD_DHASH = "dhash"
+DEFAULT_HASH_METHOD = HASH_METHOD_PHASH
+HASH_DECODE_SIZE = 32 # Reference images are decoded to 32x32 grayscale for hashing
+HASH_BITS_SIDE = 8 # 8x8 = 64-bit hashes
+DEFAULT_DUPLICATE_HAMMING_THRESHOLD = 6
+DUPLICATE_FRAMES_DIRNAME = "removed_duplicates"
+DUPLICATE_REPORT_FILENAME = "duplicate_frames_report.csv"
+_HASH_INPUT_LIST_FILENAME = ".duplicate_hash_inputs.ffconcat"
+
+_dct_matrix_cache = {}
+
+
+def is_duplicate_suppression_available():
+    return np is not None
+
+
+def _dct_matrix(size):
+    matrix = _dct_matrix_cache.get(size)
+    if matrix is None:
+        k = np.arange(size, dtype=np.float64)[:, None]
+        n = np.arange(size, dtype=np.float64)[None, :]
+        matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size))
+        _dct_matrix_cache[size] = matrix
+    return matrix
+
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.astype(np.uint8).ravel()).tobytes(), "big")
+
+
+def perceptual_hash(gray):
+    """
+    pHash: 32x32 グレースケール画像の2次元DCTの低周波 8x8 を中央値で2値化した64ビット値。
+    """
+    matrix = _dct_matrix(gray.shape[0])
+    coefficients = matrix @ gray.astype(np.float64) @ matrix.T
+    low = coefficients[:HASH_BITS_SIDE, :HASH_BITS_SIDE]
+    median = np.median(low.ravel()[1:]) # The DC term only reflects overall brightness
+    return _bits_to_int(low > median)
+
+
+def difference_hash(gray):
+    """
+    dHash: 9x8 に縮小した画像の横方向の明暗差の符号による64ビット値。
+    """
+    height, width = gray.shape
+    rows = (np.arange(HASH_BITS_SIDE) * height) // HASH_BITS_SIDE
+    cols = (np.arange(HASH_BITS_SIDE + 1) * (width - 1)) // HASH_BITS_SIDE
+    small = gray[np.ix_(rows, cols)].astype(np.int16)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def hamming_distance(hash_a, hash_b):
+    return bin(hash_a ^ hash_b).count("1")
+
+
+def rig_camera_dirs(rig_folder, rig_name=DEFAULT_RIG_NAME):
+    """
+    リグのカメラフォルダ (images/<rig>/camXX) を名前順で返します。先頭が基準カメラです。
+    """
+    rig_images_dir = os.path.join(rig_folder, COLMAP_IMAGES_DIRNAME, rig_name)
+    if not os.path.isdir(rig_images_dir):
+        return []
+    return [os.path.join(rig_images_dir, name) for name in sorted(os.listdir(rig_images_dir))
+            if os.path.isdir(os.path.join(rig_images_dir, name))]
+
+
+def _reference_image_names(reference_dir):
+    return sorted(name for name in os.listdir(reference_dir) if name.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def _write_hash_input_list(list_path, reference_dir, image_names):
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("ffconcat version 1.0\n")
+        for name in image_names:
+            path = os.path.abspath(os.path.join(reference_dir, name)).replace("\\", "/").replace("'", "'\\''")
+            f.write(f"file '{path}'\n")
+
+
+def build_hash_decode_command(ffmpeg_path, list_path, ffmpeg_version=None):
+    # One FFmpeg process streams every reference image as a tiny grayscale frame.
+    return ([ffmpeg_path, "-nostdin", "-hide_banner", "-loglevel", "error",
+             "-f", "concat", "-safe", "0", "-i", list_path,
+             "-vf", f"scale={HASH_DECODE_SIZE}:{HASH_DECODE_SIZE}:flags=area,format=gray"]
+            + passthrough_sync_args(ffmpeg_version) + ["-an", "-f", "rawvideo", "-pix_fmt", "gray", "pipe:1"])
+
+
+def suppress_duplicate_frames(ffmpeg_path, rig_folder, hamming_threshold=DEFAULT_DUPLICATE_HAMMING_THRESHOLD,
+                              rig_name=DEFAULT_RIG_NAME, hash_method=DEFAULT_HASH_METHOD,
+                              should_stop=None, progress_callback=None, startupinfo=None, ffmpeg_version=None):
+    """
+    基準カメラの各フレームのハッシュを直前に残したフレームと比較し、
+    ハミング距離が hamming_threshold 以下のフレームを全カメラ分まとめて removed_duplicates フォルダへ移動します。
+
+    画像は FFmpeg から1枚ずつ受け取り、保持する画像データは直前に残したフレームのハッシュだけです (フレーム数によらず一定)。
+    判定結果はその場でレポート (CSV) に書き、FFmpeg の終了後にレポートを読み直して移動します
+    (デコード中のファイルを動かさないため)。
+
+    Args:
+        should_stop (callable): True を返すと中断します (ファイルは移動しません)。
+        progress_callback (callable): progress_callback(確認済みフレーム数, 全フレーム数) を呼びます。
+        ffmpeg_version (tuple): parse_ffmpeg_version の値。5.1 より古い場合は -vsync を使います。
+
+    Returns:
+        dict or None: {"checked", "removed", "report_path", "removed_dir"}。中断時は None。
+
+    Raises:
+        RuntimeError: NumPy がない場合、基準カメラが見つからない場合、FFmpeg が失敗した場合。
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for duplicate frame suppression.")
+    camera_dirs = rig_camera_dirs(rig_folder, rig_name)
+    if not camera_dirs:
+        raise RuntimeError(f"No camera folders found under {os.path.join(rig_folder, COLMAP_IMAGES_DIRNAME, rig_name)}")
+    reference_dir = camera_dirs[0]
+    image_names = _reference_image_names(reference_dir)
+    report_path = os.path.join(rig_folder, DUPLICATE_REPORT_FILENAME)
+    removed_dir = os.path.join(rig_folder, DUPLICATE_FRAMES_DIRNAME, rig_name)
+    if len(image_names) < 2:
+        return {"checked": len(image_names), "removed": 0, "report_path": None, "removed_dir": removed_dir}
+
+    compute_hash = difference_hash if hash_method == HASH_METHOD_DHASH else perceptual_hash
+    list_path = os.path.join(rig_folder, _HASH_INPUT_LIST_FILENAME)
+    _write_hash_input_list(list_path, reference_dir, image_names)
+    frame_bytes = HASH_DECODE_SIZE * HASH_DECODE_SIZE
+    checked_count = 0
+    removed_count = 0
+    cancelled = False
+    process = subprocess.Popen(build_hash_decode_command(ffmpeg_path, list_path, ffmpeg_version),
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, startupinfo=startupinfo)
+    try:
+        with open(report_path, "w", encoding="utf-8", newline="") as report_file:
+            writer = csv.writer(report_file)
+            writer.writerow(["removed_frame", "kept_frame", "hamming_distance", "hash_method", "threshold"])
+            kept_name, kept_hash = None, None
+            for name in image_names:
+                if should_stop is not None and should_stop():
+                    cancelled = True
+                    break
+                data = process.stdout.read(frame_bytes)
+                if len(data) < frame_bytes:
+                    break
+                frame_hash = compute_hash(np.frombuffer(data, dtype=np.uint8).reshape(HASH_DECODE_SIZE, HASH_DECODE_SIZE))
+                distance = hamming_distance(frame_hash, kept_hash) if kept_hash is not None else None
+                if distance is not None and distance <= hamming_threshold:
+                    writer.writerow([name, kept_name, distance, hash_method, hamming_threshold])
+                    removed_count += 1
+                else:
+                    kept_name, kept_hash = name, frame_hash
+                checked_count += 1
+                if progress_callback is not None:
+                    progress_callback(checked_count, len(image_names))
+        if cancelled:
+            process.terminate()
+        else:
+            stderr_text = process.communicate()[1].decode(encoding="utf-8", errors="replace").strip()
+            if process.returncode != 0:
+                raise RuntimeError(f"FFmpeg failed (code {process.returncode}): {stderr_text}")
+            if checked_count != len(image_names):
+                raise RuntimeError(f"FFmpeg decoded fewer images than expected ({checked_count}/{len(image_names)}).")
+    except BaseException:
+        _remove_quietly(report_path)
+        raise
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        _remove_quietly(list_path)
+    if cancelled:
+        _remove_quietly(report_path)
+        return None
+
+    _move_reported_frames(report_path, camera_dirs, removed_dir)
+    return {"checked": len(image_names), "removed": removed_count, "report_path": report_path,
+            "removed_dir": removed_dir}
+
+
+def _move_reported_frames(report_path, camera_dirs, removed_dir):
+    # Every camera folder uses the same file name for a rig frame.
+    with open(report_path, "r", encoding="utf-8", newline="") as report_file:
+        reader = csv.reader(report_file)
+        next(reader, None)
+        for row in reader:
+            for camera_dir in camera_dirs:
+                source_path = os.path.join(camera_dir, row[0])
+                if not os.path.isfile(source_path):
+                    continue
+                target_dir = os.path.join(removed_dir, os.path.basename(camera_dir))
+                os.makedirs(target_dir, exist_ok=True)
+                os.replace(source_path, os.path.join(target_dir, row[0]))
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
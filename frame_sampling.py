@@ -0,0 +1,385 @@
+# frame_sampling.py
+# 画像出力 (PNG/JPEG) で、入力動画のどのフレームを書き出すかを決めるヘルパー
+
+import json
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+
+from colmap_rig_export import colmap_rig_root
+from ffmpeg_version import passthrough_sync_args
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; only the analysis-based sampling modes need it
+    np = None
+
+FRAME_SAMPLING_FPS = "fps"
+FRAME_SAMPLING_SEEK = "seek"
+FRAME_SAMPLING_KEYFRAMES = "keyframes"
+FRAME_SAMPLING_SHARPEST = "sharpest"
+FRAME_SAMPLING_MOTION = "motion"
+FRAME_SAMPLING_MODES = (
+    FRAME_SAMPLING_FPS,
+    FRAME_SAMPLING_SEEK,
+    FRAME_SAMPLING_KEYFRAMES,
+    FRAME_SAMPLING_SHARPEST,
+    FRAME_SAMPLING_MOTION,
+)
+# Modes that extract an explicit list of (frame number, timestamp) samples with the seek worker
+SEEK_BASED_FRAME_SAMPLINGS = (FRAME_SAMPLING_SEEK, FRAME_SAMPLING_SHARPEST, FRAME_SAMPLING_MOTION)
+# Modes that need the frame analysis pass before extraction
+ANALYSIS_FRAME_SAMPLINGS = (FRAME_SAMPLING_SHARPEST, FRAME_SAMPLING_MOTION)
+DEFAULT_FRAME_SAMPLING = FRAME_SAMPLING_FPS
+FIRST_FRAME_NUMBER = 1 # Same as the image2 muxer default used by the fps filter path
+FRAME_TIMES_FILE_SUFFIX = "_frame_times.json"
+
+FRAME_ANALYSIS_FILE_SUFFIX = ".frame_analysis.json"
+FRAME_ANALYSIS_VERSION = 1
+FRAME_METRIC_SHARPNESS = "sharpness"
+FRAME_METRIC_MOTION = "motion"
+FRAME_ANALYSIS_METRICS = (FRAME_METRIC_SHARPNESS, FRAME_METRIC_MOTION) # Column order after [index, time]
+ANALYSIS_FRAME_WIDTH = 512 # Downscaled equirect used for scoring (2:1)
+ANALYSIS_FRAME_HEIGHT = ANALYSIS_FRAME_WIDTH // 2
+ANALYSIS_PROGRESS_INTERVAL_SEC = 5.0
+MOTION_BLOCK_SIZE = 4 # Motion is measured on a 128x64 block average of the analysis frame
+MOTION_NOISE_FLOOR = 0.5 # Per-frame difference (gray levels) treated as sensor/compression noise
+DEFAULT_MOTION_THRESHOLD = 20.0 # Accumulated motion (gray levels above the noise floor) between emitted frames
+DEFAULT_MOTION_MAX_INTERVAL_SEC = 5.0 # Emit a frame at least this often even when standing still (0 = no limit)
+
+_SHOWINFO_FRAME_RE = re.compile(r"\bn:\s*(\d+)\b.*?\bpts_time:\s*(-?[0-9.]+(?:e[-+]?[0-9]+)?)")
+
+
+def plan_interval_samples(duration, frame_interval):
+    """
+    fps フィルター (fps=1/frame_interval) と同じ時刻・同じ番号のサンプル一覧を返します。
+
+    Returns:
+        list: (フレーム番号, 秒) のタプルのリスト。番号は build_frame_filename_pattern などの %05d に入る値です。
+    """
+    if duration <= 0 or frame_interval <= 1e-6:
+        return []
+    samples = []
+    sample_idx = 0
+    while True:
+        timestamp = sample_idx * frame_interval
+        if timestamp >= duration:
+            break
+        samples.append((FIRST_FRAME_NUMBER + sample_idx, round(timestamp, 6)))
+        sample_idx += 1
+    return samples
+
+
+def parse_showinfo_frame_time(line):
+    """
+    showinfo フィルターのフレーム行から (出力フレーム番号, 秒) を取り出します。該当しない行は None。
+    """
+    match = _SHOWINFO_FRAME_RE.search(line)
+    if not match:
+        return None
+    return FIRST_FRAME_NUMBER + int(match.group(1)), float(match.group(2))
+
+
+def frame_times_path(config):
+    """
+    書き出したフレームの実時刻を記録するファイルのパスを返します。
+    COLMAP Rig では colmap_rig フォルダにセッション名で、標準モードでは出力フォルダに入力名で保存します。
+    """
+    output_folder = config["output_folder"]
+    if config.get("output_mode", "standard") == "colmap_rig":
+        session_prefix = config.get("colmap_session_prefix") or "session"
+        return os.path.join(colmap_rig_root(output_folder), f"{session_prefix}{FRAME_TIMES_FILE_SUFFIX}")
+    base_input_name = os.path.splitext(os.path.basename(config["input_file"]))[0]
+    return os.path.join(output_folder, f"{base_input_name}{FRAME_TIMES_FILE_SUFFIX}")
+
+
+def write_frame_times(path, frame_times, sampling, input_file):
+    """
+    フレーム番号と実時刻の対応を JSON で保存します。複数のワーカーが同じ内容を書く場合があるため、置き換えは atomic に行います。
+
+    Args:
+        frame_times (list): (フレーム番号, 秒) のタプルのリスト。
+    """
+    payload = {
+        "input_file": os.path.abspath(input_file),
+        "sampling": sampling,
+        "frames": [{"frame": frame_number, "time": round(timestamp, 6)}
+                   for frame_number, timestamp in sorted(frame_times)],
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+# --- Frame analysis (sharpness / motion) ---
+
+def is_frame_analysis_available():
+    return np is not None
+
+
+def frame_analysis_sidecar_path(input_file, output_folder):
+    # Kept in the output folder: the input's folder may be read-only or shared. Later runs into the same folder
+    # (other intervals, other sampling modes) reuse it.
+    base_input_name = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(output_folder, base_input_name + FRAME_ANALYSIS_FILE_SUFFIX)
+
+
+def _input_signature(input_file):
+    stat = os.stat(input_file)
+    return {"input_size": stat.st_size, "input_mtime": int(stat.st_mtime)}
+
+
+def load_frame_analysis(input_file, output_folder, required_metrics):
+    """
+    出力フォルダのサイドカーファイルから解析結果を読み込みます。別の入力ファイルのものや入力ファイルが変わっている場合、
+    required_metrics の値が揃っていない場合は None を返します。
+    """
+    path = frame_analysis_sidecar_path(input_file, output_folder)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            analysis = json.load(f)
+        signature = _input_signature(input_file)
+    except (OSError, ValueError):
+        return None
+    if analysis.get("version") != FRAME_ANALYSIS_VERSION or analysis.get("analysis_width") != ANALYSIS_FRAME_WIDTH:
+        return None
+    if analysis.get("input_file") != os.path.abspath(input_file):
+        return None # Another clip of the same name written to this output folder
+    if any(analysis.get(key) != value for key, value in signature.items()):
+        return None
+    frames = analysis.get("frames") or []
+    if not frames or any(metric not in analysis.get("metrics", []) for metric in required_metrics):
+        return None
+    return analysis
+
+
+def save_frame_analysis(input_file, output_folder, analysis):
+    path = frame_analysis_sidecar_path(input_file, output_folder)
+    os.makedirs(output_folder, exist_ok=True)
+    analysis = dict(analysis, version=FRAME_ANALYSIS_VERSION, analysis_width=ANALYSIS_FRAME_WIDTH,
+                    input_file=os.path.abspath(input_file), **_input_signature(input_file))
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(analysis, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+    return path
+
+
+def laplacian_variance(gray):
+    """
+    グレースケール画像のラプラシアン分散 (大きいほどシャープ)。極付近の引き伸ばされた行は除外します。
+    """
+    height = gray.shape[0]
+    band = gray[height // 6: height - height // 6].astype(np.float32)
+    laplacian = (band[1:-1, :-2] + band[1:-1, 2:] + band[:-2, 1:-1] + band[2:, 1:-1]
+                 - 4.0 * band[1:-1, 1:-1])
+    return float(laplacian.var())
+
+
+def motion_thumbnail(gray):
+    """
+    フレーム差分用の縮小画像 (MOTION_BLOCK_SIZE 四方の平均) を作ります。極付近の行は除外します。
+    """
+    height, width = gray.shape
+    band = gray[height // 6: height - height // 6]
+    rows = band.shape[0] // MOTION_BLOCK_SIZE * MOTION_BLOCK_SIZE
+    cols = width // MOTION_BLOCK_SIZE * MOTION_BLOCK_SIZE
+    blocks = band[:rows, :cols].reshape(rows // MOTION_BLOCK_SIZE, MOTION_BLOCK_SIZE,
+                                        cols // MOTION_BLOCK_SIZE, MOTION_BLOCK_SIZE)
+    return blocks.mean(axis=(1, 3), dtype=np.float32)
+
+
+def frame_difference(previous_thumbnail, thumbnail):
+    # Mean absolute difference in gray levels; 0 for the first frame.
+    if previous_thumbnail is None:
+        return 0.0
+    return float(np.abs(thumbnail - previous_thumbnail).mean())
+
+
+def build_analysis_decode_command(ffmpeg_path, input_file, ffmpeg_version=None):
+    # showinfo runs after the downscale so its per-frame checksums stay cheap.
+    return ([ffmpeg_path, "-nostdin", "-hide_banner", "-i", input_file,
+             "-vf", f"scale={ANALYSIS_FRAME_WIDTH}:{ANALYSIS_FRAME_HEIGHT}:flags=area,format=gray,showinfo"]
+            + passthrough_sync_args(ffmpeg_version) + ["-an", "-sn", "-f", "rawvideo", "-pix_fmt", "gray", "pipe:1"])
+
+
+def analyze_frames(ffmpeg_path, input_file, should_stop=None, progress_callback=None, startupinfo=None,
+                   ffmpeg_version=None):
+    """
+    入力を縮小グレースケールで1回だけデコードし、全フレームのシャープネスと動き量 (直前フレームとの差分) を計算します。
+
+    Args:
+        should_stop (callable): True を返すと解析を中断します (None を返します)。
+        progress_callback (callable): progress_callback(解析済みフレーム数, 直近の時刻) を定期的に呼びます。
+        ffmpeg_version (tuple): parse_ffmpeg_version の値。5.1 より古い場合は -vsync を使います。
+
+    Returns:
+        dict or None: {"metrics": [...], "frames": [[index, time, sharpness, motion], ...]}。中断時は None。
+
+    Raises:
+        RuntimeError: FFmpeg が失敗した場合。
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for frame analysis.")
+    command = build_analysis_decode_command(ffmpeg_path, input_file, ffmpeg_version)
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, startupinfo=startupinfo)
+    frame_times = queue.Queue()
+    stderr_tail = []
+
+    def read_stderr():
+        for line_bytes in iter(process.stderr.readline, b''):
+            line = line_bytes.decode(encoding="utf-8", errors="replace")
+            frame_time = parse_showinfo_frame_time(line)
+            if frame_time is not None:
+                frame_times.put(frame_time[1])
+            else:
+                stderr_tail.append(line.strip())
+                del stderr_tail[:-20]
+
+    reader = threading.Thread(target=read_stderr, daemon=True)
+    reader.start()
+    frame_bytes = ANALYSIS_FRAME_WIDTH * ANALYSIS_FRAME_HEIGHT
+    frames = []
+    previous_thumbnail = None
+    last_progress_time = time.time()
+    try:
+        while True:
+            if should_stop is not None and should_stop():
+                process.terminate()
+                return None
+            data = process.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                break
+            gray = np.frombuffer(data, dtype=np.uint8).reshape(ANALYSIS_FRAME_HEIGHT, ANALYSIS_FRAME_WIDTH)
+            try:
+                timestamp = frame_times.get(timeout=10)
+            except queue.Empty:
+                raise RuntimeError("FFmpeg did not report frame timestamps (showinfo).") from None
+            thumbnail = motion_thumbnail(gray)
+            motion = frame_difference(previous_thumbnail, thumbnail)
+            previous_thumbnail = thumbnail
+            frames.append([len(frames), round(timestamp, 6), round(laplacian_variance(gray), 3), round(motion, 3)])
+            if progress_callback is not None and time.time() - last_progress_time >= ANALYSIS_PROGRESS_INTERVAL_SEC:
+                last_progress_time = time.time()
+                progress_callback(len(frames), timestamp)
+        returncode = process.wait()
+        if returncode != 0:
+            raise RuntimeError(f"FFmpeg failed (code {returncode}): {' / '.join(stderr_tail[-3:])}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        reader.join(timeout=1)
+    return {"metrics": list(FRAME_ANALYSIS_METRICS), "frames": frames}
+
+
+def analysis_metric_values(analysis, metric):
+    """
+    解析結果から1つの指標を取り出します。
+
+    Returns:
+        list: [index, time, 値] のリスト。
+    """
+    column = 2 + analysis["metrics"].index(metric)
+    return [[frame[0], frame[1], frame[column]] for frame in analysis["frames"]]
+
+
+def select_sharpest_per_window(frames, frame_interval):
+    """
+    frame_interval 秒ごとの区間から最もシャープなフレームを1枚ずつ選びます。
+    区間 k のフレームには一定間隔抽出と同じ番号 (k + 1) を付けます。
+
+    Args:
+        frames (list): analysis_metric_values(analysis, FRAME_METRIC_SHARPNESS) の結果。
+
+    Returns:
+        list: (フレーム番号, 秒, 元フレーム番号, シャープネス) のタプルのリスト。
+    """
+    if frame_interval <= 1e-6:
+        return []
+    best_per_window = {}
+    for frame in frames:
+        source_index, timestamp, sharpness = frame[0], frame[1], frame[2]
+        window = int(max(0.0, timestamp) // frame_interval)
+        best = best_per_window.get(window)
+        if best is None or sharpness > best[3]:
+            best_per_window[window] = (FIRST_FRAME_NUMBER + window, timestamp, source_index, sharpness)
+    return [best_per_window[window] for window in sorted(best_per_window)]
+
+
+def select_motion_adaptive(frames, motion_threshold, min_interval, max_interval):
+    """
+    累積した動き量が motion_threshold を超えたフレームを選びます (静止している区間は間引かれます)。
+    選ぶ間隔は min_interval 秒以上、max_interval 秒以下 (0 以下なら上限なし) です。先頭フレームは常に選びます。
+    番号は選んだ順に FIRST_FRAME_NUMBER からの連番です。
+
+    Args:
+        frames (list): analysis_metric_values(analysis, FRAME_METRIC_MOTION) の結果。
+
+    Returns:
+        list: (フレーム番号, 秒, 元フレーム番号, 累積動き量) のタプルのリスト。
+    """
+    chosen = []
+    accumulated = 0.0
+    last_time = None
+    for source_index, timestamp, motion in frames:
+        if last_time is not None:
+            accumulated += max(0.0, motion - MOTION_NOISE_FLOOR)
+            elapsed = timestamp - last_time
+            if elapsed < min_interval - 1e-6:
+                continue
+            if accumulated < motion_threshold and (max_interval <= 0 or elapsed < max_interval - 1e-6):
+                continue
+        chosen.append((FIRST_FRAME_NUMBER + len(chosen), timestamp, source_index, round(accumulated, 3)))
+        accumulated = 0.0
+        last_time = timestamp
+    return chosen
+
+
+def plan_analysis_samples(ffmpeg_path, input_file, output_folder, frame_sampling, frame_interval,
+                          motion_threshold=DEFAULT_MOTION_THRESHOLD, motion_max_interval=DEFAULT_MOTION_MAX_INTERVAL_SEC,
+                          should_stop=None, progress_callback=None, startupinfo=None, ffmpeg_version=None):
+    """
+    解析ベースのフレーム抽出 (ANALYSIS_FRAME_SAMPLINGS) のサンプル一覧を作成します。
+    出力フォルダのサイドカーに有効な解析結果があれば解析を省略し、選んだフレームもサイドカーに記録します。
+
+    Args:
+        frame_interval (float): sharpest では区間の長さ、motion では最小間隔 (秒)。
+        motion_threshold (float): motion で次のフレームを選ぶ累積動き量。
+        motion_max_interval (float): motion の最大間隔 (秒)。0 以下なら上限なし。
+
+    Returns:
+        tuple: (サンプル一覧 [(フレーム番号, 秒), ...] または中断時 None, サイドカーを再利用したか, サイドカーのパス または None)
+    """
+    metric = FRAME_METRIC_MOTION if frame_sampling == FRAME_SAMPLING_MOTION else FRAME_METRIC_SHARPNESS
+    analysis = load_frame_analysis(input_file, output_folder, [metric])
+    from_cache = analysis is not None
+    if analysis is None:
+        analysis = analyze_frames(ffmpeg_path, input_file, should_stop=should_stop,
+                                  progress_callback=progress_callback, startupinfo=startupinfo,
+                                  ffmpeg_version=ffmpeg_version)
+        if analysis is None:
+            return None, False, None
+    frames = analysis_metric_values(analysis, metric)
+    if frame_sampling == FRAME_SAMPLING_MOTION:
+        chosen = select_motion_adaptive(frames, motion_threshold, frame_interval, motion_max_interval)
+        selection = {"motion_threshold": motion_threshold, "min_interval": frame_interval,
+                     "max_interval": motion_max_interval}
+    else:
+        chosen = select_sharpest_per_window(frames, frame_interval)
+        selection = {"frame_interval": frame_interval}
+    selection["chosen"] = [{"frame": frame_number, "source_index": source_index, "time": timestamp, "score": score}
+                           for frame_number, timestamp, source_index, score in chosen]
+    selections = dict(analysis.get("selections") or {})
+    selections[frame_sampling] = selection
+    analysis["selections"] = selections
+    try:
+        sidecar_path = save_frame_analysis(input_file, output_folder, analysis)
+    except OSError:
+        sidecar_path = None # Extraction still works; the next run analyzes again
+    return [(frame_number, timestamp) for frame_number, timestamp, _, _ in chosen], from_cache, sidecar_path
@@ -0,0 +1,172 @@
+# frame_server.py
+# 1回のデコード結果を複数の再投影ワーカーへ配る共有メモリのリングバッファ
+# プロデューサー (デコーダー) 1つと、全フレームを受け取るコンシューマー (再投影/エンコード) 複数で使用します。
+
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; only the NumPy LUT backend uses the frame server
+    np = None
+
+FRAME_RING_STATE_RUNNING = 0
+FRAME_RING_STATE_EOF = 1
+FRAME_RING_STATE_FAILED = 2
+FRAME_RING_DETACHED = 2 ** 62 # Written to a consumer's counter when it stops reading, so it no longer holds slots
+FRAME_RING_WAIT_TIMEOUT_SEC = 0.5 # Waiters re-check cancellation at this interval
+_HEADER_FIXED_FIELDS = 2 # frames_written, state
+_HEADER_ITEM_BYTES = 8
+_SLOT_ALIGNMENT = 64
+
+
+def frame_ring_layout(input_size, buffer_bytes, consumer_count):
+    """
+    リングバッファの構成を計算します。スロットはパディング済みフレーム (pad_equirect_frame) 1枚分で、
+    スロット数は buffer_bytes に収まる数です (最低1)。
+
+    Returns:
+        dict: Pool の引数としてそのまま渡せる (pickle 可能な) 構成情報。name は create_frame_ring で設定されます。
+    """
+    input_width, input_height = int(input_size[0]), int(input_size[1])
+    slot_shape = (input_height + 1, input_width + 1, 3)
+    frame_bytes = slot_shape[0] * slot_shape[1] * slot_shape[2]
+    slot_bytes = -(-frame_bytes // _SLOT_ALIGNMENT) * _SLOT_ALIGNMENT
+    header_bytes = -(-((_HEADER_FIXED_FIELDS + consumer_count) * _HEADER_ITEM_BYTES) // _SLOT_ALIGNMENT) * _SLOT_ALIGNMENT
+    slots = max(1, int(buffer_bytes) // slot_bytes)
+    return {
+        "name": None,
+        "slot_shape": slot_shape,
+        "slot_bytes": slot_bytes,
+        "slots": slots,
+        "header_bytes": header_bytes,
+        "consumer_count": int(consumer_count),
+        "total_bytes": header_bytes + slots * slot_bytes,
+    }
+
+
+class FrameRing:
+    """
+    共有メモリ上のフレームリング。
+
+    ヘッダー (int64) は [書き込み済みフレーム数, 状態, コンシューマーごとの読み終えたフレーム数...] です。
+    各カウンターの書き手は1プロセスのみで、待機と更新は呼び出し側が渡す Condition
+    (Pool の initializer で共有した multiprocessing.Condition) で行います。
+    フレーム n はスロット n % slots に置かれ、全コンシューマーが読み終えるまで上書きされません。
+    """
+
+    def __init__(self, layout, shm, owner):
+        self.layout = layout
+        self.shm = shm
+        self.owner = owner
+        self.slots = layout["slots"]
+        self.consumer_count = layout["consumer_count"]
+        self.header = np.ndarray((_HEADER_FIXED_FIELDS + self.consumer_count,), dtype=np.int64,
+                                 buffer=shm.buf, offset=0)
+
+    @classmethod
+    def create(cls, layout):
+        if np is None:
+            raise RuntimeError("NumPy is required for the frame server.")
+        shm = shared_memory.SharedMemory(create=True, size=layout["total_bytes"])
+        layout = dict(layout, name=shm.name)
+        ring = cls(layout, shm, owner=True)
+        ring.header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, layout):
+        if np is None:
+            raise RuntimeError("NumPy is required for the frame server.")
+        try:
+            # The creating process owns the segment; attached processes must not unlink it on exit (Python 3.13+).
+            shm = shared_memory.SharedMemory(name=layout["name"], track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=layout["name"])
+        return cls(layout, shm, owner=False)
+
+    def slot(self, frame_number):
+        offset = self.layout["header_bytes"] + (frame_number % self.slots) * self.layout["slot_bytes"]
+        return np.ndarray(self.layout["slot_shape"], dtype=np.uint8, buffer=self.shm.buf, offset=offset)
+
+    @property
+    def frames_written(self):
+        return int(self.header[0])
+
+    @property
+    def state(self):
+        return int(self.header[1])
+
+    def _oldest_unread(self):
+        return int(self.header[_HEADER_FIXED_FIELDS:].min()) if self.consumer_count else self.frames_written
+
+    # --- Producer side ---
+    def wait_for_free_slot(self, condition, cancel_event):
+        """
+        次のフレームを書けるスロットが空くまで待ちます (バックプレッシャー)。
+
+        Returns:
+            ndarray or None: 書き込み先スロット。キャンセル時、または全コンシューマーが離脱した場合は None。
+        """
+        with condition:
+            while True:
+                if cancel_event.is_set():
+                    return None
+                oldest_unread = self._oldest_unread()
+                if oldest_unread >= FRAME_RING_DETACHED:
+                    return None
+                if self.frames_written - oldest_unread < self.slots:
+                    return self.slot(self.frames_written)
+                condition.wait(FRAME_RING_WAIT_TIMEOUT_SEC)
+
+    def publish(self, condition):
+        with condition:
+            self.header[0] += 1
+            condition.notify_all()
+
+    def finish(self, condition, failed=False):
+        with condition:
+            self.header[1] = FRAME_RING_STATE_FAILED if failed else FRAME_RING_STATE_EOF
+            condition.notify_all()
+
+    # --- Consumer side ---
+    def wait_for_frame(self, consumer_idx, condition, cancel_event):
+        """
+        コンシューマー consumer_idx が次に読むフレームを待ちます。
+
+        Returns:
+            ndarray or None: フレームのスロット (共有メモリ上のビュー、コピーなし)。
+                             終端/失敗/キャンセル時は None (state で区別できます)。
+        """
+        counter_index = _HEADER_FIXED_FIELDS + consumer_idx
+        with condition:
+            while True:
+                if cancel_event.is_set():
+                    return None
+                next_frame = int(self.header[counter_index])
+                if next_frame < self.frames_written:
+                    return self.slot(next_frame)
+                if self.state != FRAME_RING_STATE_RUNNING:
+                    return None
+                condition.wait(FRAME_RING_WAIT_TIMEOUT_SEC)
+
+    def release(self, consumer_idx, condition):
+        with condition:
+            self.header[_HEADER_FIXED_FIELDS + consumer_idx] += 1
+            condition.notify_all()
+
+    def detach(self, consumer_idx, condition):
+        with condition:
+            self.header[_HEADER_FIXED_FIELDS + consumer_idx] = FRAME_RING_DETACHED
+            condition.notify_all()
+
+    def close(self):
+        self.header = None # Drop the exported buffer view before closing the mapping
+        try:
+            self.shm.close()
+        except BufferError:
+            pass # A slot view is still referenced; the mapping is released when the process exits
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -10,31 +10,114 @@ import time
 import shutil
 import hashlib
 import re
+import sys
 import sqlite3
 from datetime import timedelta
 import multiprocessing
+import queue
+from collections import deque
 import threading # For background update check
 import webbrowser # To open web links
 
 # アプリケーション固有モジュールのインポート
-from strings import S, initial_app_language
+from strings import S, initial_app_language, load_app_setting
 from constants import (
     APP_RELEASE_DATE, APP_VERSION_STRING_SEMVER,
     FFMPEG_PRESETS, DEFAULT_PRESET,
     DEFAULT_RESOLUTION_WIDTH, HIGH_RESOLUTION_THRESHOLD,
+    REMAP_CACHE_DIR_NAME, REMAP_CACHE_MAX_BYTES, FRAME_SERVER_BUFFER_BYTES,
+    CONVERSION_PLAN_HISTORY_FILE,
+    LOG_FILE_NAME, FFMPEG_LOG_FILE_NAME, STRUCTURED_LOG_FILE_NAME, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT,
+    DEFAULT_LOG_WIDGET_MAX_LINES, LOG_WIDGET_TRIM_LINES,
     GITHUB_RELEASES_PAGE_URL,
     COLMAP_DEFAULT_PRESET_KEY,
     AYS_DEFAULT_PITCHES_STR, AYS_DEFAULT_FOV_INTERNAL
 )
 from tooltip_utils import ToolTip
-from ffmpeg_worker import ffmpeg_worker_process, check_for_cuda_fallback_error
+from ffmpeg_worker import (
+    ffmpeg_worker_process,
+    ffmpeg_multi_view_worker_process,
+    ffmpeg_remap_worker_process,
+    ffmpeg_seek_worker_process,
+    ffmpeg_keyframe_worker_process,
+    frame_server_decoder_process,
+    frame_server_consumer_process,
+    check_for_cuda_fallback_error,
+    init_worker_channels,
+    ffmpeg_line_level,
+    viewpoint_output_path,
+    plan_prescale,
+    PRESCALE_MAX_LOSS_PERCENT,
+    FFMPEG_LOG_QUIET, FFMPEG_LOG_ERRORS, FFMPEG_LOG_PROGRESS, FFMPEG_LOG_FULL, DEFAULT_FFMPEG_LOG_VERBOSITY
+)
+from frame_server import FrameRing, frame_ring_layout
+from thread_budget import ThreadBudget
+from eta_estimator import FrameEtaEstimator, task_average_remaining_seconds
+from ui_update_bus import UI_FLUSH_INTERVAL_MS, UI_MAX_QUEUE_ENTRIES_PER_POLL, UiUpdateBus
+from log_file_writer import RotatingLogFileWriter
+from concurrency_controller import (
+    CONCURRENCY_REASON_PROBE,
+    AdaptiveConcurrencyController,
+    HostUtilizationSampler
+)
+from frame_dedup import (
+    DEFAULT_DUPLICATE_HAMMING_THRESHOLD, is_duplicate_suppression_available, suppress_duplicate_frames
+)
+from ffmpeg_version import parse_ffmpeg_version, supports_fps_mode
+from frame_sampling import (
+    FRAME_SAMPLING_FPS, FRAME_SAMPLING_SEEK, FRAME_SAMPLING_KEYFRAMES, FRAME_SAMPLING_SHARPEST,
+    FRAME_SAMPLING_MOTION, DEFAULT_FRAME_SAMPLING, SEEK_BASED_FRAME_SAMPLINGS, ANALYSIS_FRAME_SAMPLINGS,
+    DEFAULT_MOTION_THRESHOLD, DEFAULT_MOTION_MAX_INTERVAL_SEC,
+    is_frame_analysis_available, plan_analysis_samples, plan_interval_samples,
+    frame_times_path, write_frame_times
+)
+from equirect_remap import (
+    REPROJECTION_BACKEND_V360,
+    REPROJECTION_BACKEND_NUMPY_REMAP,
+    DEFAULT_REPROJECTION_BACKEND,
+    is_numpy_available,
+    remap_interp_for
+)
 from advanced_yaw_selector import AdvancedYawSelector
 from colmap_rig_export import (
+    DEFAULT_FRAME_PREFIX,
     DEFAULT_RIG_NAME,
+    build_colmap_output_dir,
     make_unique_session_prefix,
     prepare_viewpoints_for_colmap,
     write_rig_config_json
 )
+from conversion_manifest import manifest_dir, manifest_key, plan_resume
+from output_fingerprint import (
+    find_reusable_rig_session,
+    is_output_current,
+    recover_rig_staging,
+    remove_fingerprint_record,
+    reuse_rig_session,
+    rig_replaced_dir,
+    viewpoint_fingerprint,
+    write_fingerprint_record
+)
+from run_cost_estimator import (
+    COST_MODEL_VERSION,
+    additional_disk_bytes,
+    check_disk_space,
+    estimate_run_cost,
+    format_bytes,
+    free_disk_bytes,
+    load_cost_calibration,
+    measure_output
+)
+from conversion_planner import (
+    DECODE_MODE_PER_VIEWPOINT, DECODE_MODE_PER_PITCH, DECODE_MODE_GROUP_SIZE, DECODE_MODE_SINGLE,
+    DEFAULT_DECODE_MODE, DEFAULT_VIEWS_PER_DECODE,
+    build_decode_groups,
+    limit_decode_group_count,
+    split_time_segments,
+    append_plan_record,
+    get_available_memory_bytes,
+    plan_parallel_conversion
+)
 from colmap_pipeline_options import (
     COLMAP_PRESETS,
     build_colmap_command,
@@ -91,13 +174,30 @@ class Insta360ConvertGUI(tk.Tk):
         self.logical_cores = os.cpu_count() if os.cpu_count() else 1
         self.parallel_options = [str(i) for i in range(1, self.logical_cores + 1)]
         self.parallel_processes_var = tk.StringVar()
+        self.decode_mode_var = tk.StringVar()
+        self.decode_mode_options_map = {}
+        self.ffmpeg_log_verbosity_var = tk.StringVar()
+        self.ffmpeg_log_verbosity_options_map = {}
+        self.views_per_decode_var = tk.StringVar(value=str(DEFAULT_VIEWS_PER_DECODE))
+        self.time_segments_var = tk.StringVar(value="1")
+        self.auto_plan_var = tk.BooleanVar(value=False)
+        self.conversion_plan_record = None
+        self.run_cost_estimate = None
 
         self.cuda_var = tk.BooleanVar(value=False)
         self.interp_options = ["linear", "cubic", "lanczos", "nearest"]
         self.interp_var = tk.StringVar(value="cubic")
+        self.reprojection_var = tk.StringVar()
+        self.reprojection_options_map = {}
+        self.prescale_var = tk.BooleanVar(value=False)
+        self.prescale_max_loss_var = tk.StringVar(value="0")
         self.output_mode_var = tk.StringVar(value="standard")
         self.output_format_var = tk.StringVar(value="png")
         self.frame_interval_var = tk.StringVar(value="1.00")
+        self.frame_sampling_var = tk.StringVar()
+        self.frame_sampling_options_map = {}
+        self.motion_threshold_var = tk.StringVar(value=f"{DEFAULT_MOTION_THRESHOLD:g}")
+        self.motion_max_interval_var = tk.StringVar(value=f"{DEFAULT_MOTION_MAX_INTERVAL_SEC:.2f}")
         self.preset_var = tk.StringVar(value=DEFAULT_PRESET)
         self.cq_var = tk.StringVar(value="18")
         self.png_pred_var = tk.StringVar()
@@ -114,6 +214,8 @@ class Insta360ConvertGUI(tk.Tk):
         self._setting_vocab_tree_path = False
         self.colmap_vocab_tree_path_var.trace_add("write", self._on_vocab_tree_path_changed)
         self.colmap_matcher_var = tk.StringVar(value="sequential")
+        self.colmap_dedup_var = tk.BooleanVar(value=False)
+        self.colmap_dedup_threshold_var = tk.StringVar(value=str(DEFAULT_DUPLICATE_HAMMING_THRESHOLD))
         default_colmap_exec = "colmap.exe" if os.name == 'nt' else "colmap"
         self.colmap_exec_path_var = tk.StringVar(value=default_colmap_exec)
         default_glomap_exec = "glomap.exe" if os.name == 'nt' else "glomap"
@@ -122,12 +224,34 @@ class Insta360ConvertGUI(tk.Tk):
 
         self.ffmpeg_path = "ffmpeg"
         self.ffprobe_path = "ffprobe"
+        self.ffmpeg_version = None # (major, minor) from ffmpeg -version; None for git builds or when unknown
         self.cuda_available = False
         self.cuda_checked_for_high_res_compatibility = False
         self.cuda_fallback_triggered_for_high_res = False
         self.cuda_compatibility_confirmed_for_high_res = False
 
         self.conversion_pool = None
+        self.conversion_pool_size = 0
+        self.pending_pool_tasks = deque() # (function, args) waiting for a free concurrency slot
+        self.pool_task_submission_complete = False
+        self.running_pool_jobs = 0
+        self.finished_pool_jobs = queue.Queue() # Filled by the pool's result-handler thread
+        self.concurrency_target = 1
+        self.concurrency_controller = None
+        self.host_utilization_sampler = None
+        self.thread_budget = None
+        self.output_frames_done = 0
+        self.frame_ring = None
+        self.ui_update_bus = UiUpdateBus() # Log text and progress refreshes from workers/threads, flushed together
+        self.log_widget_max_lines = self._load_log_widget_max_lines()
+        self.log_file_writers = { # The full logs; the log widgets only keep the latest lines
+            "app": RotatingLogFileWriter(os.path.abspath(LOG_FILE_NAME), LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT),
+            "ffmpeg": RotatingLogFileWriter(os.path.abspath(FFMPEG_LOG_FILE_NAME), LOG_FILE_MAX_BYTES,
+                                            LOG_FILE_BACKUP_COUNT),
+        }
+        # Every message (app, worker, FFmpeg, COLMAP) as one JSON record per line, for unattended runs
+        self.structured_log_writer = RotatingLogFileWriter(os.path.abspath(STRUCTURED_LOG_FILE_NAME), LOG_FILE_MAX_BYTES,
+                                                           LOG_FILE_BACKUP_COUNT)
         self.log_queue_mp = None
         self.progress_queue_mp = None
         self.cancel_event_mp = None
@@ -163,12 +287,29 @@ class Insta360ConvertGUI(tk.Tk):
         self.video_width = 0
         self.video_height = 0
         self.video_fps = 0.0
+        self.video_codec = ""
 
         self.start_time = 0
         self.elapsed_time_str = "00:00:00"
         self.overall_remaining_str = S.get("time_display_not_started")
         self.viewpoint_progress_text_var = tk.StringVar()
+        self.frame_progress_text_var = tk.StringVar()
+        self.viewpoint_frames_done = {} # Output frames written per viewpoint (from FFmpeg -progress)
+        self.running_task_speeds = {} # Worker label -> latest FFmpeg speed
+        self.expected_frames_per_viewpoint = None
+        self.resumed_frames = 0 # Output frames already written by an earlier, interrupted run
+        self.resume_manifest_dir = None
+        self.failed_tasks_count = 0
+        self.viewpoint_fingerprints = {} # Viewpoint index -> (output path, fingerprint, params) recorded when it completes
+        self.viewpoint_pending_tasks = {} # Viewpoint index -> tasks (segments) not yet finished successfully
+        self.reused_viewpoint_indices = set() # Outputs left from an earlier run with the same fingerprint
+        self.conversion_viewpoint_count = 0
+        self.measured_output_fps = 0.0
+        self.fps_sample_time = 0.0
+        self.fps_sample_frames = 0
+        self.eta_estimator = None
         self.final_conversion_message = None
+        self.conversion_end_status_key = None # Set when a run ends early without being cancelled (no frames selected)
         self.avg_time_per_viewpoint_for_estimation = 0
         self.overall_remaining_seconds_at_last_avg_calculation = None
         self.timestamp_of_last_avg_calculation = None
@@ -486,11 +627,39 @@ class Insta360ConvertGUI(tk.Tk):
                                            values=self.parallel_options, width=5, state="readonly")
         self.parallel_combo.pack(side=tk.LEFT, padx=5)
 
+        self.auto_plan_check = ttk.Checkbutton(self.parallel_control_frame, text="", variable=self.auto_plan_var,
+                                               command=self.update_decode_mode_controls_state)
+        self.auto_plan_check.pack(side=tk.LEFT, padx=(0,5))
+
+        self.decode_mode_label = ttk.Label(self.parallel_control_frame, text="")
+        self.decode_mode_label.pack(side=tk.LEFT, padx=(15,0))
+
+        self.decode_mode_combo = ttk.Combobox(self.parallel_control_frame, textvariable=self.decode_mode_var,
+                                              values=[], width=18, state="readonly")
+        self.decode_mode_combo.pack(side=tk.LEFT, padx=5)
+        self.decode_mode_combo.bind("<<ComboboxSelected>>", self.on_decode_mode_changed)
+
+        self.views_per_decode_label = ttk.Label(self.parallel_control_frame, text="")
+        self.views_per_decode_label.pack(side=tk.LEFT, padx=(10,0))
+
+        self.views_per_decode_entry = ttk.Entry(self.parallel_control_frame, textvariable=self.views_per_decode_var,
+                                                width=4, state="disabled")
+        self.views_per_decode_entry.pack(side=tk.LEFT, padx=5)
+
+        self.time_segments_label = ttk.Label(self.parallel_control_frame, text="")
+        self.time_segments_label.pack(side=tk.LEFT, padx=(10,0))
+
+        self.time_segments_entry = ttk.Entry(self.parallel_control_frame, textvariable=self.time_segments_var, width=4)
+        self.time_segments_entry.pack(side=tk.LEFT, padx=5)
+
         self.button_time_frame = ttk.Frame(self.control_frame_outer)
         self.button_time_frame.pack(fill=tk.X, pady=(5,0))
         self.start_button = ttk.Button(self.button_time_frame, text="", command=self.start_conversion_mp)
         self.start_button.pack(side=tk.LEFT, padx=5)
 
+        self.estimate_button = ttk.Button(self.button_time_frame, text="", command=self.show_run_cost_estimate)
+        self.estimate_button.pack(side=tk.LEFT, padx=5)
+
         self.cancel_button = ttk.Button(self.button_time_frame, text="", command=self.cancel_conversion_mp, state="disabled")
         self.cancel_button.pack(side=tk.LEFT, padx=5)
 
@@ -505,6 +674,9 @@ class Insta360ConvertGUI(tk.Tk):
         self.progress_bar = ttk.Progressbar(self.progress_display_frame, orient="horizontal", length=200, mode="determinate")
         self.progress_bar.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
 
+        self.frame_progress_label = ttk.Label(self.progress_display_frame, textvariable=self.frame_progress_text_var)
+        self.frame_progress_label.pack(side=tk.LEFT, padx=5)
+
         common_opts_line1_frame = ttk.Frame(self.output_settings_body)
         common_opts_line1_frame.pack(fill=tk.X, pady=2)
         self.resolution_label = ttk.Label(common_opts_line1_frame, text="")
@@ -529,6 +701,24 @@ class Insta360ConvertGUI(tk.Tk):
                                          values=self.interp_options, width=10, state="readonly")
         self.interp_combo.pack(side=tk.LEFT, padx=(0,5), pady=2)
 
+        self.reprojection_label = ttk.Label(common_opts_line1_frame, text="")
+        self.reprojection_label.pack(side=tk.LEFT, padx=(10,2), pady=2)
+
+        self.reprojection_combo = ttk.Combobox(common_opts_line1_frame, textvariable=self.reprojection_var,
+                                               values=[], width=12, state="readonly")
+        self.reprojection_combo.pack(side=tk.LEFT, padx=(0,5), pady=2)
+
+        prescale_frame = ttk.Frame(self.output_settings_body)
+        prescale_frame.pack(fill=tk.X, pady=2)
+        self.prescale_check = ttk.Checkbutton(prescale_frame, text="", variable=self.prescale_var,
+                                              command=self.update_prescale_controls_state)
+        self.prescale_check.pack(side=tk.LEFT, padx=(5,5), pady=2)
+        self.prescale_max_loss_label = ttk.Label(prescale_frame, text="")
+        self.prescale_max_loss_label.pack(side=tk.LEFT, padx=(10,2), pady=2)
+        self.prescale_max_loss_entry = ttk.Entry(prescale_frame, textvariable=self.prescale_max_loss_var, width=5,
+                                                 state="disabled")
+        self.prescale_max_loss_entry.pack(side=tk.LEFT, padx=(0,5), pady=2)
+
         output_mode_frame = ttk.Frame(self.output_settings_body)
         output_mode_frame.pack(fill=tk.X, pady=(5,2))
         self.output_mode_label = ttk.Label(output_mode_frame, text="")
@@ -598,6 +788,28 @@ class Insta360ConvertGUI(tk.Tk):
 
         self.cq_entry = ttk.Entry(self.video_options_frame, textvariable=self.cq_var, width=5)
         self.cq_entry.pack(side=tk.LEFT, padx=(0,5))
+
+        self.frame_sampling_frame = ttk.Frame(format_options_main_frame)
+        self.frame_sampling_frame.grid(row=3, column=0, columnspan=2, padx=5, pady=2, sticky=tk.W)
+        self.frame_sampling_label = ttk.Label(self.frame_sampling_frame, text="")
+        self.frame_sampling_label.pack(side=tk.LEFT, padx=(0,2))
+
+        self.frame_sampling_combo = ttk.Combobox(self.frame_sampling_frame, textvariable=self.frame_sampling_var,
+                                                 values=[], width=28, state="readonly")
+        self.frame_sampling_combo.pack(side=tk.LEFT, padx=(0,5))
+        self.frame_sampling_combo.bind("<<ComboboxSelected>>", self.update_output_format_options)
+
+        self.motion_threshold_label = ttk.Label(self.frame_sampling_frame, text="")
+        self.motion_threshold_label.pack(side=tk.LEFT, padx=(5,2))
+
+        self.motion_threshold_entry = ttk.Entry(self.frame_sampling_frame, textvariable=self.motion_threshold_var, width=6)
+        self.motion_threshold_entry.pack(side=tk.LEFT, padx=(0,5))
+
+        self.motion_max_interval_label = ttk.Label(self.frame_sampling_frame, text="")
+        self.motion_max_interval_label.pack(side=tk.LEFT, padx=(5,2))
+
+        self.motion_max_interval_entry = ttk.Entry(self.frame_sampling_frame, textvariable=self.motion_max_interval_var, width=6)
+        self.motion_max_interval_entry.pack(side=tk.LEFT, padx=(0,5))
         format_options_main_frame.columnconfigure(1, weight=1)
 
         self.yaw_selector_module_labelframe, yaw_body, self.yaw_selector_toggle_var, self.yaw_selector_header_label = (
@@ -663,6 +875,14 @@ class Insta360ConvertGUI(tk.Tk):
         self.colmap_matcher_combo.grid(row=4, column=1, padx=(0, 5), pady=2, sticky=tk.W)
         self.colmap_preset_combo.bind("<<ComboboxSelected>>", self.on_colmap_preset_changed)
         self.colmap_matcher_combo.bind("<<ComboboxSelected>>", self.on_colmap_matcher_changed)
+        colmap_dedup_frame = ttk.Frame(self.colmap_pipeline_body)
+        colmap_dedup_frame.grid(row=4, column=2, columnspan=3, padx=5, pady=2, sticky=tk.W)
+        self.colmap_dedup_check = ttk.Checkbutton(colmap_dedup_frame, text="", variable=self.colmap_dedup_var)
+        self.colmap_dedup_check.pack(side=tk.LEFT, padx=(0,5))
+        self.colmap_dedup_threshold_label = ttk.Label(colmap_dedup_frame, text="")
+        self.colmap_dedup_threshold_label.pack(side=tk.LEFT, padx=(5,2))
+        self.colmap_dedup_threshold_entry = ttk.Entry(colmap_dedup_frame, textvariable=self.colmap_dedup_threshold_var, width=4)
+        self.colmap_dedup_threshold_entry.pack(side=tk.LEFT, padx=(0,5))
 
         self.colmap_vocab_tree_label = ttk.Label(self.colmap_pipeline_body, text="")
         self.colmap_vocab_tree_label.grid(row=5, column=0, padx=5, pady=2, sticky=tk.W)
@@ -697,6 +917,16 @@ class Insta360ConvertGUI(tk.Tk):
         self.colmap_pipeline_body.columnconfigure(1, weight=1)
         self.colmap_pipeline_body.columnconfigure(3, weight=1)
 
+        self.log_actions_frame = ttk.Frame(self.log_container)
+        self.log_actions_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(0, 2))
+        self.open_full_log_button = ttk.Button(self.log_actions_frame, command=self.open_full_log)
+        self.open_full_log_button.pack(side=tk.RIGHT, padx=5)
+        self.ffmpeg_log_verbosity_combo = ttk.Combobox(self.log_actions_frame, textvariable=self.ffmpeg_log_verbosity_var,
+                                                       values=[], width=14, state="readonly")
+        self.ffmpeg_log_verbosity_combo.pack(side=tk.RIGHT, padx=5)
+        self.ffmpeg_log_verbosity_label = ttk.Label(self.log_actions_frame, text="")
+        self.ffmpeg_log_verbosity_label.pack(side=tk.RIGHT)
+
         self.log_notebook = ttk.Notebook(self.log_container, padding=2)
         self.log_notebook.pack(expand=True, fill=tk.BOTH, pady=(2,5), side=tk.TOP)
 
@@ -712,6 +942,7 @@ class Insta360ConvertGUI(tk.Tk):
 
         self._update_settings_scrollregion()
         self.after(0, self._set_main_paned_sash)
+        self.after(UI_FLUSH_INTERVAL_MS, self._flush_ui_updates)
 
 
     def switch_language(self, lang_code):
@@ -770,6 +1001,18 @@ class Insta360ConvertGUI(tk.Tk):
 
         self.cuda_check.config(text=S.get("cuda_checkbox_label"))
         self.interp_label.config(text=S.get("interpolation_label"))
+        self.reprojection_label.config(text=S.get("reprojection_label"))
+        current_reprojection_key = self._get_reprojection_backend_key()
+        self.reprojection_options_map = {
+            S.get("reprojection_v360"): REPROJECTION_BACKEND_V360,
+            S.get("reprojection_numpy_remap"): REPROJECTION_BACKEND_NUMPY_REMAP,
+        }
+        self.reprojection_combo.config(values=list(self.reprojection_options_map.keys()))
+        for display_name, backend_key in self.reprojection_options_map.items():
+            if backend_key == current_reprojection_key:
+                self.reprojection_var.set(display_name)
+        self.prescale_check.config(text=S.get("prescale_check_label"))
+        self.prescale_max_loss_label.config(text=S.get("prescale_max_loss_label"))
         self.output_mode_label.config(text=S.get("output_mode_label"))
         self.output_mode_standard_radio.config(text=S.get("output_mode_standard_label"))
         self.output_mode_colmap_radio.config(text=S.get("output_mode_colmap_label"))
@@ -780,6 +1023,8 @@ class Insta360ConvertGUI(tk.Tk):
         self.colmap_preset_label.config(text=S.get("colmap_preset_label"))
         self.colmap_vocab_tree_label.config(text=S.get("colmap_vocab_tree_label"))
         self.colmap_matcher_label.config(text=S.get("colmap_matcher_label"))
+        self.colmap_dedup_check.config(text=S.get("colmap_dedup_label"))
+        self.colmap_dedup_threshold_label.config(text=S.get("colmap_dedup_threshold_label"))
         self.colmap_postshot_label.config(text=S.get("colmap_postshot_output_label"))
         self.colmap_rig_browse.config(text=S.get("browse_button"))
         self.colmap_exec_browse.config(text=S.get("browse_button"))
@@ -850,9 +1095,41 @@ class Insta360ConvertGUI(tk.Tk):
         self.video_radio.config(text=S.get("video_radio_label"))
         self.video_preset_label.config(text=S.get("video_preset_label"))
         self.video_cq_label.config(text=S.get("video_cq_crf_label"))
+        self.frame_sampling_label.config(text=S.get("frame_sampling_label"))
+        current_frame_sampling_key = self._get_frame_sampling_key()
+        self.frame_sampling_options_map = {
+            S.get("frame_sampling_fps"): FRAME_SAMPLING_FPS,
+            S.get("frame_sampling_seek"): FRAME_SAMPLING_SEEK,
+            S.get("frame_sampling_keyframes"): FRAME_SAMPLING_KEYFRAMES,
+            S.get("frame_sampling_sharpest"): FRAME_SAMPLING_SHARPEST,
+            S.get("frame_sampling_motion"): FRAME_SAMPLING_MOTION,
+        }
+        self.frame_sampling_combo.config(values=list(self.frame_sampling_options_map.keys()))
+        for display_name, sampling_key in self.frame_sampling_options_map.items():
+            if sampling_key == current_frame_sampling_key:
+                self.frame_sampling_var.set(display_name)
+        self.motion_threshold_label.config(text=S.get("motion_threshold_label"))
+        self.motion_max_interval_label.config(text=S.get("motion_max_interval_label"))
 
         self.parallel_label.config(text=S.get("parallel_processes_label"))
+        self.decode_mode_label.config(text=S.get("decode_mode_label"))
+        self.views_per_decode_label.config(text=S.get("views_per_decode_label"))
+        self.time_segments_label.config(text=S.get("time_segments_label"))
+        self.auto_plan_check.config(text=S.get("auto_plan_label"))
+        current_decode_mode_key = self._get_decode_mode_key()
+        self.decode_mode_options_map = {
+            S.get("decode_mode_per_viewpoint"): DECODE_MODE_PER_VIEWPOINT,
+            S.get("decode_mode_per_pitch"): DECODE_MODE_PER_PITCH,
+            S.get("decode_mode_group_size"): DECODE_MODE_GROUP_SIZE,
+            S.get("decode_mode_single"): DECODE_MODE_SINGLE,
+        }
+        self.decode_mode_combo.config(values=list(self.decode_mode_options_map.keys()))
+        for display_name, mode_key in self.decode_mode_options_map.items():
+            if mode_key == current_decode_mode_key:
+                self.decode_mode_var.set(display_name)
+                break
         self.start_button.config(text=S.get("start_button_label"))
+        self.estimate_button.config(text=S.get("estimate_button_label"))
         self.cancel_button.config(text=S.get("cancel_button_label"))
         self.update_time_label_display()
         self.viewpoint_progress_text_var.set(S.get("viewpoint_progress_format", completed=self.completed_tasks_count, total=self.total_tasks_for_conversion))
@@ -860,6 +1137,20 @@ class Insta360ConvertGUI(tk.Tk):
 
         self.log_notebook.tab(self.app_log_frame, text=S.get("log_tab_app_log_label"))
         self.log_notebook.tab(self.ffmpeg_log_frame, text=S.get("log_tab_ffmpeg_log_label"))
+        self.open_full_log_button.config(text=S.get("open_full_log_button_label"))
+        self.ffmpeg_log_verbosity_label.config(text=S.get("ffmpeg_log_verbosity_label"))
+        current_log_verbosity = self._get_ffmpeg_log_verbosity_key()
+        self.ffmpeg_log_verbosity_options_map = {
+            S.get("ffmpeg_log_verbosity_quiet"): FFMPEG_LOG_QUIET,
+            S.get("ffmpeg_log_verbosity_errors"): FFMPEG_LOG_ERRORS,
+            S.get("ffmpeg_log_verbosity_progress"): FFMPEG_LOG_PROGRESS,
+            S.get("ffmpeg_log_verbosity_full"): FFMPEG_LOG_FULL,
+        }
+        self.ffmpeg_log_verbosity_combo.config(values=list(self.ffmpeg_log_verbosity_options_map.keys()))
+        for display_name, verbosity_key in self.ffmpeg_log_verbosity_options_map.items():
+            if verbosity_key == current_log_verbosity:
+                self.ffmpeg_log_verbosity_var.set(display_name)
+                break
 
         for tip_info in self.tooltips:
             tip_info["instance"].hide_tip_immediately()
@@ -876,6 +1167,11 @@ class Insta360ConvertGUI(tk.Tk):
         self.add_tooltip_managed(self.cuda_check, "cuda_checkbox_tooltip")
         self.add_tooltip_managed(self.interp_label, "interpolation_label_tooltip")
         self.add_tooltip_managed(self.interp_combo, "interpolation_combo_tooltip")
+        self.add_tooltip_managed(self.reprojection_label, "reprojection_tooltip")
+        self.add_tooltip_managed(self.reprojection_combo, "reprojection_tooltip")
+        self.add_tooltip_managed(self.prescale_check, "prescale_tooltip")
+        self.add_tooltip_managed(self.prescale_max_loss_label, "prescale_tooltip")
+        self.add_tooltip_managed(self.prescale_max_loss_entry, "prescale_tooltip")
         self.add_tooltip_managed(self.output_mode_label, "output_mode_label_tooltip")
         self.add_tooltip_managed(self.output_mode_standard_radio, "output_mode_standard_tooltip")
         self.add_tooltip_managed(self.output_mode_colmap_radio, "output_mode_colmap_tooltip")
@@ -893,6 +1189,9 @@ class Insta360ConvertGUI(tk.Tk):
         self.add_tooltip_managed(self.colmap_preset_combo, "colmap_preset_tooltip")
         self.add_tooltip_managed(self.colmap_advanced_button, "colmap_advanced_tooltip")
         self.add_tooltip_managed(self.colmap_matcher_label, "colmap_matcher_tooltip")
+        self.add_tooltip_managed(self.colmap_dedup_check, "colmap_dedup_tooltip")
+        self.add_tooltip_managed(self.colmap_dedup_threshold_label, "colmap_dedup_threshold_tooltip")
+        self.add_tooltip_managed(self.colmap_dedup_threshold_entry, "colmap_dedup_threshold_tooltip")
         self.add_tooltip_managed(self.colmap_matcher_combo, "colmap_matcher_tooltip")
         self.add_tooltip_managed(self.colmap_vocab_tree_label, "colmap_vocab_tree_tooltip")
         self.add_tooltip_managed(self.colmap_vocab_tree_entry, "colmap_vocab_tree_tooltip")
@@ -905,6 +1204,8 @@ class Insta360ConvertGUI(tk.Tk):
         self.add_tooltip_managed(self.colmap_cancel_button, "colmap_cancel_button_tooltip")
         self.add_tooltip_managed(self.colmap_progress_label, "colmap_progress_tooltip")
         self.add_tooltip_managed(self.colmap_progress_bar, "colmap_progress_tooltip")
+        self.add_tooltip_managed(self.open_full_log_button, "open_full_log_tooltip", max_lines=self.log_widget_max_lines)
+        self.add_tooltip_managed(self.ffmpeg_log_verbosity_combo, "ffmpeg_log_verbosity_tooltip")
         self.add_tooltip_managed(self.png_radio, "png_radio_tooltip")
         self.add_tooltip_managed(self.png_interval_label, "png_interval_label_tooltip")
         self.add_tooltip_managed(self.png_frame_interval_entry, "png_frame_interval_entry_tooltip")
@@ -916,16 +1217,31 @@ class Insta360ConvertGUI(tk.Tk):
         self.add_tooltip_managed(self.jpeg_quality_label, "jpeg_quality_label_tooltip")
         self.add_tooltip_managed(self.jpeg_quality_entry, "jpeg_quality_entry_tooltip")
         self.add_tooltip_managed(self.video_radio, "video_radio_tooltip")
+        self.add_tooltip_managed(self.frame_sampling_label, "frame_sampling_tooltip")
+        self.add_tooltip_managed(self.frame_sampling_combo, "frame_sampling_tooltip")
+        self.add_tooltip_managed(self.motion_threshold_label, "motion_threshold_tooltip")
+        self.add_tooltip_managed(self.motion_threshold_entry, "motion_threshold_tooltip")
+        self.add_tooltip_managed(self.motion_max_interval_label, "motion_max_interval_tooltip")
+        self.add_tooltip_managed(self.motion_max_interval_entry, "motion_max_interval_tooltip")
         self.add_tooltip_managed(self.video_preset_label, "video_preset_label_tooltip")
         self.add_tooltip_managed(self.preset_combo, "video_preset_combo_tooltip")
         self.add_tooltip_managed(self.video_cq_label, "video_cq_crf_label_tooltip")
         self.add_tooltip_managed(self.cq_entry, "video_cq_crf_entry_tooltip")
         self.add_tooltip_managed(self.parallel_label, "parallel_processes_label_tooltip_format", cores=self.logical_cores)
         self.add_tooltip_managed(self.parallel_combo, "parallel_processes_combo_tooltip")
+        self.add_tooltip_managed(self.decode_mode_label, "decode_mode_tooltip")
+        self.add_tooltip_managed(self.decode_mode_combo, "decode_mode_tooltip")
+        self.add_tooltip_managed(self.views_per_decode_label, "views_per_decode_tooltip")
+        self.add_tooltip_managed(self.views_per_decode_entry, "views_per_decode_tooltip")
+        self.add_tooltip_managed(self.time_segments_label, "time_segments_tooltip")
+        self.add_tooltip_managed(self.time_segments_entry, "time_segments_tooltip")
+        self.add_tooltip_managed(self.auto_plan_check, "auto_plan_tooltip")
         self.add_tooltip_managed(self.start_button, "start_button_tooltip")
+        self.add_tooltip_managed(self.estimate_button, "estimate_button_tooltip")
         self.add_tooltip_managed(self.cancel_button, "cancel_button_tooltip")
         self.add_tooltip_managed(self.time_label, "time_label_tooltip")
         self.add_tooltip_managed(self.viewpoint_progress_label, "viewpoint_progress_label_tooltip")
+        self.add_tooltip_managed(self.frame_progress_label, "frame_progress_label_tooltip")
         self.add_tooltip_managed(self.progress_bar, "progressbar_tooltip")
         self.add_tooltip_managed(self.log_area, "log_tab_app_log_tooltip")
         self.add_tooltip_managed(self.ffmpeg_log_area, "log_tab_ffmpeg_log_tooltip")
@@ -933,6 +1249,7 @@ class Insta360ConvertGUI(tk.Tk):
         if self.yaw_selector_widget and hasattr(self.yaw_selector_widget, 'update_ui_texts_for_language_switch'):
             self.yaw_selector_widget.update_ui_texts_for_language_switch()
         self.update_output_format_options()
+        self.update_decode_mode_controls_state()
         self.update_colmap_controls_state()
         self._update_settings_scrollregion()
 
@@ -942,11 +1259,8 @@ class Insta360ConvertGUI(tk.Tk):
         self.update_parallel_options_and_default()
 
     def _update_ffmpeg_log_area(self, message):
-        if hasattr(self, 'ffmpeg_log_area') and self.ffmpeg_log_area.winfo_exists():
-            self.ffmpeg_log_area.config(state="normal")
-            self.ffmpeg_log_area.insert(tk.END, message)
-            self.ffmpeg_log_area.see(tk.END)
-            self.ffmpeg_log_area.config(state="disabled")
+        if hasattr(self, 'ffmpeg_log_area'):
+            self.ui_update_bus.append_text("ffmpeg", message)
         else:
             print(f"FFMPEG_RAW_LOG: {message.strip()}")
 
@@ -957,6 +1271,66 @@ class Insta360ConvertGUI(tk.Tk):
         self.log_message_ui("log_cuda_settings_changed_retest", "DEBUG", is_key=True)
         self.apply_cuda_restrictions_based_on_video_info()
 
+    def _get_frame_sampling_key(self):
+        return self.frame_sampling_options_map.get(self.frame_sampling_var.get(), DEFAULT_FRAME_SAMPLING)
+
+    def _get_reprojection_backend_key(self):
+        return self.reprojection_options_map.get(self.reprojection_var.get(), DEFAULT_REPROJECTION_BACKEND)
+
+    def _get_decode_mode_key(self):
+        return self.decode_mode_options_map.get(self.decode_mode_var.get(), DEFAULT_DECODE_MODE)
+
+    def _get_ffmpeg_log_verbosity_key(self):
+        return self.ffmpeg_log_verbosity_options_map.get(self.ffmpeg_log_verbosity_var.get(),
+                                                         DEFAULT_FFMPEG_LOG_VERBOSITY)
+
+    def on_decode_mode_changed(self, event=None): # pylint: disable=unused-argument
+        self.update_decode_mode_controls_state()
+
+    def update_decode_mode_controls_state(self, converting=None):
+        is_converting = bool(self.conversion_pool) if converting is None else converting
+        manual_enabled = not is_converting and not self.auto_plan_var.get()
+        group_size_enabled = self._get_decode_mode_key() == DECODE_MODE_GROUP_SIZE and manual_enabled
+        self.parallel_combo.config(state="readonly" if manual_enabled else tk.DISABLED)
+        self.decode_mode_combo.config(state="readonly" if manual_enabled else tk.DISABLED)
+        self.views_per_decode_entry.config(state=tk.NORMAL if group_size_enabled else tk.DISABLED)
+        self.time_segments_entry.config(state=tk.NORMAL if manual_enabled else tk.DISABLED)
+        self.auto_plan_check.config(state=tk.NORMAL if not is_converting else tk.DISABLED)
+
+    def update_prescale_controls_state(self, converting=None):
+        is_converting = bool(self.conversion_pool) if converting is None else converting
+        self.prescale_check.config(state=tk.NORMAL if not is_converting else tk.DISABLED)
+        entry_enabled = not is_converting and self.prescale_var.get()
+        self.prescale_max_loss_entry.config(state=tk.NORMAL if entry_enabled else tk.DISABLED)
+
+    def _get_prescale_max_loss(self):
+        try:
+            max_loss = float(self.prescale_max_loss_var.get())
+            if not 0.0 <= max_loss <= PRESCALE_MAX_LOSS_PERCENT: raise ValueError("Out of range.")
+            return max_loss
+        except ValueError:
+            self.log_message_ui("log_prescale_invalid_loss_format", "WARNING", is_key=True,
+                                value=self.prescale_max_loss_var.get())
+            self.prescale_max_loss_var.set("0")
+            return 0.0
+
+    def _log_prescale_plan(self, viewpoints, worker_config):
+        # Each viewpoint is scaled for itself (ffmpeg_worker.build_prescale_filter_parts); the log shows the widest one.
+        max_loss = worker_config["prescale_max_loss"]
+        input_width, input_height = worker_config["input_resolution"]
+        plans = [plan for plan in (plan_prescale(worker_config["input_resolution"], [viewpoint],
+                                                 worker_config["output_resolution"], max_loss)
+                                   for viewpoint in viewpoints) if plan is not None]
+        if not plans:
+            self.log_message_ui("log_prescale_not_applied_format", "INFO", is_key=True, max_loss=max_loss,
+                                input_width=input_width, input_height=input_height)
+            return
+        widest = max(plans, key=lambda plan: plan["width"])
+        self.log_message_ui("log_prescale_format", "INFO", is_key=True, count=len(plans), total=len(viewpoints),
+                            input_width=input_width, input_height=input_height, width=widest["width"],
+                            height=widest["height"], loss=max(plan["loss"] for plan in plans),
+                            center_loss=max(plan["center_loss"] for plan in plans))
+
     def update_parallel_options_and_default(self):
         num_pitch_angles = 0
         if self.yaw_selector_widget and hasattr(self.yaw_selector_widget, 'get_num_active_pitches'):
@@ -976,42 +1350,137 @@ class Insta360ConvertGUI(tk.Tk):
             message = S.get(message_key_or_literal, *args, **kwargs)
         else:
             message = message_key_or_literal
+        self._emit_log_message(message, level, "app")
+
+    def _emit_log_message(self, message, level, subsystem, **fields):
+        # Safe from any thread: both the structured log and the UI update bus only queue the message.
+        self._write_structured_log(level, subsystem, message, **fields)
         if not hasattr(self, 'log_area') or not self.log_area:
             print(f"LOG_FALLBACK [{level}] {message}")
             return
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
         formatted_message = f"[{timestamp}] [{level}] {message}\n"
-        try:
-            if self.log_area.winfo_exists():
-                self._update_log_area(formatted_message)
-        except tk.TclError:
-            print(f"LOG_TCL_ERROR [{level}] {message}")
-
-    def _update_log_area(self, message):
-        self.log_area.config(state="normal")
-        self.log_area.insert(tk.END, message)
-        self.log_area.see(tk.END)
-        self.log_area.config(state="disabled")
+        self.ui_update_bus.append_text("app", formatted_message)
+
+    def _write_structured_log(self, level, subsystem, message, **fields):
+        """
+        構造化ログに1レコード書き込みます。mono は time.monotonic() (実行中の時間差の計算用)、
+        fields は viewpoint_index / viewpoint_indices / step などの付加情報です (None の項目は省きます)。
+        """
+        writer = getattr(self, "structured_log_writer", None)
+        if writer is None:
+            return
+        now = time.time()
+        record = {"time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)) + f".{int(now % 1 * 1000):03d}",
+                  "mono": round(time.monotonic(), 6), "level": level, "subsystem": subsystem, "message": message}
+        record.update((key, value) for key, value in fields.items() if value is not None)
+        writer.write_record(record)
 
-    def process_mp_queues(self): # pylint: disable=too-many-branches
+    def _flush_ui_updates(self):
+        # Runs on the Tk thread at a fixed rate: one insert per log widget, one call per coalesced update.
+        try:
+            texts, updates = self.ui_update_bus.take()
+            for channel, text in texts.items():
+                self.log_file_writers[channel].write(text)
+                widget = self.log_area if channel == "app" else self.ffmpeg_log_area
+                try:
+                    if widget.winfo_exists():
+                        self._append_log_widget_text(widget, text)
+                except tk.TclError:
+                    print(f"LOG_TCL_ERROR {text.rstrip()}")
+            for callback, args in updates:
+                try:
+                    callback(*args)
+                except tk.TclError:
+                    pass
+        finally:
+            # Keep the loop alive whatever a callback raised; otherwise the log and progress display freeze.
+            self.after(UI_FLUSH_INTERVAL_MS, self._flush_ui_updates)
+
+    def _append_log_widget_text(self, widget, text):
+        widget.config(state="normal")
+        widget.insert(tk.END, text)
+        line_count = int(widget.index("end-1c").split(".")[0])
+        if line_count > self.log_widget_max_lines + LOG_WIDGET_TRIM_LINES:
+            # Trim in chunks rather than one line per insert; the full log is in the log file.
+            widget.delete("1.0", f"{line_count - self.log_widget_max_lines + 1}.0")
+        widget.see(tk.END)
+        widget.config(state="disabled")
+
+    def _load_log_widget_max_lines(self):
+        try:
+            return max(100, int(load_app_setting("log_widget_max_lines", DEFAULT_LOG_WIDGET_MAX_LINES)))
+        except (TypeError, ValueError):
+            return DEFAULT_LOG_WIDGET_MAX_LINES
+
+    def open_full_log(self):
+        channel = "ffmpeg" if self.log_notebook.select() == str(self.ffmpeg_log_frame) else "app"
+        writer = self.log_file_writers[channel]
+        writer.flush(timeout=2.0)
+        if not os.path.exists(writer.path):
+            self.log_message_ui("log_full_log_missing_format", "INFO", is_key=True, path=writer.path)
+            return
         try:
+            if os.name == 'nt':
+                os.startfile(writer.path) # type: ignore # pylint: disable=no-member
+            else:
+                subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", writer.path]) # pylint: disable=consider-using-with
+        except OSError as e:
+            self.log_message_ui("log_open_full_log_failed_format", "ERROR", is_key=True, path=writer.path, error=str(e))
+
+    def _close_log_files(self):
+        # Text still waiting on the UI update bus goes to the files, not to the widgets being destroyed.
+        while self.ui_update_bus.has_pending_text():
+            texts, _ = self.ui_update_bus.take()
+            for channel, text in texts.items():
+                self.log_file_writers[channel].write(text)
+        for writer in self.log_file_writers.values():
+            writer.close()
+        self.structured_log_writer.close()
+
+    def _drain_log_queue(self, max_entries=None):
+        try:
+            drained = 0
             while self.log_queue_mp and not self.log_queue_mp.empty():
+                if max_entries is not None and drained >= max_entries:
+                    break # Leave the rest for the next poll so the Tk loop keeps running
+                drained += 1
                 log_entry = self.log_queue_mp.get_nowait()
                 if log_entry["type"] == "log":
-                    self.log_message_ui(log_entry["message"], log_entry["level"], is_key=False)
+                    self._emit_log_message(log_entry["message"], log_entry["level"], "worker")
                 elif log_entry["type"] == "ffmpeg_raw":
+                    self._write_structured_log(ffmpeg_line_level(log_entry["line"]) or "INFO", "ffmpeg",
+                                               log_entry["line"], viewpoint_index=log_entry.get("viewpoint_index"),
+                                               viewpoint_indices=log_entry.get("viewpoint_indices"))
                     self._update_ffmpeg_log_area(log_entry["line"] + "\n")
-        except (multiprocessing.queues.Empty, AttributeError, EOFError, FileNotFoundError):
+        except (multiprocessing.queues.Empty, AttributeError, EOFError, FileNotFoundError, OSError, ValueError):
             pass
         except Exception as e:
             print(f"Log queue processing error: {type(e).__name__} - {e}")
 
+    def process_mp_queues(self): # pylint: disable=too-many-branches
+        self._drain_log_queue(UI_MAX_QUEUE_ENTRIES_PER_POLL)
+
         new_task_completed_this_cycle = False
         try:
             while self.progress_queue_mp and not self.progress_queue_mp.empty():
                 prog_entry = self.progress_queue_mp.get_nowait()
-                if prog_entry["type"] == "task_result":
+                if prog_entry["type"] == "frame_progress":
+                    viewpoint_indices = prog_entry["viewpoint_indices"]
+                    self.output_frames_done += prog_entry["frames"] * len(viewpoint_indices)
+                    for vp_idx in viewpoint_indices:
+                        self.viewpoint_frames_done[vp_idx] = self.viewpoint_frames_done.get(vp_idx, 0) + prog_entry["frames"]
+                    if prog_entry.get("final"):
+                        self.running_task_speeds.pop(prog_entry["task"], None)
+                    elif prog_entry.get("speed") is not None:
+                        self.running_task_speeds[prog_entry["task"]] = prog_entry["speed"]
+                elif prog_entry["type"] == "task_result":
                     new_task_completed_this_cycle = True
+                    self._write_structured_log(
+                        "INFO" if prog_entry["success"] or prog_entry.get("cancelled") else "ERROR", "worker",
+                        "task_result", viewpoint_index=prog_entry["viewpoint_index"], success=prog_entry["success"],
+                        cancelled=prog_entry.get("cancelled"), duration=prog_entry.get("duration"),
+                        error_message=prog_entry.get("error_message"), error_tail=prog_entry.get("error_tail"))
                     self.completed_tasks_count += 1
                     if self.active_tasks_count > 0:
                         self.active_tasks_count -= 1
@@ -1023,40 +1492,53 @@ class Insta360ConvertGUI(tk.Tk):
                         self.log_message_ui("log_task_completed_format", "INFO", is_key=True,
                                             index=prog_entry['viewpoint_index'] + 1, duration=duration)
                         self.task_durations.append(duration)
+                        self._on_viewpoint_task_succeeded(prog_entry['viewpoint_index'])
                     else:
+                        self.failed_tasks_count += 1
                         self.log_message_ui("log_task_error_format", "ERROR", is_key=True,
                                             index=prog_entry['viewpoint_index'] + 1,
                                             error_message=prog_entry.get('error_message', 'Unknown Error'))
-                    self.viewpoint_progress_text_var.set(S.get("viewpoint_progress_format",
-                                                               completed=self.completed_tasks_count,
-                                                               total=self.total_tasks_for_conversion))
-                    if self.total_tasks_for_conversion > 0:
-                        self.progress_bar["value"] = (self.completed_tasks_count / self.total_tasks_for_conversion) * 100
+                        if prog_entry.get("error_tail"):
+                            # Kept by the worker even when its FFmpeg output was not forwarded.
+                            self.log_message_ui("log_task_error_tail_format", "ERROR", is_key=True,
+                                                index=prog_entry['viewpoint_index'] + 1,
+                                                lines="\n    ".join(prog_entry["error_tail"]))
         except (multiprocessing.queues.Empty, AttributeError, EOFError, FileNotFoundError):
             pass
         except Exception as e:
             print(f"Progress queue processing error: {type(e).__name__} - {e}")
+        if new_task_completed_this_cycle:
+            # Once per drain, however many results arrived.
+            self.viewpoint_progress_text_var.set(S.get("viewpoint_progress_format",
+                                                       completed=self.completed_tasks_count,
+                                                       total=self.total_tasks_for_conversion))
+            if self.total_tasks_for_conversion > 0:
+                self.progress_bar["value"] = (self.completed_tasks_count / self.total_tasks_for_conversion) * 100
 
         if self.conversion_pool:
+            self._update_concurrency_target()
+            self._dispatch_pool_tasks()
+            self._update_frame_progress_display()
             if self.start_time > 0:
                 self.elapsed_time_str = str(timedelta(seconds=int(time.time() - self.start_time)))
-            if new_task_completed_this_cycle and self.total_tasks_for_conversion > 0 and self.completed_tasks_count > 0:
+            now = time.time()
+            remaining_seconds = None
+            if self.eta_estimator is not None:
+                # Frame-based estimate: updated continuously, not only when a viewpoint finishes.
+                remaining_seconds = self.eta_estimator.update(now, self.output_frames_done, self.running_pool_jobs,
+                                                              self.concurrency_target,
+                                                              self.running_pool_jobs + len(self.pending_pool_tasks))
+            if (remaining_seconds is None and new_task_completed_this_cycle and self.total_tasks_for_conversion > 0
+                    and self.completed_tasks_count > 0):
+                # Task average: when frame counts are unknown, and until frame progress has been measured.
                 if self.task_durations:
                     self.avg_time_per_viewpoint_for_estimation = sum(self.task_durations) / len(self.task_durations)
-                if self.avg_time_per_viewpoint_for_estimation > 0:
-                    remaining_tasks = self.total_tasks_for_conversion - self.completed_tasks_count
-                    try:
-                        num_parallel_processes = int(self.parallel_processes_var.get())
-                        if num_parallel_processes <= 0: num_parallel_processes = 1
-                    except ValueError:
-                        num_parallel_processes = 1
-                    effective_parallelism = min(num_parallel_processes, remaining_tasks if remaining_tasks > 0 else 1)
-                    if remaining_tasks > 0:
-                        self.overall_remaining_seconds_at_last_avg_calculation = (remaining_tasks * self.avg_time_per_viewpoint_for_estimation) / effective_parallelism
-                        self.timestamp_of_last_avg_calculation = time.time()
-                    else:
-                        self.overall_remaining_seconds_at_last_avg_calculation = 0
-                        self.timestamp_of_last_avg_calculation = time.time()
+                remaining_seconds = task_average_remaining_seconds(
+                    self.avg_time_per_viewpoint_for_estimation,
+                    self.total_tasks_for_conversion - self.completed_tasks_count, self.concurrency_target)
+            if remaining_seconds is not None:
+                self.overall_remaining_seconds_at_last_avg_calculation = remaining_seconds
+                self.timestamp_of_last_avg_calculation = now
             if self.overall_remaining_seconds_at_last_avg_calculation is not None and \
                self.timestamp_of_last_avg_calculation is not None:
                 time_since_last_calc = time.time() - self.timestamp_of_last_avg_calculation
@@ -1080,6 +1562,44 @@ class Insta360ConvertGUI(tk.Tk):
         elif self.conversion_pool or (self.manager_mp and self.log_queue_mp and not self.log_queue_mp.empty()):
             self.after(100, self.process_mp_queues)
 
+    def _estimate_frames_per_viewpoint(self, worker_config):
+        # Output frames each viewpoint will get; None when it cannot be known in advance (keyframes).
+        if worker_config.get("frame_samples"):
+            return len(worker_config["frame_samples"])
+        if worker_config.get("frame_sampling") == FRAME_SAMPLING_KEYFRAMES or self.video_duration <= 0:
+            return None
+        frame_interval = worker_config.get("frame_interval", 0)
+        if worker_config["output_format"] in ["png", "jpeg"] and frame_interval > 1e-6:
+            return max(1, int(round(self.video_duration / frame_interval)))
+        if self.video_fps > 0:
+            return max(1, int(round(self.video_duration * self.video_fps)))
+        return None
+
+    def _update_frame_progress_display(self):
+        now = time.time()
+        if now - self.fps_sample_time >= 1.0:
+            self.measured_output_fps = (self.output_frames_done - self.fps_sample_frames) / (now - self.fps_sample_time)
+            self.fps_sample_time, self.fps_sample_frames = now, self.output_frames_done
+        if not self.viewpoint_frames_done:
+            return
+        expected = self.expected_frames_per_viewpoint
+        speeds = list(self.running_task_speeds.values())
+        speed_text = f"{sum(speeds) / len(speeds):.2f}x" if speeds else "-"
+        slowest_vp = min(range(self.conversion_viewpoint_count), key=lambda i: self.viewpoint_frames_done.get(i, 0),
+                         default=0)
+        expected_text = str(expected) if expected else "?"
+        total_expected_text = str(expected * self.conversion_viewpoint_count) if expected else "?"
+        self.frame_progress_text_var.set(S.get(
+            "frame_progress_format", done=self.output_frames_done + self.resumed_frames, expected=total_expected_text,
+            fps=self.measured_output_fps, speed=speed_text, viewpoint=slowest_vp + 1,
+            viewpoint_done=self.viewpoint_frames_done.get(slowest_vp, 0), viewpoint_expected=expected_text))
+        if expected and self.total_tasks_for_conversion > 0:
+            # Frame counts move the bar between task completions; finished tasks still set the floor.
+            frame_percent = min(99.9, (self.output_frames_done + self.resumed_frames) * 100.0 /
+                                (expected * self.conversion_viewpoint_count))
+            task_percent = self.completed_tasks_count * 100.0 / self.total_tasks_for_conversion
+            self.progress_bar["value"] = max(frame_percent, task_percent)
+
     def update_time_label_display(self):
         is_converting = bool(self.conversion_pool)
         display_text = ""
@@ -1102,6 +1622,10 @@ class Insta360ConvertGUI(tk.Tk):
                                         startupinfo=self.get_startupinfo(), encoding='utf-8', errors='replace')
             line_ffmpeg = res_ffmpeg.stdout.splitlines()[0] if res_ffmpeg.stdout else "ffmpeg (unknown version)"
             self.log_message_ui("log_ffmpeg_found_format", "INFO", is_key=True, version_line=line_ffmpeg.strip())
+            self.ffmpeg_version = parse_ffmpeg_version(line_ffmpeg)
+            if not supports_fps_mode(self.ffmpeg_version):
+                self.log_message_ui("log_ffmpeg_old_vsync_format", "INFO", is_key=True,
+                                    version=".".join(str(part) for part in self.ffmpeg_version))
         except FileNotFoundError:
             self.log_message_ui("log_ffmpeg_not_found_format", "ERROR", is_key=True, path=self.ffmpeg_path)
             self.start_button.config(state="disabled")
@@ -1287,6 +1811,7 @@ class Insta360ConvertGUI(tk.Tk):
                     self.video_fps = 0.0
                     self.log_message_ui(f"Warning: Invalid r_frame_rate '{r_fps_str}'. Using 0.0fps.", "WARNING")
             codec = stream_info.get("codec_name", "Unknown")
+            self.video_codec = codec
             self.log_message_ui("log_video_info_format", "INFO", is_key=True,
                                 width=self.video_width, height=self.video_height,
                                 duration=self.video_duration, fps=self.video_fps, codec=codec)
@@ -1335,6 +1860,10 @@ class Insta360ConvertGUI(tk.Tk):
         self.jpeg_quality_entry.config(state=normal_state_if_not_converting if selected_format == "jpeg" else disabled_state_always)
         self.preset_combo.config(state=readonly_state_if_not_converting if selected_format == "video" else disabled_state_always)
         self.cq_entry.config(state=normal_state_if_not_converting if selected_format == "video" else disabled_state_always)
+        self.frame_sampling_combo.config(state=readonly_state_if_not_converting if selected_format in ["png", "jpeg"] else disabled_state_always)
+        motion_enabled = selected_format in ["png", "jpeg"] and self._get_frame_sampling_key() == FRAME_SAMPLING_MOTION
+        self.motion_threshold_entry.config(state=normal_state_if_not_converting if motion_enabled else disabled_state_always)
+        self.motion_max_interval_entry.config(state=normal_state_if_not_converting if motion_enabled else disabled_state_always)
 
     def update_colmap_controls_state(self):
         colmap_enabled = not self.conversion_pool and not self.colmap_running
@@ -1354,6 +1883,8 @@ class Insta360ConvertGUI(tk.Tk):
         self.colmap_preset_combo.config(state=preset_state)
         self.colmap_advanced_button.config(state=run_state)
         self.colmap_matcher_combo.config(state=matcher_state)
+        self.colmap_dedup_check.config(state=run_state)
+        self.colmap_dedup_threshold_entry.config(state=entry_state)
         self.colmap_postshot_entry.config(state=entry_state)
         self.colmap_postshot_browse.config(state=browse_state)
         self.colmap_run_button.config(state=run_state)
@@ -1622,6 +2153,17 @@ class Insta360ConvertGUI(tk.Tk):
                                         interval=interval, duration=self.video_duration)
             except ValueError:
                 self.log_message_ui("validate_error_frame_interval_numeric", "ERROR", is_key=True); return False
+            if self._get_frame_sampling_key() == FRAME_SAMPLING_MOTION:
+                try:
+                    motion_threshold = float(self.motion_threshold_var.get())
+                    motion_max_interval = float(self.motion_max_interval_var.get())
+                except ValueError:
+                    self.log_message_ui("validate_error_motion_numeric", "ERROR", is_key=True); return False
+                if motion_threshold <= 0:
+                    self.log_message_ui("validate_error_motion_threshold_positive", "ERROR", is_key=True); return False
+                if 0 < motion_max_interval < interval:
+                    self.log_message_ui("validate_error_motion_max_interval_format", "ERROR", is_key=True,
+                                        interval=interval); return False
             if selected_format == "jpeg":
                 try:
                     jpeg_q = int(self.jpeg_quality_var.get())
@@ -1636,6 +2178,17 @@ class Insta360ConvertGUI(tk.Tk):
                     self.log_message_ui("validate_error_video_quality_range", "ERROR", is_key=True); return False
             except ValueError:
                 self.log_message_ui("validate_error_video_quality_integer", "ERROR", is_key=True); return False
+        if self._get_decode_mode_key() == DECODE_MODE_GROUP_SIZE:
+            try:
+                if int(self.views_per_decode_var.get()) <= 0:
+                    self.log_message_ui("validate_error_views_per_decode_positive", "ERROR", is_key=True); return False
+            except ValueError:
+                self.log_message_ui("validate_error_views_per_decode_positive", "ERROR", is_key=True); return False
+        try:
+            if int(self.time_segments_var.get()) <= 0:
+                self.log_message_ui("validate_error_time_segments_positive", "ERROR", is_key=True); return False
+        except ValueError:
+            self.log_message_ui("validate_error_time_segments_positive", "ERROR", is_key=True); return False
         try:
             width, height = self.get_output_resolution()
             if width <= 0 or height <= 0:
@@ -1786,6 +2339,14 @@ class Insta360ConvertGUI(tk.Tk):
             postshot_output = os.path.join(rig_folder, "postshot")
             self.colmap_postshot_default = postshot_output
             self.colmap_postshot_folder_var.set(postshot_output)
+        dedup_threshold = DEFAULT_DUPLICATE_HAMMING_THRESHOLD
+        if self.colmap_dedup_var.get():
+            try:
+                dedup_threshold = int(self.colmap_dedup_threshold_var.get())
+                if not 0 <= dedup_threshold <= 64: raise ValueError
+            except ValueError:
+                self.log_message_ui("validate_error_colmap_dedup_threshold", "ERROR", is_key=True)
+                return None
         preset_key = self._get_colmap_preset_key()
         preset = COLMAP_PRESETS.get(preset_key) or COLMAP_PRESETS.get(COLMAP_DEFAULT_PRESET_KEY, {})
         preset_matcher = preset.get("matcher", "sequential")
@@ -1832,11 +2393,14 @@ class Insta360ConvertGUI(tk.Tk):
             "matcher": matcher,
             "preset_key": preset_key,
             "options": options,
-            "vocab_tree_path": vocab_tree_path
+            "vocab_tree_path": vocab_tree_path,
+            "dedup_enabled": bool(self.colmap_dedup_var.get()),
+            "dedup_threshold": dedup_threshold
         }
 
     def log_message_ui_threadsafe(self, message_key_or_literal, level="INFO", is_key=False, *args, **kwargs):
-        self.after(0, lambda: self.log_message_ui(message_key_or_literal, level, is_key, *args, **kwargs))
+        # log_message_ui only formats the line and queues it on the UI update bus, so it is safe from any thread.
+        self.log_message_ui(message_key_or_literal, level, is_key, *args, **kwargs)
 
     def _now_iso_timestamp(self):
         return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
@@ -2078,7 +2642,8 @@ class Insta360ConvertGUI(tk.Tk):
             self.colmap_progress_bar["value"] = percent
 
     def _update_colmap_progress_display_threadsafe(self):
-        self.after(0, self._update_colmap_progress_display)
+        # Many log lines can move the progress in one flush interval; only the last refresh matters.
+        self.ui_update_bus.post_latest("colmap_progress", self._update_colmap_progress_display)
 
     def _start_colmap_progress_timer(self):
         if self.colmap_progress_after_id:
@@ -2494,6 +3059,10 @@ class Insta360ConvertGUI(tk.Tk):
                 mapper_cmd = apply_supported_options("mapper", mapper_cmd, options.get("mapper", {}),
                                                      alias_map=mapper_alias_map)
 
+            if config.get("dedup_enabled") and start_index == 0:
+                if not self._suppress_duplicate_rig_frames(config):
+                    return
+
             step_commands = [
                 ("feature_extractor", feature_cmd),
                 ("rig_configurator", rig_cmd),
@@ -2546,6 +3115,38 @@ class Insta360ConvertGUI(tk.Tk):
             self.after(0, self.update_colmap_controls_state)
             self.after(0, lambda: self._finalize_colmap_progress(success))
 
+    def _suppress_duplicate_rig_frames(self, config):
+        # Runs in the COLMAP thread before feature extraction; returns False only when cancelled.
+        if not is_duplicate_suppression_available():
+            self.log_message_ui_threadsafe("log_colmap_dedup_numpy_unavailable", "WARNING", is_key=True)
+            return True
+        if not self.ffmpeg_path:
+            self.log_message_ui_threadsafe("log_colmap_dedup_ffmpeg_unavailable", "WARNING", is_key=True)
+            return True
+        self.log_message_ui_threadsafe("log_colmap_dedup_start_format", "INFO", is_key=True,
+                                       threshold=config["dedup_threshold"])
+        try:
+            result = suppress_duplicate_frames(self.ffmpeg_path, config["rig_folder"], config["dedup_threshold"],
+                                               should_stop=self.colmap_cancel_event.is_set,
+                                               startupinfo=self.get_startupinfo(), ffmpeg_version=self.ffmpeg_version)
+        except Exception as e: # pylint: disable=broad-except
+            self.log_message_ui_threadsafe("log_colmap_dedup_failed_format", "WARNING", is_key=True, error=str(e))
+            return True
+        if result is None:
+            self.log_message_ui_threadsafe("log_colmap_pipeline_cancelled", "INFO", is_key=True)
+            return False
+        self.log_message_ui_threadsafe("log_colmap_dedup_result_format", "INFO", is_key=True,
+                                       removed=result["removed"], checked=result["checked"],
+                                       report=result["report_path"] or "-", removed_dir=result["removed_dir"])
+        if result["removed"]:
+            # Progress totals and the resume snapshot must describe the images COLMAP actually sees.
+            images_snapshot = self._get_images_snapshot(config["images_dir"])
+            config["image_count"] = images_snapshot.get("count", 0) if images_snapshot else 0
+            config["frame_count"] = self._get_frame_count(config["images_dir"])
+            if config.get("state_data") is not None:
+                config["state_data"]["images_snapshot"] = images_snapshot
+        return True
+
     def _run_colmap_command(self, command, log_prefix="COLMAP"):
         if self.colmap_cancel_event and self.colmap_cancel_event.is_set():
             self.log_message_ui_threadsafe("log_colmap_pipeline_cancelled", "INFO", is_key=True)
@@ -2584,7 +3185,8 @@ class Insta360ConvertGUI(tk.Tk):
                             unsupported_option = True
                         self._update_colmap_progress_from_log(clean_line)
                         prefix = "GLOMAP" if log_prefix == "GLOMAP" else "COLMAP"
-                        self.log_message_ui_threadsafe(f"{prefix}: {clean_line}", "DEBUG")
+                        self._emit_log_message(f"{prefix}: {clean_line}", "DEBUG", prefix.lower(),
+                                               step=self.colmap_active_step)
             self.colmap_active_process.wait()
             if self.colmap_active_process.returncode != 0:
                 if log_prefix == "GLOMAP":
@@ -2656,6 +3258,8 @@ class Insta360ConvertGUI(tk.Tk):
         else: self.custom_resolution_entry.config(state=tk.DISABLED)
         self.cuda_check.config(state=new_state_normal if self.cuda_available else tk.DISABLED)
         self.interp_combo.config(state=new_state_readonly)
+        self.reprojection_combo.config(state=new_state_readonly)
+        self.update_prescale_controls_state(converting=converting)
         self.output_mode_standard_radio.config(state=new_state_normal)
         self.output_mode_colmap_radio.config(state=new_state_normal)
         if self.yaw_selector_widget:
@@ -2665,8 +3269,9 @@ class Insta360ConvertGUI(tk.Tk):
                 if hasattr(self.yaw_selector_widget, 'enable_controls'): self.yaw_selector_widget.enable_controls()
         self.png_radio.config(state=new_state_normal); self.jpeg_radio.config(state=new_state_normal); self.video_radio.config(state=new_state_normal)
         self.update_output_format_options()
-        self.parallel_combo.config(state=new_state_readonly)
+        self.update_decode_mode_controls_state(converting=converting)
         self.start_button.config(state=new_state_normal)
+        self.estimate_button.config(state=new_state_normal)
         self.cancel_button.config(state=tk.DISABLED if not converting else tk.NORMAL)
         if hasattr(self, 'menubar'):
             try:
@@ -2746,7 +3351,6 @@ class Insta360ConvertGUI(tk.Tk):
             except Exception as e: # pylint: disable=broad-except
                 self.log_message_ui("log_colmap_rig_session_prefix_error_format", "ERROR", is_key=True, error=str(e))
                 return
-            self.log_message_ui("log_colmap_rig_session_prefix_format", "INFO", is_key=True, prefix=colmap_session_prefix)
         self.cuda_checked_for_high_res_compatibility = False; self.cuda_fallback_triggered_for_high_res = False
         self.cuda_compatibility_confirmed_for_high_res = False
         is_high_res_input = (self.video_width > HIGH_RESOLUTION_THRESHOLD or self.video_height > HIGH_RESOLUTION_THRESHOLD)
@@ -2761,7 +3365,13 @@ class Insta360ConvertGUI(tk.Tk):
             self.cuda_checked_for_high_res_compatibility = True
             self.cuda_compatibility_confirmed_for_high_res = True if effective_use_cuda else True
         self.total_tasks_for_conversion = len(viewpoints); self.completed_tasks_count = 0; self.active_tasks_count = 0
-        self.task_durations = []; self.final_conversion_message = None
+        self.task_durations = []; self.final_conversion_message = None; self.conversion_end_status_key = None
+        self.viewpoint_frames_done = {}; self.running_task_speeds = {}; self.expected_frames_per_viewpoint = None
+        self.resumed_frames = 0; self.resume_manifest_dir = None; self.failed_tasks_count = 0
+        self.viewpoint_fingerprints = {}; self.viewpoint_pending_tasks = {}; self.reused_viewpoint_indices = set()
+        self.conversion_viewpoint_count = len(viewpoints); self.measured_output_fps = 0.0
+        self.fps_sample_time = time.time(); self.fps_sample_frames = 0; self.frame_progress_text_var.set("")
+        self.eta_estimator = None
         self.overall_remaining_seconds_at_last_avg_calculation = None; self.timestamp_of_last_avg_calculation = None
         self.toggle_ui_state(converting=True); self.log_message_ui("log_conversion_starting_parallel", "INFO", is_key=True)
         self.progress_bar["value"] = 0; self.progress_bar["maximum"] = 100
@@ -2769,20 +3379,19 @@ class Insta360ConvertGUI(tk.Tk):
         self.start_time = time.time(); self.elapsed_time_str = "00:00:00"
         self.overall_remaining_str = S.get("time_display_remaining_calculating") if self.total_tasks_for_conversion > 0 else S.get("time_display_not_started")
         self.update_time_label_display()
-        try:
-            num_parallel = int(self.parallel_processes_var.get())
-            if num_parallel <= 0: raise ValueError("Parallel processes must be positive.")
-        except ValueError:
-            num_parallel = 1; self.log_message_ui("log_parallel_processes_invalid_fallback_format", "WARNING", is_key=True)
-            self.parallel_processes_var.set("1")
-        try:
-            if self.manager_mp is None or (hasattr(self.manager_mp, '_process') and not self.manager_mp._process.is_alive()): # type: ignore
-                self.manager_mp = multiprocessing.Manager()
-            self.log_queue_mp = self.manager_mp.Queue(); self.progress_queue_mp = self.manager_mp.Queue()
-            self.cancel_event_mp = self.manager_mp.Event(); self.conversion_pool = multiprocessing.Pool(processes=num_parallel)
-        except Exception as e: # pylint: disable=broad-except
-            self.log_message_ui("log_multiprocessing_init_error_format", "CRITICAL", is_key=True, error=str(e))
-            self.toggle_ui_state(converting=False); self.start_time = 0; return
+        # The plan is only written to the settings fields once the run cost has been confirmed.
+        conversion_plan = self._plan_conversion(viewpoints)
+        auto_settings = self._auto_plan_settings(conversion_plan)
+        parallel_invalid = False
+        if auto_settings is not None:
+            num_parallel = auto_settings["parallel"]
+        else:
+            try:
+                num_parallel = int(self.parallel_processes_var.get())
+                if num_parallel <= 0: raise ValueError("Parallel processes must be positive.")
+            except ValueError:
+                num_parallel = 1; parallel_invalid = True
+        self.run_cost_estimate = self._estimate_run_cost(viewpoints, num_parallel, auto_settings)
         output_w, output_h = self.get_output_resolution()
         self.colmap_rig_context = None
         if output_mode == "colmap_rig":
@@ -2812,25 +3421,830 @@ class Insta360ConvertGUI(tk.Tk):
             "colmap_session_prefix": colmap_session_prefix,
             "frame_interval": frame_interval_for_worker, "video_preset": self.preset_var.get(),
             "video_cq": self.cq_var.get(), "png_pred_option": self.png_pred_options_map.get(self.png_pred_var.get(), "3"),
-            "jpeg_quality": jpeg_quality_for_worker
+            "jpeg_quality": jpeg_quality_for_worker,
+            "input_resolution": (self.video_width, self.video_height), "input_fps": self.video_fps,
+            "time_segments": auto_settings["time_segments"] if auto_settings else self._get_time_segment_count(),
+            "ffmpeg_version": self.ffmpeg_version
         }
-        for i, vp_data in enumerate(viewpoints):
-            self.conversion_pool.apply_async(ffmpeg_worker_process,
-                                             args=(i, vp_data, worker_config,
-                                                   self.log_queue_mp, self.progress_queue_mp, self.cancel_event_mp))
-            self.active_tasks_count += 1
-        self.conversion_pool.close()
+        if auto_settings is not None:
+            worker_config["threads_ffmpeg"] = conversion_plan["threads_per_job"]
+        reprojection_backend = self._get_reprojection_backend_key()
+        frame_sampling = FRAME_SAMPLING_FPS
+        if worker_config["output_format"] in ["png", "jpeg"]:
+            frame_sampling = self._get_frame_sampling_key()
+        if frame_sampling == FRAME_SAMPLING_SEEK:
+            frame_samples = plan_interval_samples(self.video_duration, frame_interval_for_worker)
+            if not frame_samples:
+                self.log_message_ui("log_frame_sampling_duration_unknown", "WARNING", is_key=True)
+                frame_sampling = FRAME_SAMPLING_FPS
+            else:
+                worker_config["frame_samples"] = frame_samples
+                self.log_message_ui("log_frame_sampling_seek_format", "INFO", is_key=True,
+                                    count=len(frame_samples), interval=frame_interval_for_worker)
+        elif frame_sampling == FRAME_SAMPLING_KEYFRAMES:
+            self.log_message_ui("log_frame_sampling_keyframes", "INFO", is_key=True)
+        elif frame_sampling in ANALYSIS_FRAME_SAMPLINGS and not is_frame_analysis_available():
+            self.log_message_ui("log_frame_analysis_numpy_unavailable", "WARNING", is_key=True)
+            frame_sampling = FRAME_SAMPLING_FPS
+        elif frame_sampling == FRAME_SAMPLING_MOTION:
+            try:
+                worker_config["motion_threshold"] = float(self.motion_threshold_var.get())
+                worker_config["motion_max_interval"] = float(self.motion_max_interval_var.get())
+            except ValueError:
+                worker_config["motion_threshold"] = DEFAULT_MOTION_THRESHOLD
+                worker_config["motion_max_interval"] = DEFAULT_MOTION_MAX_INTERVAL_SEC
+        if frame_sampling != FRAME_SAMPLING_FPS and reprojection_backend == REPROJECTION_BACKEND_NUMPY_REMAP:
+            self.log_message_ui("log_frame_sampling_uses_v360", "WARNING", is_key=True)
+            reprojection_backend = REPROJECTION_BACKEND_V360
+        worker_config["frame_sampling"] = frame_sampling
+        if reprojection_backend == REPROJECTION_BACKEND_NUMPY_REMAP:
+            if not is_numpy_available():
+                self.log_message_ui("log_reprojection_numpy_unavailable", "WARNING", is_key=True)
+                reprojection_backend = REPROJECTION_BACKEND_V360
+            elif self.video_width <= 0 or self.video_height <= 0:
+                self.log_message_ui("log_reprojection_input_size_unknown", "WARNING", is_key=True)
+                reprojection_backend = REPROJECTION_BACKEND_V360
+            elif remap_interp_for(worker_config["interp"]) != worker_config["interp"]:
+                self.log_message_ui("log_reprojection_interp_approximated_format", "WARNING", is_key=True,
+                                    interp=worker_config["interp"])
+        worker_config["reprojection_backend"] = reprojection_backend
+        if reprojection_backend == REPROJECTION_BACKEND_NUMPY_REMAP:
+            worker_config["remap_cache_dir"] = os.path.abspath(REMAP_CACHE_DIR_NAME)
+            worker_config["remap_cache_max_bytes"] = REMAP_CACHE_MAX_BYTES
+        if self.prescale_var.get():
+            if reprojection_backend == REPROJECTION_BACKEND_V360:
+                worker_config["prescale_max_loss"] = self._get_prescale_max_loss()
+                self._log_prescale_plan(viewpoints, worker_config)
+            else:
+                self.log_message_ui("log_prescale_remap_ignored", "INFO", is_key=True)
+        reuse_plan = self._plan_output_reuse(viewpoints, worker_config)
+        # Checked before any setting, IPC object or output file is touched, so a refusal leaves everything as it was.
+        if self.run_cost_estimate is not None and not self._confirm_run_cost(
+                self.run_cost_estimate, self._disk_bytes_needed(self.run_cost_estimate, viewpoints, worker_config, reuse_plan)):
+            self.run_cost_estimate = None; self.colmap_rig_context = None
+            self.toggle_ui_state(converting=False); self.start_time = 0; return
+        self._apply_conversion_plan(conversion_plan)
+        if parallel_invalid:
+            self.log_message_ui("log_parallel_processes_invalid_fallback_format", "WARNING", is_key=True)
+            self.parallel_processes_var.set("1")
+        try:
+            if self.manager_mp is None or (hasattr(self.manager_mp, '_process') and not self.manager_mp._process.is_alive()): # type: ignore
+                self.manager_mp = multiprocessing.Manager() # Only for objects created after the pool starts (thread budget)
+            # Direct pipes instead of Manager proxies: a put no longer round-trips through the manager process.
+            # They are handed to the workers by the pool initializer (init_worker_channels).
+            self.log_queue_mp = multiprocessing.Queue(); self.progress_queue_mp = multiprocessing.Queue()
+            self.cancel_event_mp = multiprocessing.Event()
+        except Exception as e: # pylint: disable=broad-except
+            self.log_message_ui("log_multiprocessing_init_error_format", "CRITICAL", is_key=True, error=str(e))
+            self.conversion_plan_record = None; self.run_cost_estimate = None
+            self.toggle_ui_state(converting=False); self.start_time = 0; return
+        self.reused_viewpoint_indices = self._reuse_unchanged_outputs(viewpoints, worker_config, reuse_plan)
+        if output_mode == "colmap_rig":
+            self.log_message_ui("log_colmap_rig_session_prefix_format", "INFO", is_key=True,
+                                prefix=worker_config["colmap_session_prefix"])
+        decode_mode = self._get_decode_mode_key()
+        try: views_per_decode = int(self.views_per_decode_var.get())
+        except ValueError: views_per_decode = DEFAULT_VIEWS_PER_DECODE
+        decode_groups = build_decode_groups(viewpoints, decode_mode, views_per_decode)
+        if self.reused_viewpoint_indices:
+            # Reused viewpoints count as finished tasks; only the changed ones are converted.
+            decode_groups = [group for group in ([i for i in group if i not in self.reused_viewpoint_indices]
+                                                 for group in decode_groups) if group]
+            self.completed_tasks_count += len(self.reused_viewpoint_indices)
+        if decode_mode != DECODE_MODE_PER_VIEWPOINT:
+            self.log_message_ui("log_decode_groups_format", "INFO", is_key=True,
+                                groups=len(decode_groups), count=len(viewpoints))
+        pool_size = num_parallel
+        frame_server_groups = None
+        if reprojection_backend == REPROJECTION_BACKEND_NUMPY_REMAP:
+            self.log_message_ui("log_reprojection_remap_format", "INFO", is_key=True, groups=len(decode_groups),
+                                cache_dir=worker_config["remap_cache_dir"])
+            if len(decode_groups) > 1:
+                # One decoder feeds every group through shared memory instead of each group decoding the input.
+                frame_server_groups = limit_decode_group_count(decode_groups, num_parallel)
+                try:
+                    self.frame_ring = FrameRing.create(frame_ring_layout((self.video_width, self.video_height),
+                                                                         FRAME_SERVER_BUFFER_BYTES,
+                                                                         len(frame_server_groups)))
+                except Exception as e: # pylint: disable=broad-except
+                    self.log_message_ui("log_frame_server_init_error_format", "WARNING", is_key=True, error=str(e))
+                    frame_server_groups = None
+                else:
+                    pool_size = len(frame_server_groups) + 1 # Consumers must run alongside the decoder
+                    self.log_message_ui("log_frame_server_format", "INFO", is_key=True,
+                                        workers=len(frame_server_groups), slots=self.frame_ring.slots,
+                                        buffer_mb=self.frame_ring.layout["total_bytes"] / (1024 * 1024))
+        try:
+            frame_ring_condition = multiprocessing.Condition() if frame_server_groups else None
+            self.conversion_pool = multiprocessing.Pool(processes=pool_size, initializer=init_worker_channels,
+                                                        initargs=(self.log_queue_mp, self.progress_queue_mp,
+                                                                  self.cancel_event_mp, frame_ring_condition,
+                                                                  self._get_ffmpeg_log_verbosity_key()))
+            self.conversion_pool_size = pool_size
+            self._reset_pool_scheduler(pool_size, adaptive=self.auto_plan_var.get() and not frame_server_groups)
+        except Exception as e: # pylint: disable=broad-except
+            self.log_message_ui("log_multiprocessing_init_error_format", "CRITICAL", is_key=True, error=str(e))
+            self._release_frame_ring()
+            self.toggle_ui_state(converting=False); self.start_time = 0; return
+        if frame_server_groups:
+            self.conversion_pool.apply_async(frame_server_decoder_process,
+                                             args=(self.frame_ring.layout, worker_config))
+            for consumer_idx, group_indices in enumerate(frame_server_groups):
+                self.conversion_pool.apply_async(frame_server_consumer_process,
+                                                 args=(consumer_idx, self.frame_ring.layout, group_indices,
+                                                       [viewpoints[i] for i in group_indices], worker_config))
+                self.active_tasks_count += len(group_indices)
+                for i in group_indices:
+                    self.viewpoint_pending_tasks[i] = 1
+            decode_groups = []
+        if frame_sampling in ANALYSIS_FRAME_SAMPLINGS and decode_groups:
+            # Extraction is submitted once the analysis thread has chosen the frames.
+            self.log_message_ui("log_frame_analysis_starting", "INFO", is_key=True)
+            threading.Thread(target=self._run_frame_analysis_thread,
+                             args=(viewpoints, decode_groups, worker_config), daemon=True).start()
+        else:
+            self._submit_decode_group_tasks(viewpoints, decode_groups, worker_config)
         if self.total_tasks_for_conversion > 0: self.after(100, self.process_mp_queues)
         else: self.conversion_finished_or_cancelled_mp()
 
+    def _run_frame_analysis_thread(self, viewpoints, decode_groups, worker_config):
+        cancel_event = self.cancel_event_mp
+        frame_samples = None
+        try:
+            frame_samples, from_cache, sidecar_path = plan_analysis_samples(
+                self.ffmpeg_path, worker_config["input_file"], worker_config["output_folder"],
+                worker_config["frame_sampling"],
+                worker_config["frame_interval"],
+                motion_threshold=worker_config.get("motion_threshold", DEFAULT_MOTION_THRESHOLD),
+                motion_max_interval=worker_config.get("motion_max_interval", DEFAULT_MOTION_MAX_INTERVAL_SEC),
+                should_stop=cancel_event.is_set,
+                progress_callback=lambda frames_done, position: self.log_message_ui_threadsafe(
+                    "log_frame_analysis_progress_format", "INFO", True, frames=frames_done, position=position),
+                startupinfo=self.get_startupinfo(), ffmpeg_version=self.ffmpeg_version)
+            if frame_samples is not None:
+                if from_cache:
+                    self.log_message_ui_threadsafe("log_frame_analysis_cached_format", "INFO", True, path=sidecar_path)
+                elif sidecar_path:
+                    self.log_message_ui_threadsafe("log_frame_analysis_saved_format", "INFO", True, path=sidecar_path)
+                if worker_config["frame_sampling"] == FRAME_SAMPLING_MOTION:
+                    self.log_message_ui_threadsafe("log_frame_analysis_selected_motion_format", "INFO", True,
+                                                   count=len(frame_samples), threshold=worker_config["motion_threshold"],
+                                                   min_interval=worker_config["frame_interval"],
+                                                   max_interval=worker_config["motion_max_interval"])
+                else:
+                    self.log_message_ui_threadsafe("log_frame_analysis_selected_format", "INFO", True,
+                                                   count=len(frame_samples), interval=worker_config["frame_interval"])
+                if frame_samples:
+                    # Selected frames are not evenly spaced, so record which time each frame number came from.
+                    write_frame_times(frame_times_path(worker_config), frame_samples,
+                                      worker_config["frame_sampling"], worker_config["input_file"])
+        except Exception as e: # pylint: disable=broad-except
+            self.log_message_ui_threadsafe("log_frame_analysis_failed_format", "ERROR", True, error=str(e))
+            self.after(0, lambda: self._end_run_without_frames("viewpoint_progress_status_analysis_failed"))
+            return
+        self.after(0, lambda: self._on_frame_analysis_finished(viewpoints, decode_groups, worker_config, frame_samples))
+
+    def _on_frame_analysis_finished(self, viewpoints, decode_groups, worker_config, frame_samples):
+        if not self.conversion_pool or (self.cancel_event_mp and self.cancel_event_mp.is_set()):
+            return # Cancelled while analyzing; process_mp_queues finishes the run
+        if not frame_samples:
+            self.log_message_ui("log_frame_analysis_no_samples", "WARNING", is_key=True)
+            self._end_run_without_frames("viewpoint_progress_status_no_frames")
+            return
+        worker_config["frame_samples"] = frame_samples
+        self._submit_decode_group_tasks(viewpoints, decode_groups, worker_config)
+
+    def _end_run_without_frames(self, status_key):
+        # Analysis chose no frames (or failed), so nothing was submitted: finish now instead of waiting for tasks.
+        # Not a cancellation, and nothing is recorded: a run without output would skew the cost calibration.
+        if not self.conversion_pool or (self.cancel_event_mp and self.cancel_event_mp.is_set()):
+            return
+        self.conversion_end_status_key = status_key
+        self.conversion_plan_record = None; self.run_cost_estimate = None; self.colmap_rig_context = None
+        self.pending_pool_tasks.clear(); self.pool_task_submission_complete = False
+        self.conversion_pool.close()
+        self.conversion_finished_or_cancelled_mp()
+
+    def _plan_conversion(self, viewpoints):
+        """
+        入力・視点数・CPU/メモリから並列化の方針を立て、判断理由と方針をログに出します。設定欄は変更しません。
+        自動が無効の場合、方針は提案としてログに出すだけです。
+
+        Returns:
+            dict or None: plan_parallel_conversion の戻り値。失敗した場合は None。
+        """
+        output_format = self.output_format_var.get()
+        frame_interval = 0.0
+        if output_format in ["png", "jpeg"]:
+            try: frame_interval = float(self.frame_interval_var.get())
+            except ValueError: frame_interval = 1.0
+        frame_sampling = self._get_frame_sampling_key() if output_format in ["png", "jpeg"] else FRAME_SAMPLING_FPS
+        can_time_slice = (output_format in ["png", "jpeg"] and frame_sampling != FRAME_SAMPLING_KEYFRAMES and
+                          (frame_sampling != FRAME_SAMPLING_FPS or
+                           self._get_reprojection_backend_key() == REPROJECTION_BACKEND_V360))
+        try:
+            plan = plan_parallel_conversion(self.logical_cores, get_available_memory_bytes(),
+                                            (self.video_width, self.video_height), self.video_codec,
+                                            self.video_duration, frame_interval, viewpoints,
+                                            self.get_output_resolution(), output_format, can_time_slice)
+        except Exception as e: # pylint: disable=broad-except
+            self.log_message_ui("log_conversion_plan_failed_format", "WARNING", is_key=True, error=str(e))
+            return None
+        for reason_key, reason_kwargs in plan["reasons"]:
+            self.log_message_ui(reason_key, "INFO", is_key=True, **reason_kwargs)
+        log_key = "log_conversion_plan_format" if self.auto_plan_var.get() else "log_conversion_plan_suggested_format"
+        self.log_message_ui(log_key, "INFO", is_key=True, strategy=plan["strategy"], parallel=plan["parallel"],
+                            decode_mode=self._decode_mode_display(plan["decode_mode"]), segments=plan["time_segments"],
+                            threads=plan["threads_per_job"])
+        return plan
+
+    def _decode_mode_display(self, decode_mode_key):
+        return next((name for name, key in self.decode_mode_options_map.items() if key == decode_mode_key),
+                    decode_mode_key)
+
+    def _auto_plan_settings(self, plan):
+        """
+        自動が有効なら方針の並列数/デコード方式/時間分割を、無効 (または方針がない) なら None を返します。
+        """
+        if plan is None or not self.auto_plan_var.get():
+            return None
+        return {"parallel": plan["parallel"], "decode_mode": plan["decode_mode"], "time_segments": plan["time_segments"]}
+
+    def _apply_conversion_plan(self, plan):
+        """
+        自動が有効なら方針を並列数/デコード方式/時間分割の欄に反映し、書き換えた値は元の値とともにログに出します。
+        方針は変換終了時に履歴ファイルへ記録されます。
+        """
+        if plan is None:
+            self.conversion_plan_record = None
+            return
+        auto_settings = self._auto_plan_settings(plan)
+        if auto_settings is not None:
+            replacements = [
+                ("parallel_processes_label", self.parallel_processes_var, str(auto_settings["parallel"])),
+                ("decode_mode_label", self.decode_mode_var, self._decode_mode_display(auto_settings["decode_mode"])),
+                ("time_segments_label", self.time_segments_var, str(auto_settings["time_segments"])),
+            ]
+            for label_key, var, new_value in replacements:
+                old_value = var.get()
+                if old_value == new_value:
+                    continue
+                var.set(new_value)
+                self.log_message_ui("log_conversion_plan_replaced_format", "INFO", is_key=True,
+                                    setting=S.get(label_key).rstrip(":："), old=old_value, new=new_value)
+        self.conversion_plan_record = {
+            "input_file": self.input_file_var.get(),
+            "auto": auto_settings is not None,
+            "plan": {key: value for key, value in plan.items() if key != "reasons"},
+            "applied": {"parallel": self.parallel_processes_var.get(), "decode_mode": self._get_decode_mode_key(),
+                        "views_per_decode": self.views_per_decode_var.get(),
+                        "time_segments": self.time_segments_var.get()},
+        }
+
+    def _record_conversion_plan(self, elapsed_seconds, was_cancelled):
+        if self.conversion_plan_record is None:
+            return
+        record = dict(self.conversion_plan_record, elapsed_sec=round(elapsed_seconds, 2),
+                      status="cancelled" if was_cancelled else "completed",
+                      completed_tasks=self.completed_tasks_count, total_tasks=self.total_tasks_for_conversion)
+        if self.run_cost_estimate is not None:
+            record["cost"] = self._run_cost_record(was_cancelled)
+        self.conversion_plan_record = None; self.run_cost_estimate = None
+        try:
+            append_plan_record(os.path.abspath(CONVERSION_PLAN_HISTORY_FILE), record)
+        except (OSError, TypeError, ValueError) as e:
+            self.log_message_ui("log_conversion_plan_record_failed_format", "WARNING", is_key=True, error=str(e))
+
+    def show_run_cost_estimate(self):
+        """
+        変換を始めずに、現在の設定での出力フレーム数・ディスク使用量・所要時間の見積もりをログに出します。
+        自動並列化が有効なら、変換開始時と同じ方針の値で見積もります (設定欄は変更しません)。
+        """
+        if not self.validate_inputs(): return
+        viewpoints = self.calculate_viewpoints()
+        if self.output_mode_var.get() == "colmap_rig":
+            viewpoints = prepare_viewpoints_for_colmap(viewpoints)
+        if not viewpoints: self.log_message_ui("log_conversion_cannot_start_no_viewpoints", "ERROR", is_key=True); return
+        auto_settings = self._auto_plan_settings(self._plan_conversion(viewpoints))
+        if auto_settings is not None:
+            num_parallel = auto_settings["parallel"]
+        else:
+            try: num_parallel = max(1, int(self.parallel_processes_var.get()))
+            except ValueError: num_parallel = 1
+        estimate = self._estimate_run_cost(viewpoints, num_parallel, auto_settings)
+        if estimate is not None:
+            self._report_run_cost(estimate)
+
+    def _estimate_run_cost(self, viewpoints, num_parallel, auto_settings=None):
+        """
+        現在の設定 (視点・解像度・形式と画質・抽出方法と間隔・デコード方式・時間分割・並列数) から変換のコストを見積もります。
+        auto_settings (_auto_plan_settings) を指定すると、デコード方式と時間分割は設定欄の代わりにその値を使います。
+
+        Returns:
+            dict or None: estimate_run_cost の戻り値に output_format, frame_sampling, parallel を加えたもの。
+                          長さが分からない場合や失敗した場合は None。
+        """
+        output_format = self.output_format_var.get()
+        frame_interval = 0.0
+        frame_sampling = FRAME_SAMPLING_FPS
+        if output_format in ["png", "jpeg"]:
+            try: frame_interval = float(self.frame_interval_var.get())
+            except ValueError: frame_interval = 1.0
+            frame_sampling = self._get_frame_sampling_key()
+        if self.video_duration <= 0:
+            self.log_message_ui("log_run_cost_duration_unknown", "WARNING", is_key=True)
+            return None
+        if output_format == "jpeg": quality = self.jpeg_quality_var.get()
+        elif output_format == "video": quality = self.cq_var.get()
+        else: quality = None
+        try: views_per_decode = int(self.views_per_decode_var.get())
+        except ValueError: views_per_decode = DEFAULT_VIEWS_PER_DECODE
+        if auto_settings is not None:
+            decode_mode, time_segments = auto_settings["decode_mode"], auto_settings["time_segments"]
+        else:
+            decode_mode, time_segments = self._get_decode_mode_key(), self._get_time_segment_count()
+        sample_count = None
+        if frame_sampling == FRAME_SAMPLING_SEEK:
+            sample_count = len(plan_interval_samples(self.video_duration, frame_interval)) or None
+        inputs = {
+            "input_size": (self.video_width, self.video_height), "input_codec": self.video_codec,
+            "input_fps": self.video_fps, "duration": self.video_duration, "viewpoints": len(viewpoints),
+            "output_size": self.get_output_resolution(), "output_format": output_format, "quality": quality,
+            "frame_sampling": frame_sampling, "frame_interval": frame_interval, "sample_count": sample_count,
+            "decode_groups": len(build_decode_groups(viewpoints, decode_mode, views_per_decode)),
+            "time_segments": time_segments if output_format in ["png", "jpeg"] else 1,
+            "parallel": num_parallel, "cpu_count": self.logical_cores,
+        }
+        try:
+            calibration = load_cost_calibration(os.path.abspath(CONVERSION_PLAN_HISTORY_FILE), output_format, frame_sampling)
+            estimate = estimate_run_cost(inputs, calibration)
+        except (KeyError, TypeError, ValueError) as e:
+            self.log_message_ui("log_run_cost_failed_format", "WARNING", is_key=True, error=str(e))
+            return None
+        return dict(estimate, output_format=output_format, frame_sampling=frame_sampling, parallel=num_parallel)
+
+    def _report_run_cost(self, estimate, disk_bytes=None):
+        """
+        見積もりと出力先の空き容量をログに出します。
+        disk_bytes (出力先で新たに必要な容量, _disk_bytes_needed) を指定すると、空き容量はその値と比べます (省略時は出力全体)。
+
+        Returns:
+            tuple: (check_disk_space の結果, 空き容量 (バイト) または None)。
+        """
+        calibration = estimate["calibration"]
+        self.log_message_ui("log_run_cost_estimate_format", "INFO", is_key=True, frames=estimate["frames"],
+                            per_view=estimate["frames_per_viewpoint"], views=estimate["viewpoints"],
+                            size=format_bytes(estimate["bytes"]), duration=str(timedelta(seconds=int(estimate["seconds"]))),
+                            parallel=estimate["parallel"])
+        if calibration["time_runs"] or calibration["bytes_runs"]:
+            self.log_message_ui("log_run_cost_calibrated_format", "INFO", is_key=True,
+                                time_runs=calibration["time_runs"], bytes_runs=calibration["bytes_runs"])
+        else:
+            self.log_message_ui("log_run_cost_uncalibrated", "INFO", is_key=True)
+        if disk_bytes is None:
+            disk_bytes = estimate["bytes"]
+        elif int(disk_bytes) != int(estimate["bytes"]):
+            self.log_message_ui("log_run_cost_disk_needed_format", "INFO", is_key=True, size=format_bytes(disk_bytes))
+        free_bytes = free_disk_bytes(self.output_folder_var.get())
+        if free_bytes is None:
+            self.log_message_ui("log_run_cost_free_space_unknown", "WARNING", is_key=True)
+        else:
+            self.log_message_ui("log_run_cost_free_space_format", "INFO", is_key=True, free=format_bytes(free_bytes))
+        status = check_disk_space(disk_bytes, free_bytes)
+        if status == "insufficient":
+            self.log_message_ui("log_run_cost_disk_insufficient_format", "WARNING", is_key=True,
+                                size=format_bytes(disk_bytes), free=format_bytes(free_bytes))
+        elif status == "warn":
+            self.log_message_ui("log_run_cost_disk_warn_format", "WARNING", is_key=True, size=format_bytes(disk_bytes),
+                                free=format_bytes(free_bytes), percent=disk_bytes * 100.0 / free_bytes)
+        return status, free_bytes
+
+    def _confirm_run_cost(self, estimate, disk_bytes):
+        # Asks before starting when the output will not fit on the drive or nearly fills it; the user may still go ahead.
+        status, free_bytes = self._report_run_cost(estimate, disk_bytes)
+        if status == "ok":
+            return True
+        size_text, free_text = format_bytes(disk_bytes), format_bytes(free_bytes)
+        output_folder = self.output_folder_var.get()
+        if status == "insufficient":
+            if not messagebox.askyesno(S.get("run_cost_disk_insufficient_title"),
+                                       S.get("run_cost_disk_insufficient_message_format", size=size_text, free=free_text,
+                                             path=output_folder), icon=messagebox.WARNING, default=messagebox.NO,
+                                       parent=self):
+                return False
+            self.log_message_ui("log_run_cost_disk_override", "WARNING", is_key=True)
+            return True
+        return messagebox.askyesno(S.get("run_cost_disk_warn_title"),
+                                   S.get("run_cost_disk_warn_message_format", size=size_text, free=free_text,
+                                         path=output_folder), parent=self)
+
+    def _disk_bytes_needed(self, estimate, viewpoints, worker_config, reuse_plan):
+        """
+        出力先で新たに必要な容量を見積もります。再利用する視点は数えず、変換する視点の出力パスに今あるファイル
+        (上書きされるもの、再開する変換で書き出し済みのフレーム) の分を差し引きます。
+        """
+        reused = reuse_plan["reused"] if reuse_plan else set()
+        config = worker_config
+        if reuse_plan and reuse_plan["rig"]:
+            config = dict(worker_config, colmap_session_prefix=reuse_plan["rig"][1]) # Continued session names the files
+        existing_bytes = []
+        for i, viewpoint in enumerate(viewpoints):
+            if i in reused:
+                continue
+            output_path, output_error = viewpoint_output_path(viewpoint, config)
+            existing_bytes.append(0 if output_error else measure_output([output_path])[1])
+        return additional_disk_bytes(estimate, existing_bytes)
+
+    def _run_cost_record(self, was_cancelled):
+        """
+        見積もりと実測を履歴用にまとめます。次回以降の見積もりはこの記録から補正されます (load_cost_calibration)。
+        再利用・再開で変換しなかった分は work_fraction で除き、出力サイズは完了した変換でのみ測ります。
+        """
+        estimate = self.run_cost_estimate
+        expected = self.expected_frames_per_viewpoint
+        view_count = max(1, self.conversion_viewpoint_count)
+        if expected:
+            work_fraction = max(0.0, 1.0 - self.resumed_frames / float(expected * view_count))
+        else:
+            work_fraction = max(0.0, 1.0 - len(self.reused_viewpoint_indices) / float(view_count))
+        cost = {
+            "version": COST_MODEL_VERSION, "output_format": estimate["output_format"],
+            "frame_sampling": estimate["frame_sampling"], "parallel": estimate["parallel"],
+            "frames_per_viewpoint": estimate["frames_per_viewpoint"],
+            "estimated_bytes": int(estimate["bytes"]), "estimated_seconds": round(estimate["seconds"], 2),
+            "model_bytes_per_frame": round(estimate["model_bytes_per_frame"], 2),
+            "model_seconds": round(estimate["model_seconds"], 2), "work_fraction": round(work_fraction, 4),
+        }
+        if not was_cancelled and self.failed_tasks_count == 0:
+            output_files, output_bytes = measure_output(
+                [output_path for output_path, _fp, _params, _session in self.viewpoint_fingerprints.values()])
+            cost.update(output_files=output_files, output_bytes=output_bytes)
+        return cost
+
+    def _get_time_segment_count(self):
+        try: return max(1, int(self.time_segments_var.get()))
+        except ValueError: return 1
+
+    def _build_time_segment_configs(self, worker_config, sample_ranges=None):
+        """
+        時間分割の各区間用の設定 (worker_config に time_segment を加えたもの) のリストを返します。
+        sample_ranges ([(先頭サンプル, 数), ...]) を指定すると、その範囲だけを変換します (中断した変換の再開)。
+        分割しない場合や、分割に対応しない組み合わせでは [worker_config] を返します。
+        """
+        requested_segments = worker_config.get("time_segments", 1)
+        resume = worker_config.get("resume_manifest")
+        if requested_segments <= 1 and not resume:
+            return [worker_config]
+        frame_sampling = worker_config.get("frame_sampling", FRAME_SAMPLING_FPS)
+        frame_samples = worker_config.get("frame_samples") or []
+        if frame_sampling in SEEK_BASED_FRAME_SAMPLINGS:
+            sample_count = len(frame_samples)
+        elif (frame_sampling == FRAME_SAMPLING_FPS and worker_config["output_format"] in ["png", "jpeg"]
+              and worker_config.get("reprojection_backend") == REPROJECTION_BACKEND_V360):
+            sample_count = len(plan_interval_samples(self.video_duration, worker_config["frame_interval"]))
+            if sample_count == 0:
+                self.log_message_ui("log_time_segments_duration_unknown", "WARNING", is_key=True)
+                return [worker_config]
+        else:
+            self.log_message_ui("log_time_segments_unsupported", "WARNING", is_key=True)
+            return [worker_config]
+        sample_ranges = sample_ranges or [(0, sample_count)]
+        remaining_samples = sum(count for _start, count in sample_ranges)
+        segments = []
+        for range_start, range_count in sample_ranges:
+            # Requested segments are shared out by length when only parts of the input are left.
+            range_segments = max(1, int(round(requested_segments * range_count / max(1, remaining_samples))))
+            segments.extend((range_start + start, count) for start, count in split_time_segments(range_count, range_segments))
+        if segments == [(0, sample_count)]:
+            return [dict(worker_config, resume_manifest=dict(resume, start_sample=0, sample_count=sample_count))
+                    if resume else worker_config]
+        configs = []
+        for segment_idx, (start, count) in enumerate(segments):
+            if frame_sampling in SEEK_BASED_FRAME_SAMPLINGS:
+                segment_config = dict(worker_config, frame_samples=frame_samples[start:start + count],
+                                      time_segment={"index": segment_idx, "count": len(segments)})
+            else:
+                segment_config = dict(worker_config, time_segment={"index": segment_idx, "count": len(segments),
+                                                                   "start_sample": start, "sample_count": count})
+            if resume:
+                segment_config["resume_manifest"] = dict(resume, start_sample=start, sample_count=count)
+            configs.append(segment_config)
+        if len(configs) > 1:
+            self.log_message_ui("log_time_segments_format", "INFO", is_key=True, segments=len(configs))
+        return configs
+
+    def _resumable_sample_count(self, worker_config):
+        # Samples per viewpoint when this run can be resumed later, else None.
+        # Video output, keyframes and the NumPy backend are not split into samples; COLMAP Rig names every run anew.
+        if (worker_config["output_format"] not in ["png", "jpeg"] or worker_config.get("output_mode") != "standard"
+                or worker_config.get("reprojection_backend") != REPROJECTION_BACKEND_V360):
+            return None
+        frame_sampling = worker_config.get("frame_sampling", FRAME_SAMPLING_FPS)
+        if frame_sampling in SEEK_BASED_FRAME_SAMPLINGS:
+            return len(worker_config.get("frame_samples") or []) or None
+        if frame_sampling == FRAME_SAMPLING_FPS:
+            return len(plan_interval_samples(self.video_duration, worker_config["frame_interval"])) or None
+        return None
+
+    def _plan_output_reuse(self, viewpoints, worker_config):
+        """
+        各視点の出力画素に影響する設定のフィンガープリントを計算し、前回と同じで再利用できる視点を調べます。
+        COLMAP Rig では同じ視点を最も多く含む前回のセッションを探します。ファイルは変更しません
+        (変換を始める前の空き容量の確認に使い、_reuse_unchanged_outputs で実行します)。
+
+        Returns:
+            dict or None: {"fingerprints": {視点: (fingerprint, params)}, "reused": 再利用できる視点の set,
+                           "rig": 引き継ぐ COLMAP Rig のセッション (rig_dir, session_prefix, moves) または None}。
+                          フィンガープリントを計算できない場合は None。
+        """
+        try:
+            fingerprints = {i: viewpoint_fingerprint(viewpoint, worker_config) for i, viewpoint in enumerate(viewpoints)}
+        except (OSError, KeyError, TypeError, ValueError) as e:
+            self.log_message_ui("log_incremental_fingerprint_error_format", "WARNING", is_key=True, error=str(e))
+            return None
+        reused = set()
+        rig = None
+        if worker_config["output_mode"] == "colmap_rig":
+            if worker_config["output_format"] in ["png", "jpeg"]:
+                rig_dir = build_colmap_output_dir(worker_config["output_folder"], worker_config["colmap_rig_name"], "")
+                session_prefix, matches = find_reusable_rig_session(
+                    rig_dir, {i: fingerprint for i, (fingerprint, _params) in fingerprints.items()}, DEFAULT_FRAME_PREFIX)
+                if session_prefix:
+                    # Frames of one rig snapshot must share their names across cameras, so the earlier session is continued.
+                    moves = {matches[i]: os.path.dirname(viewpoint_output_path(viewpoints[i], worker_config)[0])
+                             for i in matches}
+                    rig = (rig_dir, session_prefix, moves)
+                    reused = set(matches)
+        else:
+            for i, viewpoint in enumerate(viewpoints):
+                output_path, output_error = viewpoint_output_path(viewpoint, worker_config)
+                if not output_error and is_output_current(output_path, fingerprints[i][0]):
+                    reused.add(i)
+        return {"fingerprints": fingerprints, "reused": reused, "rig": rig}
+
+    def _reuse_unchanged_outputs(self, viewpoints, worker_config, reuse_plan):
+        """
+        _plan_output_reuse の計画どおりに、前回と同じ視点の出力を再利用します。
+        COLMAP Rig では前回のセッションを引き継ぎ、カメラ番号が変わった視点はフォルダを移します
+        (使わなくなったファイルは replaced_outputs へ移し、前回途中で止まった移動も先に回収します)。
+        変換し直す視点の記録は先に削除します (途中で止まった出力を再利用しないため)。
+
+        Returns:
+            set: 再利用する (変換しない) 視点のインデックス。
+        """
+        self.viewpoint_fingerprints = {}
+        if reuse_plan is None:
+            return set()
+        fingerprints = reuse_plan["fingerprints"]
+        reused = set()
+        if worker_config["output_mode"] == "colmap_rig" and worker_config["output_format"] in ["png", "jpeg"]:
+            rig_dir = build_colmap_output_dir(worker_config["output_folder"], worker_config["colmap_rig_name"], "")
+            try:
+                recovered = recover_rig_staging(rig_dir)
+            except OSError as e:
+                self.log_message_ui("log_incremental_rig_staging_recover_failed_format", "WARNING", is_key=True,
+                                    error=str(e))
+            else:
+                if recovered:
+                    self.log_message_ui("log_incremental_rig_staging_recovered_format", "WARNING", is_key=True,
+                                        count=recovered, path=rig_replaced_dir(rig_dir))
+        if reuse_plan["rig"] is not None:
+            rig_dir, session_prefix, moves = reuse_plan["rig"]
+            try:
+                replaced = reuse_rig_session(rig_dir, session_prefix, DEFAULT_FRAME_PREFIX, moves)
+            except OSError as e:
+                # The new session prefix does not collide with anything left half-moved; the staged files are
+                # collected into replaced_outputs on the next run (recover_rig_staging).
+                self.log_message_ui("log_incremental_rig_move_failed_format", "WARNING", is_key=True, error=str(e))
+            else:
+                worker_config["colmap_session_prefix"] = session_prefix
+                reused = set(reuse_plan["reused"])
+                self.log_message_ui("log_incremental_rig_session_format", "INFO", is_key=True, prefix=session_prefix,
+                                    moved=sum(1 for source, target in moves.items()
+                                              if os.path.normcase(source) != os.path.normcase(target)))
+                if replaced:
+                    self.log_message_ui("log_incremental_rig_replaced_format", "INFO", is_key=True, count=replaced,
+                                        path=rig_replaced_dir(rig_dir))
+        elif worker_config["output_mode"] != "colmap_rig":
+            reused = set(reuse_plan["reused"])
+        for i, viewpoint in enumerate(viewpoints):
+            output_path, output_error = viewpoint_output_path(viewpoint, worker_config)
+            if output_error:
+                continue
+            fingerprint, params = fingerprints[i]
+            self.viewpoint_fingerprints[i] = (output_path, fingerprint, params, worker_config.get("colmap_session_prefix"))
+            if i not in reused:
+                remove_fingerprint_record(output_path)
+        if reused:
+            self.log_message_ui("log_incremental_reuse_format", "INFO", is_key=True, reused=len(reused),
+                                total=len(viewpoints), converting=len(viewpoints) - len(reused))
+        return reused
+
+    def _on_viewpoint_task_succeeded(self, vp_idx):
+        # A viewpoint split into time segments is complete only when every segment has succeeded.
+        remaining = self.viewpoint_pending_tasks.get(vp_idx, 0) - 1
+        self.viewpoint_pending_tasks[vp_idx] = remaining
+        if remaining == 0:
+            self._write_viewpoint_fingerprint(vp_idx)
+
+    def _write_viewpoint_fingerprint(self, vp_idx):
+        if vp_idx not in self.viewpoint_fingerprints:
+            return
+        output_path, fingerprint, params, session_prefix = self.viewpoint_fingerprints[vp_idx]
+        try:
+            write_fingerprint_record(output_path, fingerprint, params, session_prefix=session_prefix)
+        except OSError as e:
+            self.log_message_ui("log_incremental_fingerprint_write_failed_format", "WARNING", is_key=True,
+                                index=vp_idx + 1, error=str(e))
+
+    def _apply_resume_manifest(self, viewpoints, decode_groups, worker_config):
+        """
+        前回の変換の記録 (conversion_manifest) を読み、書き出し済みの視点をグループから外して、
+        残りの視点で変換するサンプル区間を決めます。再開に対応しない設定ではそのまま返します。
+
+        Returns:
+            tuple: (decode_groups, worker_config, sample_ranges)。sample_ranges は None (全体) または [(先頭サンプル, 数), ...]。
+        """
+        total_samples = self._resumable_sample_count(worker_config)
+        if not total_samples:
+            return decode_groups, worker_config, None
+        try:
+            directory = manifest_dir(worker_config["output_folder"], manifest_key(worker_config, total_samples))
+            resume_plan = plan_resume(directory, {i: viewpoints[i] for group in decode_groups for i in group},
+                                      total_samples)
+        except OSError as e:
+            self.log_message_ui("log_resume_manifest_error_format", "WARNING", is_key=True, error=str(e))
+            return decode_groups, worker_config, None
+        self.resume_manifest_dir = directory
+        worker_config = dict(worker_config, resume_manifest={"dir": directory, "run_id": int(time.time() * 1000)})
+        sample_ranges = resume_plan["ranges"]
+        complete = set(resume_plan["complete"])
+        if not complete and sample_ranges == [(0, total_samples)]:
+            self.log_message_ui("log_resume_manifest_new_format", "DEBUG", is_key=True, path=directory)
+            return decode_groups, worker_config, sample_ranges
+        decode_groups = [group for group in ([i for i in group if i not in complete] for group in decode_groups) if group]
+        self.completed_tasks_count += len(complete) # Skipped viewpoints count as finished tasks
+        self.viewpoint_frames_done.update((vp_idx, done) for vp_idx, done in resume_plan["done_samples"].items() if done)
+        self.resumed_frames += sum(resume_plan["done_samples"].values())
+        for vp_idx in complete:
+            self._write_viewpoint_fingerprint(vp_idx)
+        self.viewpoint_progress_text_var.set(S.get("viewpoint_progress_format", completed=self.completed_tasks_count,
+                                                   total=self.total_tasks_for_conversion))
+        self.log_message_ui("log_resume_manifest_format", "INFO", is_key=True, skipped=len(complete),
+                            remaining=len(resume_plan["done_samples"]) - len(complete),
+                            samples=sum(count for _start, count in sample_ranges), total=total_samples,
+                            path=directory)
+        return decode_groups, worker_config, sample_ranges
+
+    def _submit_decode_group_tasks(self, viewpoints, decode_groups, worker_config):
+        frame_sampling = worker_config.get("frame_sampling", FRAME_SAMPLING_FPS)
+        reprojection_backend = worker_config.get("reprojection_backend", REPROJECTION_BACKEND_V360)
+        sample_ranges = None
+        if decode_groups:
+            decode_groups, worker_config, sample_ranges = self._apply_resume_manifest(viewpoints, decode_groups,
+                                                                                      worker_config)
+        segment_configs = (self._build_time_segment_configs(worker_config, sample_ranges) if decode_groups
+                           else [worker_config])
+        if len(segment_configs) > 1:
+            # Every (viewpoint, segment) pair reports its own task_result.
+            self.total_tasks_for_conversion += sum(len(group) for group in decode_groups) * (len(segment_configs) - 1)
+            self.viewpoint_progress_text_var.set(S.get("viewpoint_progress_format", completed=self.completed_tasks_count,
+                                                       total=self.total_tasks_for_conversion))
+        self.expected_frames_per_viewpoint = self._estimate_frames_per_viewpoint(worker_config)
+        if self.expected_frames_per_viewpoint:
+            for vp_idx in self.reused_viewpoint_indices:
+                self.viewpoint_frames_done[vp_idx] = self.expected_frames_per_viewpoint
+            self.resumed_frames += self.expected_frames_per_viewpoint * len(self.reused_viewpoint_indices)
+        if self.expected_frames_per_viewpoint and decode_groups:
+            self.eta_estimator = FrameEtaEstimator(self.expected_frames_per_viewpoint * self.conversion_viewpoint_count
+                                                   - self.resumed_frames)
+        if decode_groups and reprojection_backend != REPROJECTION_BACKEND_NUMPY_REMAP:
+            segment_configs = self._attach_thread_budget(segment_configs, len(decode_groups) * len(segment_configs))
+        for segment_config in segment_configs:
+            self._submit_decode_group_segment(viewpoints, decode_groups, segment_config,
+                                              frame_sampling, reprojection_backend)
+        self.pool_task_submission_complete = True
+        self._dispatch_pool_tasks()
+
+    def _attach_thread_budget(self, segment_configs, task_count):
+        # Split the cores across concurrent workers instead of giving every FFmpeg process all of them.
+        try:
+            budget = ThreadBudget(self.manager_mp, self.logical_cores, self.concurrency_target, task_count)
+        except Exception as e: # pylint: disable=broad-except
+            self.log_message_ui_threadsafe("log_thread_budget_init_error_format", "WARNING", True, error=str(e))
+            return segment_configs
+        first_wave = budget.allocation(use_cuda=segment_configs[0]["use_cuda"])
+        self.log_message_ui_threadsafe("log_thread_budget_format", "INFO", True, cores=budget.total_threads,
+                                       workers=min(budget.concurrency, task_count),
+                                       threads=budget.threads_per_job(), decode=first_wave["decode"],
+                                       filter=first_wave["filter"], encode=first_wave["encode"])
+        self.thread_budget = budget
+        return [dict(segment_config, thread_budget=budget) for segment_config in segment_configs]
+
+    def _reset_pool_scheduler(self, pool_size, adaptive):
+        self.pending_pool_tasks = deque()
+        self.pool_task_submission_complete = False
+        self.running_pool_jobs = 0
+        self.finished_pool_jobs = queue.Queue()
+        self.thread_budget = None
+        self.output_frames_done = 0
+        self.concurrency_controller = AdaptiveConcurrencyController(pool_size) if adaptive and pool_size > 1 else None
+        self.host_utilization_sampler = HostUtilizationSampler() if self.concurrency_controller else None
+        self.concurrency_target = self.concurrency_controller.target if self.concurrency_controller else pool_size
+        if self.concurrency_controller:
+            self.log_message_ui("log_concurrency_adaptive_start_format", "INFO", is_key=True,
+                                jobs=self.concurrency_target, max_jobs=pool_size)
+
+    def _queue_pool_task(self, func, args):
+        self.pending_pool_tasks.append((func, args))
+
+    def _dispatch_pool_tasks(self):
+        # Start queued jobs up to the current concurrency target; the pool itself is sized for the maximum.
+        if not self.conversion_pool:
+            return
+        while True:
+            try: self.finished_pool_jobs.get_nowait()
+            except queue.Empty: break
+            self.running_pool_jobs = max(0, self.running_pool_jobs - 1)
+        if self.cancel_event_mp and self.cancel_event_mp.is_set():
+            self.pending_pool_tasks.clear()
+        while self.pending_pool_tasks and self.running_pool_jobs < self.concurrency_target:
+            func, args = self.pending_pool_tasks.popleft()
+            self.conversion_pool.apply_async(func, args=args, callback=self._on_pool_job_finished,
+                                             error_callback=self._on_pool_job_finished)
+            self.running_pool_jobs += 1
+        if self.pool_task_submission_complete and not self.pending_pool_tasks:
+            self.conversion_pool.close()
+            self.pool_task_submission_complete = False # close() only once
+
+    def _on_pool_job_finished(self, _result):
+        # Runs on the pool's result-handler thread.
+        self.finished_pool_jobs.put(1)
+
+    def _update_concurrency_target(self):
+        if self.concurrency_controller is None:
+            return
+        cpu_busy, io_wait = (None, None)
+        now = time.time()
+        if now - (self.concurrency_controller.window_start or now) >= self.concurrency_controller.window_sec:
+            cpu_busy, io_wait = self.host_utilization_sampler.sample()
+        decision = self.concurrency_controller.observe(now, self.output_frames_done, cpu_busy, io_wait,
+                                                       running_jobs=self.running_pool_jobs)
+        if decision is None:
+            return
+        new_target, reason = decision
+        throughput = self.concurrency_controller.throughput or 0.0
+        if new_target != self.concurrency_target:
+            log_key = ("log_concurrency_increase_format" if reason == CONCURRENCY_REASON_PROBE
+                       else "log_concurrency_no_gain_format")
+            self.log_message_ui(log_key, "INFO", is_key=True, jobs=new_target, previous=self.concurrency_target,
+                                fps=throughput)
+            self.concurrency_target = new_target
+            if self.thread_budget is not None:
+                try: self.thread_budget.set_concurrency(new_target)
+                except Exception: # pylint: disable=broad-except
+                    pass
+        else:
+            self.log_message_ui(f"log_concurrency_hold_{reason}_format", "INFO", is_key=True, jobs=new_target,
+                                fps=throughput, cpu=(cpu_busy or 0.0) * 100, io_wait=(io_wait or 0.0) * 100)
+
+    def _submit_decode_group_segment(self, viewpoints, decode_groups, worker_config, frame_sampling, reprojection_backend):
+        for group_idx, group_indices in enumerate(decode_groups):
+            if frame_sampling in SEEK_BASED_FRAME_SAMPLINGS:
+                self._queue_pool_task(ffmpeg_seek_worker_process,
+                                      args=(group_idx, group_indices, [viewpoints[i] for i in group_indices],
+                                            worker_config))
+            elif frame_sampling == FRAME_SAMPLING_KEYFRAMES:
+                self._queue_pool_task(ffmpeg_keyframe_worker_process,
+                                      args=(group_idx, group_indices, [viewpoints[i] for i in group_indices],
+                                            worker_config))
+            elif reprojection_backend == REPROJECTION_BACKEND_NUMPY_REMAP:
+                self._queue_pool_task(ffmpeg_remap_worker_process,
+                                      args=(group_idx, group_indices, [viewpoints[i] for i in group_indices],
+                                            worker_config))
+            elif len(group_indices) == 1:
+                i = group_indices[0]
+                self._queue_pool_task(ffmpeg_worker_process,
+                                      args=(i, viewpoints[i], worker_config))
+            else:
+                self._queue_pool_task(ffmpeg_multi_view_worker_process,
+                                      args=(group_idx, group_indices, [viewpoints[i] for i in group_indices],
+                                            worker_config))
+            self.active_tasks_count += len(group_indices)
+            for i in group_indices:
+                self.viewpoint_pending_tasks[i] = self.viewpoint_pending_tasks.get(i, 0) + 1
+
     def conversion_finished_or_cancelled_mp(self):
         if self.start_time == 0 and not (self.cancel_event_mp and self.cancel_event_mp.is_set()): return
         elapsed_seconds = time.time() - self.start_time if self.start_time > 0 else 0
         elapsed_time_formatted = str(timedelta(seconds=int(elapsed_seconds)))
         was_cancelled = self.cancel_event_mp and self.cancel_event_mp.is_set()
         final_status_key = "viewpoint_progress_status_cancelled" if was_cancelled else "viewpoint_progress_status_completed"
+        if not was_cancelled and self.conversion_end_status_key:
+            final_status_key = self.conversion_end_status_key
         final_verb_for_log = S.get(final_status_key).lower(); final_verb_for_ui = S.get(final_status_key)
-        self.log_message_ui("log_conversion_finished_or_cancelled_format", "INFO", is_key=True, status=final_verb_for_log)
+        if final_status_key != self.conversion_end_status_key: # An early end has already logged its own reason
+            self.log_message_ui("log_conversion_finished_or_cancelled_format", "INFO", is_key=True, status=final_verb_for_log)
         self.viewpoint_progress_text_var.set(
             f'{S.get("viewpoint_progress_format", completed=self.completed_tasks_count, total=self.total_tasks_for_conversion)} ({final_verb_for_ui})'
         )
@@ -2850,15 +4264,32 @@ class Insta360ConvertGUI(tk.Tk):
             except Exception as e: # pylint: disable=broad-except
                 self.log_message_ui("log_colmap_rig_config_write_failed_format", "ERROR", is_key=True, error=str(e))
         self.colmap_rig_context = None
+        self._record_conversion_plan(elapsed_seconds, was_cancelled)
         if self.conversion_pool:
             try:
                 if was_cancelled: self.conversion_pool.terminate()
+                else: self._drain_log_queue() # Workers flush their queue buffers before exiting; keep the pipe readable
                 self.conversion_pool.join() # Removed timeout argument
             except Exception as e: # pylint: disable=broad-except
                 self.log_message_ui("log_pool_termination_error_format", "WARNING", is_key=True, error=str(e))
             finally: self.conversion_pool = None
+        if self.resume_manifest_dir and not was_cancelled and self.failed_tasks_count == 0:
+            self._remove_resume_manifest()
+        self._release_frame_ring()
         self.active_tasks_count = 0; self.start_time = 0; self.toggle_ui_state(converting=False)
 
+    def _remove_resume_manifest(self):
+        # Everything was written; a later run with the same settings converts from scratch again.
+        shutil.rmtree(self.resume_manifest_dir, ignore_errors=True)
+        try: os.rmdir(os.path.dirname(self.resume_manifest_dir)) # The RESUME_DIR_NAME folder, once empty
+        except OSError: pass
+        self.resume_manifest_dir = None
+
+    def _release_frame_ring(self):
+        if self.frame_ring is not None:
+            self.frame_ring.close()
+            self.frame_ring = None
+
     def cancel_conversion_mp(self):
         if self.cancel_event_mp and not self.cancel_event_mp.is_set():
             self.log_message_ui("log_cancel_requested", "INFO", is_key=True)
@@ -2887,12 +4318,13 @@ class Insta360ConvertGUI(tk.Tk):
                     except Exception as e: # pylint: disable=broad-except
                         self.log_message_ui("log_pool_forced_termination_error_format", "WARNING", is_key=True, error=str(e))
                     finally: self.conversion_pool = None
+                self._release_frame_ring()
                 if self.manager_mp and hasattr(self.manager_mp, 'shutdown') and \
                    hasattr(self.manager_mp, '_process') and self.manager_mp._process.is_alive(): # type: ignore
                     try: self.manager_mp.shutdown()
                     except Exception as e: # pylint: disable=broad-except
                          print(f"Error shutting down multiprocessing.Manager: {e}")
-                self.manager_mp = None; self.destroy()
+                self.manager_mp = None; self._close_log_files(); self.destroy()
             else: return
         else:
             if self.manager_mp and hasattr(self.manager_mp, 'shutdown') and \
@@ -2900,7 +4332,7 @@ class Insta360ConvertGUI(tk.Tk):
                 try: self.manager_mp.shutdown()
                 except Exception as e: # pylint: disable=broad-except
                     print(f"Error shutting down multiprocessing.Manager on exit: {e}")
-            self.manager_mp = None; self.destroy()
+            self.manager_mp = None; self._close_log_files(); self.destroy()
 
 if __name__ == '__main__':
     multiprocessing.freeze_support()
@@ -0,0 +1,83 @@
+# ipc_benchmark.py
+# 変換ワーカーからGUIへのメッセージ転送 (ログ/進捗) のスループットを比較するベンチマーク
+# Manager のキュー (プロキシ) と、Pool の initializer で渡す multiprocessing.Queue を比べます。
+#
+# 使い方: python ipc_benchmark.py [--workers 4] [--messages 20000]
+
+import argparse
+import multiprocessing
+import queue
+import time
+
+_bench_queue = None
+
+
+def _init_bench_worker(bench_queue):
+    global _bench_queue # pylint: disable=global-statement
+    _bench_queue = bench_queue
+
+
+def _sample_message(worker_idx, n):
+    # Same shape as the worker's ffmpeg_raw log entries
+    return {"type": "ffmpeg_raw", "line": f"[image2 @ 0x55d0] Opening 'out_{n:05d}.png' for writing",
+            "viewpoint_index": worker_idx, "viewpoint_indices": [worker_idx]}
+
+
+def _produce(worker_idx, message_count, bench_queue=None):
+    target = bench_queue if bench_queue is not None else _bench_queue
+    for n in range(message_count):
+        target.put(_sample_message(worker_idx, n))
+    return message_count
+
+
+def _consume(bench_queue, expected):
+    received = 0
+    while received < expected:
+        try:
+            bench_queue.get(timeout=30)
+        except queue.Empty:
+            break
+        received += 1
+    return received
+
+
+def run_benchmark(use_manager, workers, messages_per_worker):
+    """
+    workers 個のプロセスが messages_per_worker 件ずつ送り、親プロセスが全件受け取るまでの時間を測ります。
+
+    Returns:
+        float: 1秒あたりのメッセージ数。
+    """
+    manager = multiprocessing.Manager() if use_manager else None
+    try:
+        bench_queue = manager.Queue() if use_manager else multiprocessing.Queue()
+        initializer, initargs = (None, ()) if use_manager else (_init_bench_worker, (bench_queue,))
+        with multiprocessing.Pool(processes=workers, initializer=initializer, initargs=initargs) as pool:
+            pool.apply(time.sleep, (0,)) # Workers are started before timing
+            start_time = time.perf_counter()
+            results = [pool.apply_async(_produce, (worker_idx, messages_per_worker, bench_queue if use_manager else None))
+                       for worker_idx in range(workers)]
+            received = _consume(bench_queue, workers * messages_per_worker)
+            for result in results:
+                result.get()
+            elapsed = time.perf_counter() - start_time
+        return received / elapsed if elapsed > 0 else 0.0
+    finally:
+        if manager is not None:
+            manager.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Manager queues with multiprocessing.Queue for worker IPC.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=20000, help="messages per worker")
+    args = parser.parse_args()
+    manager_rate = run_benchmark(True, args.workers, args.messages)
+    queue_rate = run_benchmark(False, args.workers, args.messages)
+    print(f"workers={args.workers} messages/worker={args.messages}")
+    print(f"Manager().Queue()       : {manager_rate:12,.0f} msg/s")
+    print(f"multiprocessing.Queue() : {queue_rate:12,.0f} msg/s ({queue_rate / max(manager_rate, 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# log_file_writer.py
+# ログをファイルに書き出すバックグラウンドスレッド (サイズでローテーション)
+# GUI のログ欄は行数を制限するため、全文はこのファイルに残します。JSON Lines の構造化ログにも使います。
+
+import json
+import os
+import queue
+import threading
+
+LOG_WRITER_MAX_QUEUE = 10000 # Pending writes; beyond this new writes are dropped (and counted) instead of blocking
+_CLOSE = object()
+
+
+class RotatingLogFileWriter:
+    """
+    write() したテキスト / write_record() したレコードを専用スレッドでファイルに追記します。
+    呼び出し側 (Tk のメインスレッドや COLMAP の読み取りループ) はディスクを待ちません。
+    キューがいっぱいの場合は書き込みを捨て、捨てた件数を後でファイルに記録します。
+
+    ファイルが max_bytes を超えると path → path.1 → ... → path.{backup_count} の順にずらし、
+    最も古いものを削除してから新しいファイルに書き始めます。
+    """
+
+    def __init__(self, path, max_bytes, backup_count, max_queue=LOG_WRITER_MAX_QUEUE):
+        self.path = path
+        self.max_bytes = max(1, int(max_bytes))
+        self.backup_count = max(0, int(backup_count))
+        self.pending = queue.Queue(maxsize=max(1, int(max_queue)))
+        self.file = None
+        self.failed = False
+        self.dropped = 0
+        self.dropped_reported = 0
+        self.dropped_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name=f"log-writer:{os.path.basename(path)}", daemon=True)
+        self.thread.start()
+
+    def write(self, text):
+        self._put(text)
+
+    def write_record(self, record):
+        """
+        1レコードを JSON の1行として書き込みます (シリアライズは書き込みスレッドで行います)。
+        """
+        self._put(record)
+
+    def _put(self, item):
+        if self.failed:
+            return
+        try:
+            self.pending.put_nowait(item)
+        except queue.Full:
+            with self.dropped_lock:
+                self.dropped += 1
+
+    def flush(self, timeout=None):
+        """
+        それまでに書き込んだ内容がファイルに書き込まれるまで待ちます (ファイルを開く前など)。
+
+        Returns:
+            bool: timeout 内に書き込みが終わった場合は True。
+        """
+        done = threading.Event()
+        try:
+            self.pending.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=2.0):
+        try:
+            self.pending.put(_CLOSE, timeout=timeout)
+        except queue.Full:
+            return # The daemon thread is dropped with the process
+        self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self.pending.get()
+            batch = []
+            marker = None
+            # Write whatever else is already queued in the same call; a flush/close marker ends the batch.
+            while True:
+                if isinstance(item, threading.Event) or item is _CLOSE:
+                    marker = item
+                    break
+                batch.append(item)
+                try:
+                    item = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                notice = self._drop_notice(structured=isinstance(batch[0], dict))
+                self._write_text(notice + "".join(self._format(entry) for entry in batch))
+            if marker is _CLOSE:
+                break
+            if marker is not None:
+                self._flush_file()
+                marker.set()
+        self._flush_file()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def _format(self, entry):
+        if isinstance(entry, dict):
+            return json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        return entry
+
+    def _drop_notice(self, structured):
+        with self.dropped_lock:
+            newly_dropped = self.dropped - self.dropped_reported
+            self.dropped_reported = self.dropped
+        if newly_dropped <= 0:
+            return ""
+        message = f"{newly_dropped} log entries dropped (writer queue full)"
+        if structured:
+            return self._format({"level": "WARNING", "subsystem": "log", "message": message})
+        return f"[WARNING] {message}\n"
+
+    def _write_text(self, text):
+        if self.failed:
+            return
+        try:
+            if self.file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self.file = open(self.path, "a", encoding="utf-8") # pylint: disable=consider-using-with
+            if self.file.tell() + len(text.encode("utf-8")) > self.max_bytes and self.file.tell() > 0:
+                self._rotate()
+            self.file.write(text)
+        except OSError as e:
+            # The GUI log keeps working; only the file copy stops.
+            self.failed = True
+            print(f"Log file write error ({self.path}): {e}")
+
+    def _flush_file(self):
+        if self.file is not None and not self.failed:
+            try:
+                self.file.flush()
+            except OSError:
+                pass
+
+    def _rotate(self):
+        self.file.close()
+        self.file = None
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.file = open(self.path, "a", encoding="utf-8") # pylint: disable=consider-using-with
@@ -0,0 +1,297 @@
+# output_fingerprint.py
+# 視点ごとの出力に、その画素に影響する設定のフィンガープリントを記録し、変わっていない視点の再変換を省くためのヘルパー
+# 記録は出力と同じフォルダの隠しファイル (.<出力名>.fingerprint.json) です。COLMAP Rig ではセッションごとに1ファイルになります。
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from frame_sampling import FRAME_SAMPLING_MOTION
+
+FINGERPRINT_FORMAT_VERSION = 1
+FINGERPRINT_FILE_SUFFIX = ".fingerprint.json"
+RIG_STAGING_DIR_NAME = ".insta360convert_staging" # Reused camera folders are moved through here when cameras are renumbered
+RIG_STAGING_MANIFEST_NAME = "moves.json" # Written before anything is staged, so an interrupted move can be recovered
+RIG_REPLACED_DIR_NAME = "replaced_outputs" # colmap_rig/replaced_outputs/<rig>/<camera>: session files no longer used (never deleted)
+_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def viewpoint_fingerprint(viewpoint_data, config):
+    """
+    視点の出力画素に影響する値 (入力ファイル, 向き, FOV, 解像度, 補間, 形式と画質, 抽出方法, プリスケール) のハッシュを返します。
+    COLMAP Rig のカメラ番号/名前とセッション名は含めないため、番号が振り直されても同じ視点は同じ値になります。
+
+    Returns:
+        tuple: (フィンガープリント (SHA-256), ハッシュした値の dict)。
+    """
+    input_file = config["input_file"]
+    stat = os.stat(input_file)
+    output_format = config["output_format"]
+    params = {
+        "version": FINGERPRINT_FORMAT_VERSION,
+        "input_file": os.path.abspath(input_file),
+        "input_size": stat.st_size,
+        "input_mtime": int(stat.st_mtime),
+        "yaw": round(float(viewpoint_data.get("yaw", 0.0)), 6),
+        "pitch": round(float(viewpoint_data.get("pitch", 0.0)), 6),
+        "fov": round(float(viewpoint_data.get("fov", 100.0)), 6),
+        "output_resolution": [int(value) for value in config["output_resolution"]],
+        "interp": config["interp"],
+        "output_format": output_format,
+        "output_mode": config.get("output_mode", "standard"),
+        "reprojection_backend": config.get("reprojection_backend"),
+    }
+    if config.get("prescale_max_loss") is not None:
+        params["prescale_max_loss"] = float(config["prescale_max_loss"])
+    if output_format == "video":
+        params.update(video_preset=config.get("video_preset"), video_cq=str(config.get("video_cq")))
+    else:
+        params["quality"] = config.get("jpeg_quality") if output_format == "jpeg" else config.get("png_pred_option")
+        params["frame_sampling"] = config.get("frame_sampling")
+        params["frame_interval"] = round(float(config.get("frame_interval", 0.0)), 6)
+        if config.get("frame_sampling") == FRAME_SAMPLING_MOTION:
+            params["motion_threshold"] = config.get("motion_threshold")
+            params["motion_max_interval"] = config.get("motion_max_interval")
+    serialized = json.dumps(params, sort_keys=True)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest(), params
+
+
+def _output_name_prefix(output_path):
+    # "dir/name_%05d.png" -> "name_"; a video path has no frame number.
+    name = os.path.basename(output_path)
+    return name.split("%", 1)[0] if "%" in name else None
+
+
+def fingerprint_record_path(output_path):
+    """
+    出力パス (連番パターンまたは動画ファイル) に対応する記録ファイルのパスを返します。
+    """
+    prefix = _output_name_prefix(output_path)
+    stem = prefix.rstrip("_") if prefix is not None else os.path.basename(output_path)
+    return os.path.join(os.path.dirname(output_path), f".{stem}{FINGERPRINT_FILE_SUFFIX}")
+
+
+def list_output_files(output_path):
+    """
+    出力パスに書き出されたファイルのパスを返します (連番なら一致する画像、動画ならそのファイル)。
+    """
+    prefix = _output_name_prefix(output_path)
+    if prefix is None:
+        return [output_path] if os.path.isfile(output_path) and os.path.getsize(output_path) > 0 else []
+    directory = os.path.dirname(output_path)
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return [os.path.join(directory, name) for name in names
+            if name.startswith(prefix) and name.lower().endswith(_IMAGE_EXTENSIONS)]
+
+
+def count_output_files(output_path):
+    """
+    出力パスに書き出されたファイル数を返します (連番なら一致する画像の数、動画なら 0 か 1)。
+    """
+    return len(list_output_files(output_path))
+
+
+def _load_record(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(record, dict) or record.get("version") != FINGERPRINT_FORMAT_VERSION:
+        return None
+    return record
+
+
+def is_output_current(output_path, fingerprint):
+    """
+    出力に同じフィンガープリントの記録があり、記録時のファイルが残っていれば True。
+    """
+    record = _load_record(fingerprint_record_path(output_path))
+    if record is None or record.get("fingerprint") != fingerprint:
+        return False
+    file_count = int(record.get("file_count", 0))
+    return file_count > 0 and count_output_files(output_path) >= file_count
+
+
+def write_fingerprint_record(output_path, fingerprint, params, session_prefix=None):
+    """
+    視点の出力がすべて書き出された後に記録を書き込みます。
+    """
+    path = fingerprint_record_path(output_path)
+    record = {"version": FINGERPRINT_FORMAT_VERSION, "fingerprint": fingerprint, "params": params,
+              "file_count": count_output_files(output_path)}
+    if session_prefix:
+        record["session_prefix"] = session_prefix
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+    return path
+
+
+def remove_fingerprint_record(output_path):
+    # Called before an output is (re)written, so that an interrupted run never looks current.
+    try:
+        os.remove(fingerprint_record_path(output_path))
+    except OSError:
+        pass
+
+
+# --- COLMAP Rig ---
+
+def _session_files(camera_dir, session_prefix, frame_prefix):
+    files_prefix = f"{session_prefix}_{frame_prefix}_"
+    record_name = f".{session_prefix}_{frame_prefix}{FINGERPRINT_FILE_SUFFIX}"
+    try:
+        names = os.listdir(camera_dir)
+    except OSError:
+        return []
+    return [name for name in names
+            if name == record_name or (name.startswith(files_prefix) and name.lower().endswith(_IMAGE_EXTENSIONS))]
+
+
+def find_reusable_rig_session(rig_dir, fingerprints, frame_prefix):
+    """
+    COLMAP Rig の出力 (rig_dir/<カメラ名>/) から、同じフィンガープリントの視点を最も多く含むセッションを探します。
+
+    Args:
+        rig_dir (str): カメラフォルダの親 (colmap_rig/images/<rig名>)。
+        fingerprints (dict): {視点インデックス: フィンガープリント}。
+
+    Returns:
+        tuple: (セッション名, {視点インデックス: 既存のカメラフォルダ})。見つからない場合は (None, {})。
+    """
+    sessions = {}
+    try:
+        camera_names = sorted(os.listdir(rig_dir))
+    except OSError:
+        return None, {}
+    record_re = re.compile(rf"^\.(.+)_{re.escape(frame_prefix)}{re.escape(FINGERPRINT_FILE_SUFFIX)}$")
+    for camera_name in camera_names:
+        camera_dir = os.path.join(rig_dir, camera_name)
+        if not os.path.isdir(camera_dir) or camera_name.startswith("."):
+            continue
+        for name in os.listdir(camera_dir):
+            match = record_re.match(name)
+            if not match:
+                continue
+            record = _load_record(os.path.join(camera_dir, name))
+            session_prefix = match.group(1)
+            if record is None or record.get("session_prefix") != session_prefix:
+                continue
+            file_count = int(record.get("file_count", 0))
+            present = len(_session_files(camera_dir, session_prefix, frame_prefix)) - 1 # Minus the record itself
+            if file_count > 0 and present >= file_count:
+                sessions.setdefault(session_prefix, {}).setdefault(record.get("fingerprint"), camera_dir)
+    best_session, best_matches = None, {}
+    for session_prefix, camera_dirs in sorted(sessions.items()):
+        matches = {vp_idx: camera_dirs[fingerprint] for vp_idx, fingerprint in fingerprints.items()
+                   if fingerprint in camera_dirs}
+        if len(matches) > len(best_matches):
+            best_session, best_matches = session_prefix, matches
+    return best_session, best_matches
+
+
+def rig_replaced_dir(rig_dir):
+    """
+    使わなくなったセッションのファイルの移動先 (colmap_rig/replaced_outputs/<rig名>) を返します。
+    images フォルダの外なので、COLMAP の入力には含まれません。
+    """
+    rig_dir = os.path.normpath(rig_dir)
+    return os.path.join(os.path.dirname(os.path.dirname(rig_dir)), RIG_REPLACED_DIR_NAME, os.path.basename(rig_dir))
+
+
+def _move_to_replaced(source_path, target_dir):
+    # Never overwrites an earlier replaced file of the same name.
+    os.makedirs(target_dir, exist_ok=True)
+    name = os.path.basename(source_path)
+    stem, ext = os.path.splitext(name)
+    target_path, suffix = os.path.join(target_dir, name), 1
+    while os.path.exists(target_path):
+        target_path, suffix = os.path.join(target_dir, f"{stem}_{suffix}{ext}"), suffix + 1
+    os.replace(source_path, target_path)
+
+
+def recover_rig_staging(rig_dir):
+    """
+    前回の reuse_rig_session が途中で止まり作業フォルダにファイルが残っている場合、それらを replaced_outputs へ移し、
+    作業フォルダを削除します (移動先のカメラフォルダは別の視点で上書きされている可能性があるため、元へは戻しません)。
+
+    Returns:
+        int: replaced_outputs へ移したファイル数。
+    """
+    staging_dir = os.path.join(rig_dir, RIG_STAGING_DIR_NAME)
+    if not os.path.isdir(staging_dir):
+        return 0
+    camera_names = {}
+    try:
+        with open(os.path.join(staging_dir, RIG_STAGING_MANIFEST_NAME), "r", encoding="utf-8") as f:
+            camera_names = {str(stage_name): os.path.basename(source_dir)
+                            for stage_name, source_dir, _target_dir in json.load(f)["moves"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    replaced_dir = rig_replaced_dir(rig_dir)
+    recovered = 0
+    for stage_name in sorted(os.listdir(staging_dir)):
+        stage_dir = os.path.join(staging_dir, stage_name)
+        if not os.path.isdir(stage_dir):
+            continue
+        target_dir = os.path.join(replaced_dir, camera_names.get(stage_name, stage_name))
+        for name in sorted(os.listdir(stage_dir)):
+            _move_to_replaced(os.path.join(stage_dir, name), target_dir)
+            recovered += 1
+    shutil.rmtree(staging_dir)
+    return recovered
+
+
+def reuse_rig_session(rig_dir, session_prefix, frame_prefix, moves):
+    """
+    セッションの出力を新しいカメラ番号に合わせて並べ替えます。
+    moves ({既存のカメラフォルダ: 新しいカメラフォルダ}) の視点は移動して再利用し、
+    それ以外のカメラフォルダにあるこのセッションのファイルは (番号が変わった別の視点のものなので)
+    replaced_outputs へ移します (削除はしません)。
+    移動先が別の視点の移動元でもある場合に備え、いったん作業フォルダへ移してから配置します。作業フォルダは
+    すべての移動が終わるまで残し、途中で止まった場合は次回の recover_rig_staging で回収します。
+
+    Returns:
+        int: replaced_outputs へ移したファイル数。
+    """
+    staging_dir = os.path.join(rig_dir, RIG_STAGING_DIR_NAME)
+    pending = [(str(move_idx), source_dir, target_dir)
+               for move_idx, (source_dir, target_dir) in enumerate(sorted(moves.items()))
+               if os.path.normcase(os.path.abspath(source_dir)) != os.path.normcase(os.path.abspath(target_dir))]
+    if pending:
+        os.makedirs(staging_dir, exist_ok=True)
+        manifest_path = os.path.join(staging_dir, RIG_STAGING_MANIFEST_NAME)
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"session_prefix": session_prefix, "moves": pending}, f, ensure_ascii=False, indent=2)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+    for stage_name, source_dir, _target_dir in pending:
+        stage_dir = os.path.join(staging_dir, stage_name)
+        os.makedirs(stage_dir, exist_ok=True)
+        for name in _session_files(source_dir, session_prefix, frame_prefix):
+            os.replace(os.path.join(source_dir, name), os.path.join(stage_dir, name))
+    kept_dirs = {os.path.normcase(os.path.abspath(target_dir)) for source_dir, target_dir in moves.items()
+                 if os.path.normcase(os.path.abspath(source_dir)) == os.path.normcase(os.path.abspath(target_dir))}
+    replaced_dir = rig_replaced_dir(rig_dir)
+    replaced = 0
+    for camera_name in os.listdir(rig_dir):
+        camera_dir = os.path.join(rig_dir, camera_name)
+        if (camera_name.startswith(".") or not os.path.isdir(camera_dir)
+                or os.path.normcase(os.path.abspath(camera_dir)) in kept_dirs):
+            continue
+        for name in _session_files(camera_dir, session_prefix, frame_prefix):
+            _move_to_replaced(os.path.join(camera_dir, name), os.path.join(replaced_dir, camera_name))
+            replaced += 1
+    for stage_name, _source_dir, target_dir in pending:
+        stage_dir = os.path.join(staging_dir, stage_name)
+        os.makedirs(target_dir, exist_ok=True)
+        for name in os.listdir(stage_dir):
+            os.replace(os.path.join(stage_dir, name), os.path.join(target_dir, name))
+    if pending:
+        shutil.rmtree(staging_dir) # Only once every staged file has reached its camera folder
+    return replaced
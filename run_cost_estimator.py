@@ -0,0 +1,275 @@
+# run_cost_estimator.py
+# 変換を始める前に、出力フレーム数・ディスク使用量・所要時間を見積もるヘルパー
+# 見積もりは画素数に基づく既定のモデルで行い、このPCで過去に完了した変換 (conversion_plan_history.jsonl) の
+# 実測値との比で補正します。出力先の空き容量が足りない場合の判定にも使います。
+
+import json
+import math
+import os
+import shutil
+from conversion_planner import CODEC_DECODE_COST, DEFAULT_CODEC_DECODE_COST
+from frame_sampling import (
+    FRAME_SAMPLING_FPS, FRAME_SAMPLING_KEYFRAMES, ANALYSIS_FRAME_SAMPLINGS, SEEK_BASED_FRAME_SAMPLINGS
+)
+from output_fingerprint import list_output_files
+
+COST_MODEL_VERSION = 1
+# Output bytes per output pixel and frame before calibration.
+PNG_BYTES_PER_PIXEL = 1.8 # rgb24 with prediction filters; photographic content compresses poorly
+JPEG_BYTES_PER_PIXEL_BY_QUALITY = ((1, 0.03), (50, 0.12), (75, 0.2), (85, 0.28), (90, 0.36), (95, 0.55), (100, 1.2))
+VIDEO_BYTES_PER_PIXEL_AT_CQ = (23, 0.01) # HEVC; the size halves for every +6 of CQ/CRF
+VIDEO_CQ_HALVING_STEP = 6.0
+# Work rates of one CPU core in megapixels per second before calibration.
+DECODE_MPX_PER_SEC_PER_CORE = 60.0 # H.264 software decode; CODEC_DECODE_COST scales other codecs
+REPROJECT_MPX_PER_SEC_PER_CORE = 30.0 # v360 / remap output pixels
+ENCODE_MPX_PER_SEC_PER_CORE = {"png": 20.0, "jpeg": 80.0, "video": 15.0}
+ANALYSIS_MPX_PER_SEC_PER_CORE = 200.0 # The sharpness/motion pass decodes at full size and scores a small frame
+SEEK_DECODED_FRAMES_PER_SAMPLE = 15 # Frames decoded from the previous keyframe up to a seek target (half a typical GOP)
+KEYFRAME_INTERVAL_SEC = 2.0 # Typical GOP of camera footage; keyframe sampling cannot be counted in advance
+CORES_PER_JOB = 4.0 # One FFmpeg process rarely keeps more cores than this busy
+# Calibration from earlier runs on this machine
+CALIBRATION_MAX_RUNS = 10
+CALIBRATION_MIN_WORK_FRACTION = 0.2 # Runs that mostly reused or resumed output say little about the rate
+CALIBRATION_FACTOR_RANGE = (0.05, 20.0) # Ratios outside this range are treated as broken records
+# Free space check on the output volume
+DISK_SPACE_WARN_FRACTION = 0.8 # Warn when the estimate uses more than this share of the free space
+
+
+def frames_per_viewpoint(duration, input_fps, output_format, frame_sampling, frame_interval, sample_count=None):
+    """
+    1視点あたりの出力フレーム数を見積もります。
+
+    Args:
+        sample_count (int or None): 抽出するサンプル数が分かっている場合 (シーク抽出など) はその数。
+
+    Returns:
+        int: フレーム数。長さが分からない場合は 0。
+    """
+    if sample_count:
+        return int(sample_count)
+    if duration <= 0:
+        return 0
+    if output_format == "video":
+        return max(1, int(round(duration * input_fps))) if input_fps > 0 else 0
+    if frame_sampling == FRAME_SAMPLING_KEYFRAMES:
+        return max(1, int(math.ceil(duration / KEYFRAME_INTERVAL_SEC)))
+    # Motion-adaptive sampling emits at most one frame per interval; the interval count is the upper bound.
+    return max(1, int(round(duration / frame_interval))) if frame_interval > 1e-6 else 0
+
+
+def output_bytes_per_pixel(output_format, quality):
+    """
+    1画素あたりの出力バイト数 (補正前) を返します。quality は JPEG 品質 (1-100) または動画の CQ/CRF。
+    """
+    if output_format == "png":
+        return PNG_BYTES_PER_PIXEL
+    if output_format == "jpeg":
+        try: quality = min(100.0, max(1.0, float(quality)))
+        except (TypeError, ValueError): quality = 90.0
+        points = JPEG_BYTES_PER_PIXEL_BY_QUALITY
+        for (low_q, low_b), (high_q, high_b) in zip(points, points[1:]):
+            if quality <= high_q:
+                return low_b + (high_b - low_b) * (quality - low_q) / (high_q - low_q)
+        return points[-1][1]
+    try: cq = float(quality)
+    except (TypeError, ValueError): cq = VIDEO_BYTES_PER_PIXEL_AT_CQ[0]
+    base_cq, base_bytes = VIDEO_BYTES_PER_PIXEL_AT_CQ
+    return base_bytes * 2.0 ** ((base_cq - cq) / VIDEO_CQ_HALVING_STEP)
+
+
+def model_run_cost(inputs):
+    """
+    補正前のモデルで変換1回分のコストを計算します。
+
+    Args:
+        inputs (dict): input_size, input_codec, input_fps, duration, viewpoints (視点数), output_size,
+                       output_format, quality, frame_sampling, frame_interval, sample_count (任意),
+                       decode_groups (入力をデコードする回数), time_segments, parallel, cpu_count。
+
+    Returns:
+        dict: viewpoints, frames_per_viewpoint, frames (全視点の合計), bytes_per_frame, bytes, seconds。
+    """
+    input_width, input_height = inputs["input_size"]
+    output_width, output_height = inputs["output_size"]
+    output_format = inputs["output_format"]
+    frame_sampling = inputs["frame_sampling"] if output_format != "video" else FRAME_SAMPLING_FPS
+    duration = max(0.0, float(inputs["duration"] or 0.0))
+    input_fps = max(0.0, float(inputs["input_fps"] or 0.0))
+    view_count = max(0, int(inputs["viewpoints"]))
+    per_view = frames_per_viewpoint(duration, input_fps, output_format, frame_sampling, inputs["frame_interval"],
+                                    inputs.get("sample_count"))
+    frames = per_view * view_count
+    output_mpx = output_width * output_height / 1e6
+    input_mpx = input_width * input_height / 1e6
+    bytes_per_frame = output_width * output_height * output_bytes_per_pixel(output_format, inputs["quality"])
+
+    decode_passes = max(1, int(inputs.get("decode_groups") or 1))
+    codec_cost = CODEC_DECODE_COST.get((inputs.get("input_codec") or "").lower(), DEFAULT_CODEC_DECODE_COST)
+    if frame_sampling in SEEK_BASED_FRAME_SAMPLINGS:
+        decoded_frames = per_view * SEEK_DECODED_FRAMES_PER_SAMPLE
+    elif frame_sampling == FRAME_SAMPLING_KEYFRAMES:
+        decoded_frames = per_view
+    else:
+        decoded_frames = duration * input_fps # The fps filter path decodes every input frame
+    core_seconds = decode_passes * decoded_frames * input_mpx * codec_cost / DECODE_MPX_PER_SEC_PER_CORE
+    if frame_sampling in ANALYSIS_FRAME_SAMPLINGS:
+        core_seconds += duration * input_fps * input_mpx * codec_cost / ANALYSIS_MPX_PER_SEC_PER_CORE
+    core_seconds += frames * output_mpx / REPROJECT_MPX_PER_SEC_PER_CORE
+    core_seconds += frames * output_mpx / ENCODE_MPX_PER_SEC_PER_CORE.get(output_format, 20.0)
+
+    cpu_count = max(1, int(inputs.get("cpu_count") or 1))
+    jobs = decode_passes * max(1, int(inputs.get("time_segments") or 1))
+    running_jobs = max(1, min(int(inputs.get("parallel") or 1), jobs))
+    busy_cores = max(1.0, min(float(cpu_count), running_jobs * CORES_PER_JOB))
+    return {
+        "viewpoints": view_count,
+        "frames_per_viewpoint": per_view,
+        "frames": frames,
+        "bytes_per_frame": bytes_per_frame,
+        "bytes": bytes_per_frame * frames,
+        "seconds": core_seconds / busy_cores,
+    }
+
+
+def _median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2.0
+
+
+def load_cost_calibration(history_path, output_format, frame_sampling):
+    """
+    変換履歴から、同じ出力形式 (時間は抽出方法も同じ) で完了した直近の実行の「実測 / モデル」の比を求めます。
+
+    Returns:
+        dict: {"time_factor", "bytes_factor", "time_runs", "bytes_runs"}。該当する実行がなければ係数は 1.0。
+    """
+    time_factors, bytes_factors = [], []
+    try:
+        with open(history_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        lines = []
+    low, high = CALIBRATION_FACTOR_RANGE
+    for line in reversed(lines):
+        if len(time_factors) >= CALIBRATION_MAX_RUNS and len(bytes_factors) >= CALIBRATION_MAX_RUNS:
+            break
+        try:
+            record = json.loads(line)
+            cost = record.get("cost") if isinstance(record, dict) else None
+            if not cost or cost.get("version") != COST_MODEL_VERSION or record.get("status") != "completed":
+                continue
+            if cost.get("output_format") != output_format:
+                continue
+            if cost.get("output_files") and cost.get("model_bytes_per_frame"):
+                measured = cost["output_bytes"] / cost["output_files"]
+                if output_format == "video":
+                    measured /= max(1, cost["frames_per_viewpoint"])
+                factor = measured / cost["model_bytes_per_frame"]
+                if low <= factor <= high and len(bytes_factors) < CALIBRATION_MAX_RUNS:
+                    bytes_factors.append(factor)
+            work_fraction = float(cost.get("work_fraction", 0.0))
+            if (cost.get("frame_sampling") == frame_sampling and work_fraction >= CALIBRATION_MIN_WORK_FRACTION
+                    and cost.get("model_seconds")):
+                factor = float(record["elapsed_sec"]) / (cost["model_seconds"] * work_fraction)
+                if low <= factor <= high and len(time_factors) < CALIBRATION_MAX_RUNS:
+                    time_factors.append(factor)
+        except (ValueError, KeyError, TypeError, ZeroDivisionError):
+            continue
+    return {
+        "time_factor": _median(time_factors) if time_factors else 1.0,
+        "bytes_factor": _median(bytes_factors) if bytes_factors else 1.0,
+        "time_runs": len(time_factors),
+        "bytes_runs": len(bytes_factors),
+    }
+
+
+def estimate_run_cost(inputs, calibration):
+    """
+    モデルの値を calibration (load_cost_calibration の戻り値) で補正した見積もりを返します。
+
+    Returns:
+        dict: model_run_cost の値を補正したものに、補正前の model_seconds / model_bytes_per_frame と
+              calibration を加えた辞書。
+    """
+    model = model_run_cost(inputs)
+    return dict(model, bytes_per_frame=model["bytes_per_frame"] * calibration["bytes_factor"],
+                bytes=model["bytes"] * calibration["bytes_factor"],
+                seconds=model["seconds"] * calibration["time_factor"],
+                model_seconds=model["seconds"], model_bytes_per_frame=model["bytes_per_frame"],
+                calibration=calibration)
+
+
+def free_disk_bytes(path):
+    """
+    path (まだ無ければ存在する親フォルダ) があるボリュームの空き容量 (バイト) を返します。取得できない場合は None。
+    """
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+def check_disk_space(estimated_bytes, free_bytes):
+    """
+    Returns:
+        str: "ok", "warn" (空き容量の DISK_SPACE_WARN_FRACTION を超える) または "insufficient"。
+             空き容量が分からない場合は "ok"。
+    """
+    if free_bytes is None:
+        return "ok"
+    if estimated_bytes > free_bytes:
+        return "insufficient"
+    if estimated_bytes > free_bytes * DISK_SPACE_WARN_FRACTION:
+        return "warn"
+    return "ok"
+
+
+def additional_disk_bytes(estimate, existing_output_bytes):
+    """
+    出力先で新たに必要になる容量を見積もります。変換する視点ごとに「見積もった出力サイズ - その出力パスに今ある
+    ファイルの合計」を足します。同じ名前のファイルは上書きされ、中断した変換を再開する場合は書き出し済みの
+    フレームがそのまま使われるためです。
+
+    Args:
+        estimate (dict): estimate_run_cost の戻り値。
+        existing_output_bytes (list): 変換する各視点の出力パスに今あるファイルの合計バイト数 (再利用する視点は含めない)。
+
+    Returns:
+        float: 必要なバイト数。
+    """
+    bytes_per_viewpoint = estimate["bytes"] / max(1, estimate["viewpoints"])
+    return sum(max(0.0, bytes_per_viewpoint - existing) for existing in existing_output_bytes)
+
+
+def format_bytes(value):
+    value = float(value)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024.0:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024.0
+    return f"{value:.1f} TB"
+
+
+def measure_output(output_paths):
+    """
+    出力パス (連番パターンまたは動画ファイル) に書き出されたファイルの数と合計バイト数を返します。
+
+    Returns:
+        tuple: (ファイル数, 合計バイト数)。
+    """
+    file_count, total_bytes = 0, 0
+    for output_path in output_paths:
+        for file_path in list_output_files(output_path):
+            try:
+                total_bytes += os.path.getsize(file_path)
+            except OSError:
+                continue
+            file_count += 1
+    return file_count, total_bytes
@@ -67,7 +67,16 @@ def save_language_preference(lang_code):
         print(f"Error: Attempted to save unsupported language code '{lang_code}'. Aborting save.", file=sys.stderr)
         return
 
-    settings_data = {"language": lang_code}
+    settings_data = {}
+    try:
+        if os.path.exists(SETTINGS_FILE_NAME):
+            with open(SETTINGS_FILE_NAME, "r", encoding='utf-8') as f:
+                settings_data = json.load(f) # Keep the other settings stored in the same file
+        if not isinstance(settings_data, dict):
+            settings_data = {}
+    except (IOError, json.JSONDecodeError):
+        settings_data = {}
+    settings_data["language"] = lang_code
     try:
         with open(SETTINGS_FILE_NAME, "w", encoding='utf-8') as f:
             json.dump(settings_data, f, ensure_ascii=False, indent=2)
@@ -77,6 +86,21 @@ def save_language_preference(lang_code):
         print(f"Error: Unexpected error saving language preference: {e}", file=sys.stderr)
 
 
+def load_app_setting(key, default=None):
+    """
+    設定ファイルから言語以外の設定値を読み込みます。ファイルやキーがない場合は default を返します。
+    """
+    try:
+        if os.path.exists(SETTINGS_FILE_NAME):
+            with open(SETTINGS_FILE_NAME, "r", encoding='utf-8') as f:
+                settings = json.load(f)
+            if isinstance(settings, dict):
+                return settings.get(key, default)
+    except (IOError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not read setting '{key}' from '{SETTINGS_FILE_NAME}': {e}. Using default.", file=sys.stderr)
+    return default
+
+
 class UiStrings:
     def __init__(self, initial_language='ja'): # デフォルトを 'ja' から initial_language へ変更
         self.language = initial_language
@@ -146,6 +170,13 @@ class UiStrings:
                 "interpolation_label": "補間:",
                 "interpolation_label_tooltip": "画像補間方法。高画質ほど処理時間が長くなる傾向があります。",
                 "interpolation_combo_tooltip": "cubic:高画質(推奨), lanczos:最高画質(シャープ),\nlinear:標準, nearest:高速(低画質)。",
+                "reprojection_label": "再投影:",
+                "reprojection_v360": "FFmpeg v360",
+                "reprojection_numpy_remap": "NumPy LUT",
+                "reprojection_tooltip": "エクイレクタングラーから各視点への再投影の方法。\nFFmpeg v360: FFmpegのv360フィルターで変換します (デフォルト)。\nNumPy LUT: 視点ごとの変換テーブルを1度だけ計算し、1回デコードしたフレームへ適用します (NumPyが必要)。\n  補間は nearest / linear に対応し、cubic / lanczos は linear で近似します。",
+                "prescale_check_label": "自動プリスケール",
+                "prescale_max_loss_label": "許容低下(%):",
+                "prescale_tooltip": "v360 の前に、入力のエクイレクタングラーを出力の画素密度に必要な大きさまで縮小します (FFmpeg v360 のみ)。\n低い出力解像度や狭い視野では、フィルターの処理量とメモリ帯域を大きく減らせます。\n必要な大きさは、視点の四隅 (画素が最も細かい位置) の角度あたりの画素数から計算します。\n許容低下 0% では四隅でも解像度が下がらない場合だけ縮小します。値を上げると、四隅の解像度をその割合まで下げることを許します。",
                 "output_mode_label": "書き出しモード:",
                 "output_mode_label_tooltip": "出力のフォルダ構成を選択します。",
                 "output_mode_standard_label": "標準",
@@ -174,6 +205,10 @@ class UiStrings:
                 "colmap_preset_multi_path": "Multi-Path Sync",
                 "colmap_matcher_label": "Matcher:",
                 "colmap_matcher_tooltip": "sequential: 連番向け。exhaustive: 全組み合わせ（重いが繋がりやすい）。vocab_tree: 辞書検索で複数パス向け。",
+                "colmap_dedup_label": "ほぼ同じフレームを除外",
+                "colmap_dedup_tooltip": "特徴抽出の前に、基準カメラ (cam01) の画像の知覚ハッシュ (pHash) を直前に残したフレームと比較し、\nほぼ同じフレームを全カメラ分まとめて colmap_rig/removed_duplicates へ移動します (削除はしません)。\n除外したフレームは colmap_rig/duplicate_frames_report.csv に記録されます。NumPyが必要です。",
+                "colmap_dedup_threshold_label": "距離:",
+                "colmap_dedup_threshold_tooltip": "同じとみなすハミング距離の上限 (0～64ビット)。大きくするほど多くのフレームが除外されます。",
                 "colmap_vocab_tree_label": "Vocab Tree:",
                 "colmap_vocab_tree_tooltip": "vocab tree 辞書ファイル(.bin)のパス。vocab_tree matcher/ループ検出で使用します。",
                 "colmap_vocab_tree_browse_tooltip": "vocab tree 辞書ファイルを選択します。",
@@ -214,6 +249,17 @@ class UiStrings:
                 "jpeg_quality_label": "品質(1-100):",
                 "jpeg_quality_label_tooltip": "JPEG品質(1-100)。大きいほど高画質・大ファイルサイズ。",
                 "jpeg_quality_entry_tooltip": "JPEG品質(1低～100高)。FFmpeg内部で1高～31低スケールに変換。デフォルト90。",
+                "frame_sampling_label": "フレーム抽出:",
+                "frame_sampling_fps": "一定間隔 (fpsフィルター)",
+                "frame_sampling_seek": "一定間隔 (シーク)",
+                "frame_sampling_keyframes": "キーフレームのみ (下見用)",
+                "frame_sampling_sharpest": "区間内で最もシャープなフレーム",
+                "frame_sampling_motion": "動きに応じて抽出 (静止区間を間引く)",
+                "motion_threshold_label": "動きのしきい値:",
+                "motion_threshold_tooltip": "「動きに応じて抽出」で次のフレームを書き出すまでに必要な累積の動き量。\n動き量は縮小画像の直前フレームとの平均輝度差 (ノイズ分を除く) を足し合わせた値です。\n小さくするとフレームが増え、大きくすると減ります。",
+                "motion_max_interval_label": "最大間隔(秒):",
+                "motion_max_interval_tooltip": "「動きに応じて抽出」で、動きが少なくてもこの秒数ごとに1枚は書き出します (0で上限なし)。\n最小間隔にはフレーム抽出間隔を使用します。",
+                "frame_sampling_tooltip": "PNG/JPEG出力で書き出すフレームの選び方。\n一定間隔 (fpsフィルター): 全フレームをデコードし、間隔ごとに1枚を残します (デフォルト)。\n一定間隔 (シーク): 各時刻へシークし、そのフレームまでだけをデコードします。\n  キーフレーム間隔に比べて抽出間隔が長い場合 (60fpsで1～2秒など) に高速です。\nキーフレームのみ: キーフレームだけをデコードして書き出します (抽出間隔は無視)。COLMAPの下見用の粗い画像セットを短時間で作成でき、\n  各フレームの実時刻を *_frame_times.json に記録します。\n区間内で最もシャープなフレーム: 縮小した全フレームのシャープネス (ラプラシアン分散) を1回のデコードで計算し、\n  抽出間隔ごとに最もブレの少ないフレームを全視点で書き出します (NumPyが必要)。\n  解析結果は入力動画の隣の *.frame_analysis.json に保存され、次回以降は解析を省略します。\n動きに応じて抽出: 縮小したフレームの差分から動き量を求め、累積がしきい値を超えたときだけ書き出します。\n  立ち止まっている区間の似たフレームが減ります。最小間隔は抽出間隔、最大間隔は右の欄で指定します (NumPyが必要)。",
                 "video_radio_label": "動画 (HEVC/H.265)",
                 "video_radio_tooltip": "HEVC(H.265)コーデックのMP4動画。各視点ごとに動画ファイル作成。",
                 "video_preset_label": "Preset:",
@@ -227,28 +273,58 @@ class UiStrings:
                 "parallel_processes_label": "並列処理数:",
                 "parallel_processes_label_tooltip_format": "同時に処理する視点の数。最大: {cores} (論理コア数)",
                 "parallel_processes_combo_tooltip": "変換処理を並列実行するプロセス数。\nCPUコア数と適用ピッチ角数に応じて調整。",
+                "decode_mode_label": "デコード:",
+                "decode_mode_per_viewpoint": "視点ごと",
+                "decode_mode_per_pitch": "ピッチごと (split)",
+                "decode_mode_group_size": "指定視点数ごと (split)",
+                "decode_mode_single": "1回のみ (split)",
+                "decode_mode_tooltip": "入力動画のデコード方法。\n視点ごと: 視点ごとにFFmpegを起動し、それぞれが動画全体をデコードします。\nピッチごと: 同じピッチ角の視点を1つのFFmpegにまとめ、1回のデコードをsplitフィルターで分配します (デフォルト)。\n指定視点数ごと: 右の「視点/デコード」の数ずつまとめます。\n1回のみ: 1つのFFmpegで1回だけデコードし、全視点へ分配します。\nグループを大きくするとデコード負荷が減り、小さくすると並列度が上がります。",
+                "views_per_decode_label": "視点/デコード:",
+                "views_per_decode_tooltip": "「指定視点数ごと」選択時に、1つのFFmpeg (1回のデコード) で処理する視点数。",
+                "time_segments_label": "時間分割:",
+                "time_segments_tooltip": "入力動画を時間方向にこの数の区間に分け、(視点グループ, 区間) ごとに別タスクで変換します (1 = 分割しない)。\n視点数が少なくてもCPUコア数に応じて並列化できます。各区間は先頭へシークして開始し、\n全体を1回で変換した場合と同じ連番で書き出すため、ファイル名は連続し全カメラで一致します。\nPNG/JPEG出力 (v360) で使用できます。",
+                "auto_plan_label": "自動",
+                "auto_plan_tooltip": "オンにすると、CPUコア数・空きメモリ・入力動画 (解像度/コーデック/長さ)・視点数・出力形式から\n並列数、デコード方式、時間分割を変換開始時に自動で決めます (判断理由はログに表示)。\n同時実行数は少なめから始め、実測の出力フレーム/秒とCPU/IO使用率を見ながら並列数まで増やします。\nオフにすると手動の設定を使い、自動の提案はログに表示のみされます。\n選んだ方針と所要時間は conversion_plan_history.jsonl に記録され、実行同士を比較できます。",
                 "start_button_label": "変換開始",
                 "start_button_tooltip": "設定に基づいて変換処理を開始します。",
+                "estimate_button_label": "見積もり",
+                "estimate_button_tooltip": "変換せずに、現在の設定での出力フレーム数・ディスク使用量・所要時間の見積もりをログに表示します。\n見積もりはこのPCで完了した変換の実測値で補正されます。",
                 "cancel_button_label": "中止",
                 "cancel_button_tooltip": "現在進行中の変換処理を中止します。",
                 "time_label_tooltip": "変換処理の経過時間と推定残り時間を表示します。",
                 "viewpoint_progress_label_tooltip": "処理済みの視点数と総視点数を表示します。",
+                "frame_progress_label_tooltip": "FFmpeg の進捗 (-progress) から集計した書き出し済みフレーム数 (全視点の合計) と予定数、\n実測の出力フレーム/秒、実行中ジョブの平均処理速度 (再生速度比)、最も遅れている視点の進み具合を表示します。",
                 "progressbar_tooltip": "全体の変換処理の進捗状況を示します。",
                 "log_tab_app_log_label": "アプリケーションログ",
                 "log_tab_app_log_tooltip": "アプリケーションの動作ログやエラーメッセージが表示されます。",
                 "log_tab_ffmpeg_log_label": "FFmpeg出力ログ",
                 "log_tab_ffmpeg_log_tooltip": "FFmpegコマンドの生出力が表示されます。詳細な変換状況の確認に利用します。",
+                "open_full_log_button_label": "ログ全文を開く",
+                "open_full_log_tooltip": "表示中のタブのログ全文 (ファイル) を開きます。\nログ欄には新しい行から {max_lines} 行までを表示し、それより古い行はファイルにのみ残ります。",
+                "log_full_log_missing_format": "ログファイルがまだありません: {path}",
+                "log_open_full_log_failed_format": "ログファイルを開けませんでした ({path}): {error}",
+                "ffmpeg_log_verbosity_label": "FFmpegログ:",
+                "ffmpeg_log_verbosity_quiet": "出力しない",
+                "ffmpeg_log_verbosity_errors": "エラーのみ",
+                "ffmpeg_log_verbosity_progress": "エラー+進捗",
+                "ffmpeg_log_verbosity_full": "すべて",
+                "ffmpeg_log_verbosity_tooltip": "変換中のFFmpegの出力のうち、FFmpeg出力ログに送る範囲 (次の変換から適用)。\n出力しない: 何も送りません。\nエラーのみ: エラーの行だけ送ります。\nエラー+進捗: 警告/エラーの行と、FFmpegの実行ごとの進捗の要約1行を送ります (デフォルト)。\nすべて: バナーや統計を含めFFmpegの出力をすべて送ります (従来の動作)。\nどの設定でも、失敗したタスクの直近の警告/エラー行はアプリケーションログに表示されます。",
+                "log_task_error_tail_format": "視点 {index} の失敗前のFFmpeg出力:\n    {lines}",
                 "time_display_elapsed": "経過時間",
                 "time_display_remaining_overall": "全体残り",
                 "time_display_remaining_calculating": "計算中...",
                 "time_display_not_started": "--:--:--",
                 "viewpoint_progress_format": "{completed} / {total} 視点",
+                "frame_progress_format": "{done} / {expected} フレーム | {fps:.1f} fps | 速度 {speed} | 最も遅い視点 {viewpoint}: {viewpoint_done} / {viewpoint_expected}",
                 "viewpoint_progress_status_completed": "変換完了",
                 "viewpoint_progress_status_cancelled": "処理中断",
                 "viewpoint_progress_status_error": "(エラー)",
+                "viewpoint_progress_status_no_frames": "抽出するフレームなし",
+                "viewpoint_progress_status_analysis_failed": "フレーム解析に失敗",
 
                 # --- gui_app.py: Logging & Messages ---
                 "log_ffmpeg_found_format": "FFmpeg: {version_line}",
+                "log_ffmpeg_old_vsync_format": "FFmpeg {version} は 5.1 より古いため、キーフレーム抽出・フレーム解析・重複フレームの除外では -fps_mode の代わりに -vsync passthrough を使います。",
                 "log_ffmpeg_not_found_format": "FFmpegが見つかりません: {path}。 PATHを確認するか、実行ファイルと同じ場所に配置してください。",
                 "log_ffmpeg_error_format": "FFmpeg実行エラー (バージョン確認): {error}",
                 "log_ffmpeg_unexpected_error_format": "FFmpeg確認中に予期せぬエラー: {error}",
@@ -272,10 +348,15 @@ class UiStrings:
                 "validate_error_frame_interval_positive": "フレーム抽出間隔は正の値でなければなりません。",
                 "validate_warning_frame_interval_too_long_format": "フレーム抽出間隔 ({interval:.2f}秒) が動画の総再生時間 ({duration:.2f}秒) を超えています。1フレームのみ抽出される可能性があります。",
                 "validate_error_frame_interval_numeric": "フレーム抽出間隔は数値で入力してください。",
+                "validate_error_motion_numeric": "動きのしきい値と最大間隔は数値で入力してください。",
+                "validate_error_motion_threshold_positive": "動きのしきい値は0より大きい値にしてください。",
+                "validate_error_motion_max_interval_format": "最大間隔は0 (上限なし) か、フレーム抽出間隔 ({interval}秒) 以上にしてください。",
                 "validate_error_jpeg_quality_range": "JPEG品質は1から100の整数でなければなりません。",
                 "validate_error_jpeg_quality_integer": "JPEG品質は整数で入力してください。",
                 "validate_error_video_quality_range": "動画品質(CQ/CRF)は0から51の範囲でなければなりません。",
                 "validate_error_video_quality_integer": "動画品質(CQ/CRF)は整数で入力してください。",
+                "validate_error_views_per_decode_positive": "視点/デコードは正の整数で入力してください。",
+                "validate_error_time_segments_positive": "時間分割は正の整数で入力してください。",
                 "validate_error_resolution_positive": "出力解像度は正の値でなければなりません。",
                 "validate_error_resolution_invalid_numeric": "出力解像度の値が無効です。数値で入力してください。",
                 "validate_error_resolution_general_format": "出力解像度の検証中にエラーが発生しました: {error}",
@@ -311,6 +392,12 @@ class UiStrings:
                 "log_colmap_pipeline_command_exception_format": "COLMAPコマンド例外: {command} ({error})",
                 "log_glomap_pipeline_command_exception_format": "GLOMAPコマンド例外: {command} ({error})",
                 "log_colmap_pipeline_cancelled": "COLMAP処理を中止しました。",
+                "log_colmap_dedup_start_format": "ほぼ同じフレームを確認しています (ハミング距離 {threshold} 以下を除外)...",
+                "log_colmap_dedup_result_format": "{checked}フレーム中{removed}フレームを除外しました。レポート: {report} / 移動先: {removed_dir}",
+                "log_colmap_dedup_failed_format": "重複フレームの確認に失敗しました (除外せずに続行します): {error}",
+                "log_colmap_dedup_numpy_unavailable": "NumPyが見つからないため、重複フレームの除外を省略します。",
+                "log_colmap_dedup_ffmpeg_unavailable": "FFmpegが見つからないため、重複フレームの除外を省略します。",
+                "validate_error_colmap_dedup_threshold": "重複除外の距離は0～64の整数で入力してください。",
                 "log_colmap_pipeline_cancel_requested": "COLMAP処理の中止を要求しました。",
                 "log_colmap_pipeline_completed_format": "COLMAP処理完了。Postshot出力: {path}",
                 "log_colmap_pipeline_sparse_not_found_format": "sparseモデルが見つかりません: {path}",
@@ -349,6 +436,76 @@ class UiStrings:
                 "log_multiprocessing_init_error_format": "並列処理の初期化に失敗しました: {error}",
                 "log_cuda_fallback_all_cpu": "CUDAフォールバックがトリガーされたため、全ての視点をCPUで処理します。",
                 "log_cuda_compatibility_not_confirmed_cpu": "CUDA互換性が明確に確認できなかったため、安全のためCPUで処理します。",
+                "log_decode_groups_format": "{count}視点を{groups}個のデコードグループで変換します (splitフィルター)。",
+                "log_reprojection_numpy_unavailable": "NumPyが見つからないため、再投影はFFmpeg v360で行います。",
+                "log_reprojection_input_size_unknown": "入力動画の解像度が不明なため、再投影はFFmpeg v360で行います。",
+                "log_reprojection_interp_approximated_format": "NumPy LUTは補間 '{interp}' に対応していないため、linear で近似します。",
+                "log_prescale_format": "自動プリスケール: {count}/{total} 視点で入力 {input_width}x{input_height} を最大 {width}x{height} に縮小してから v360 を適用します (解像度の低下: 四隅で最大 {loss:.1f}%, 中心で最大 {center_loss:.1f}%)。",
+                "log_prescale_not_applied_format": "自動プリスケール: 許容低下 {max_loss:g}% では入力 {input_width}x{input_height} を十分に縮小できないため、そのまま v360 を適用します。",
+                "log_prescale_invalid_loss_format": "許容低下の値が無効です。0% (解像度の低下なし) を使用します: {value}",
+                "log_prescale_remap_ignored": "自動プリスケールは FFmpeg v360 でのみ使用できます。NumPy LUT ではプリスケールしません。",
+                "log_reprojection_remap_format": "NumPy LUTで再投影します ({groups}個のデコードグループ、テーブルキャッシュ: {cache_dir})。",
+                "log_frame_sampling_seek_format": "シーク抽出: {count}フレーム ({interval}秒間隔)。",
+                "log_frame_sampling_duration_unknown": "動画の長さが不明なため、fpsフィルターで抽出します。",
+                "log_frame_sampling_keyframes": "キーフレームのみを抽出します (抽出間隔は使用しません)。",
+                "log_time_segments_format": "入力を{segments}個の時間区間に分割して並列に変換します。",
+                "log_time_segments_unsupported": "この出力設定では時間分割を使用できないため、分割せずに変換します (PNG/JPEG出力とv360が必要、キーフレーム抽出は対象外)。",
+                "log_time_segments_duration_unknown": "動画の長さが不明なため、時間分割せずに変換します。",
+                "log_resume_manifest_format": "中断した変換を再開します: 書き出し済みの{skipped}視点をスキップし、残り{remaining}視点の{samples} / {total}フレームを変換します (記録: {path})",
+                "log_resume_manifest_new_format": "再開用の記録: {path}",
+                "log_resume_manifest_error_format": "再開用の記録を読み込めないため、最初から変換します: {error}",
+                "log_incremental_reuse_format": "設定が変わっていない{reused} / {total}視点は前回の出力を再利用し、{converting}視点だけを変換します。",
+                "log_incremental_rig_session_format": "COLMAP Rig: 前回のセッション {prefix} を引き継ぎます (カメラ番号が変わった{moved}視点のフォルダを移動)。",
+                "log_incremental_rig_move_failed_format": "COLMAP Rig: 前回の出力を移動できないため、新しいセッションとしてすべて変換します: {error}",
+                "log_incremental_rig_replaced_format": "COLMAP Rig: 引き継いだセッションのうち、別の視点になったカメラの {count} ファイルを {path} へ移しました (削除はしていません)。",
+                "log_incremental_rig_staging_recovered_format": "COLMAP Rig: 前回途中で止まったフォルダの移動から {count} ファイルを回収し、{path} へ移しました。",
+                "log_incremental_rig_staging_recover_failed_format": "COLMAP Rig: 前回途中で止まったフォルダの移動を回収できませんでした: {error}",
+                "log_incremental_fingerprint_error_format": "出力のフィンガープリントを計算できないため、すべての視点を変換します: {error}",
+                "log_incremental_fingerprint_write_failed_format": "視点 {index} のフィンガープリントを保存できません (次回は再変換されます): {error}",
+                "log_run_cost_estimate_format": "見積もり: 出力 {frames} フレーム (1視点 {per_view} × {views} 視点), ディスク 約 {size}, 所要時間 約 {duration} (並列 {parallel})",
+                "log_run_cost_calibrated_format": "見積もりはこのPCで完了した変換の実測で補正しています (時間: {time_runs} 回, 容量: {bytes_runs} 回)。",
+                "log_run_cost_uncalibrated": "このPCでの実測がまだないため、既定のモデルで見積もっています (変換が完了するたびに補正されます)。",
+                "log_run_cost_free_space_format": "出力先の空き容量: {free}",
+                "log_run_cost_free_space_unknown": "出力先の空き容量を取得できません。容量の確認を省略します。",
+                "log_run_cost_duration_unknown": "動画の長さが分からないため、見積もりを表示できません。",
+                "log_run_cost_failed_format": "見積もりに失敗しました: {error}",
+                "log_run_cost_disk_needed_format": "出力先で新たに必要な容量: 約 {size} (再利用する視点と、同じ名前で上書きされる/再開で使われる既存のファイルを除く)",
+                "log_run_cost_disk_insufficient_format": "出力先で必要な容量の見積もり ({size}) が空き容量 ({free}) を超えています。視点数・解像度・抽出間隔・画質を見直すか、出力先を変更してください。",
+                "log_run_cost_disk_warn_format": "出力先で必要な容量の見積もり ({size}) が空き容量 ({free}) の {percent:.0f}% を超えています。",
+                "log_run_cost_disk_override": "空き容量不足の警告を確認したうえで変換を開始します。",
+                "run_cost_disk_insufficient_title": "空き容量不足",
+                "run_cost_disk_insufficient_message_format": "出力先で必要な容量の見積もり ({size}) が空き容量 ({free}) を超えています。途中で容量が足りなくなると変換は失敗します。\n見積もりが大きすぎると分かっている場合は、このまま開始できます。変換を開始しますか？\n{path}",
+                "run_cost_disk_warn_title": "確認",
+                "run_cost_disk_warn_message_format": "出力先で必要な容量の見積もり ({size}) が空き容量 ({free}) に近くなっています。変換を開始しますか？\n{path}",
+                "log_conversion_plan_format": "並列化の方針 (自動): {strategy} / 並列数 {parallel} / デコード方式 {decode_mode} / 時間分割 {segments} / FFmpegスレッド数 {threads}",
+                "log_conversion_plan_suggested_format": "並列化の方針 (提案、手動設定を使用): {strategy} / 並列数 {parallel} / デコード方式 {decode_mode} / 時間分割 {segments} / FFmpegスレッド数 {threads}",
+                "log_conversion_plan_replaced_format": "並列化の方針 (自動) により {setting} を {old} → {new} に変更しました。",
+                "log_conversion_plan_failed_format": "並列化の方針を決められませんでした。手動設定で変換します: {error}",
+                "log_conversion_plan_record_failed_format": "並列化の方針の履歴を記録できませんでした: {error}",
+                "log_thread_budget_format": "CPUスレッド配分: {cores}スレッドを同時{workers}ジョブで分割 (1ジョブ {threads}スレッド = デコード {decode} / フィルター {filter} / エンコード {encode} (出力1つあたり))。ジョブの終了に合わせて、後から開始するジョブへ空いたスレッドを再配分します。",
+                "log_thread_budget_init_error_format": "CPUスレッド配分を初期化できませんでした。各ワーカーは従来のスレッド数で実行します: {error}",
+                "log_concurrency_adaptive_start_format": "同時実行数の自動調整: {jobs}ジョブから開始し、出力フレーム/秒とCPU使用率を見ながら最大{max_jobs}ジョブまで調整します (実行中のジョブ数が目標にそろっている間だけ計測します)。",
+                "log_concurrency_increase_format": "同時実行数を {previous} → {jobs} に増やします (現在 {fps:.1f} フレーム/秒)。",
+                "log_concurrency_no_gain_format": "ジョブを増やしても速くならなかったため ({fps:.1f} フレーム/秒)、同時実行数を {previous} → {jobs} に戻して固定します。",
+                "log_concurrency_hold_cpu_saturated_format": "CPU使用率が {cpu:.0f}% のため、同時実行数を {jobs} のまま増やしません ({fps:.1f} フレーム/秒)。",
+                "log_concurrency_hold_io_saturated_format": "IO待ちが {io_wait:.0f}% のため (ディスク/ネットワークが飽和)、同時実行数を {jobs} のまま増やしません ({fps:.1f} フレーム/秒)。",
+                "plan_reason_decode_format": "方針: デコード負荷は出力1視点の {ratio:.1f} 倍 ({codec}) のため、デコード方式 {mode} ({jobs} ジョブ) を選びました。",
+                "plan_reason_memory_limit_format": "方針: 空きメモリ {free_gb:.1f} GB (1プロセス約 {process_mb:.0f} MB) のため、並列数を {limit} までに制限します。",
+                "plan_reason_time_slice_unavailable": "方針: この出力設定では時間分割を使えないため、ジョブ数より多くは並列化しません。",
+                "plan_reason_time_slice_too_short_format": "方針: 出力フレーム数 ({samples}) が少ないため、時間分割しません。",
+                "plan_reason_time_slice_format": "方針: ジョブ数 ({jobs}) が使用可能な並列数 ({cores}) より少ないため、時間方向に {segments} 区間へ分割します。",
+                "log_frame_analysis_numpy_unavailable": "NumPyが見つからないため、fpsフィルターで抽出します。",
+                "log_frame_analysis_starting": "フレーム解析を開始します (抽出するフレームの選択)...",
+                "log_frame_analysis_progress_format": "フレーム解析中: {frames}フレーム ({position:.1f}秒)",
+                "log_frame_analysis_cached_format": "保存済みのフレーム解析結果を使用します: {path}",
+                "log_frame_analysis_saved_format": "フレーム解析結果を保存しました: {path}",
+                "log_frame_analysis_selected_format": "{count}フレームを選択しました ({interval}秒ごとの区間)。",
+                "log_frame_analysis_selected_motion_format": "動きに応じて{count}フレームを選択しました (しきい値 {threshold}、間隔 {min_interval}～{max_interval}秒)。",
+                "log_frame_analysis_failed_format": "フレーム解析に失敗しました: {error}",
+                "log_frame_analysis_no_samples": "抽出の条件に合うフレームがなかったため、何も書き出さずに変換を終了します (抽出間隔や動きのしきい値を見直してください)。",
+                "log_frame_sampling_uses_v360": "このフレーム抽出方法はFFmpeg v360で再投影します (NumPy LUTは使用しません)。",
+                "log_frame_server_format": "フレームサーバー: 1回のデコードを共有メモリのリングバッファ ({slots}フレーム、{buffer_mb:.0f} MB) で{workers}個の再投影ワーカーへ配ります。",
+                "log_frame_server_init_error_format": "フレームサーバーのバッファを作成できませんでした ({error})。デコードグループごとにデコードします。",
                 "log_task_completed_format": "視点 {index} 完了。(処理時間: {duration:.2f}秒)",
                 "log_task_cancelled_format": "視点 {index} はキャンセルされました。",
                 "log_task_error_format": "視点 {index} エラー: {error_message}",
@@ -515,6 +672,13 @@ class UiStrings:
                 "interpolation_label": "Interpolation:",
                 "interpolation_label_tooltip": "Image interpolation method. Higher quality tends to increase processing time.",
                 "interpolation_combo_tooltip": "cubic:High quality(recommended), lanczos:Max quality(sharp),\nlinear:Standard, nearest:Fast(low quality).",
+                "reprojection_label": "Reprojection:",
+                "reprojection_v360": "FFmpeg v360",
+                "reprojection_numpy_remap": "NumPy LUT",
+                "reprojection_tooltip": "How each viewpoint is reprojected from the equirectangular input.\nFFmpeg v360: FFmpeg's v360 filter (default).\nNumPy LUT: per-viewpoint lookup tables are computed once and applied to frames decoded once (requires NumPy).\n  Supports nearest / linear interpolation; cubic / lanczos are approximated with linear.",
+                "prescale_check_label": "Auto pre-scale",
+                "prescale_max_loss_label": "Max loss (%):",
+                "prescale_tooltip": "Scale the equirectangular input down to the size the output pixel density needs before v360 (FFmpeg v360 only).\nWith low output resolutions or narrow fields of view this greatly reduces the filter work and memory bandwidth.\nThe needed size comes from the pixels per degree at the corners of each view, where the view's pixels are finest.\nAt 0% max loss the input is only scaled when even the corners keep their full resolution. Higher values allow the corners to lose up to that share of resolution.",
                 "output_mode_label": "Export Mode:",
                 "output_mode_label_tooltip": "Select the output folder layout.",
                 "output_mode_standard_label": "Standard",
@@ -543,6 +707,10 @@ class UiStrings:
                 "colmap_preset_multi_path": "Multi-Path Sync",
                 "colmap_matcher_label": "Matcher:",
                 "colmap_matcher_tooltip": "sequential: for videos. exhaustive: all pairs (slower but connects sessions). vocab_tree: dictionary-based matching for multi-path.",
+                "colmap_dedup_label": "Drop near-duplicate frames",
+                "colmap_dedup_tooltip": "Before feature extraction, compares the perceptual hash (pHash) of each reference camera (cam01) image with the previously kept frame\nand moves near-identical rig frames (all cameras) to colmap_rig/removed_duplicates (nothing is deleted).\nRemoved frames are listed in colmap_rig/duplicate_frames_report.csv. Requires NumPy.",
+                "colmap_dedup_threshold_label": "Distance:",
+                "colmap_dedup_threshold_tooltip": "Maximum Hamming distance (0-64 bits) treated as a duplicate. Higher values remove more frames.",
                 "colmap_vocab_tree_label": "Vocab Tree:",
                 "colmap_vocab_tree_tooltip": "Path to vocab tree dictionary (.bin). Used by vocab_tree matcher/loop detection.",
                 "colmap_vocab_tree_browse_tooltip": "Select a vocab tree dictionary file.",
@@ -583,6 +751,17 @@ class UiStrings:
                 "jpeg_quality_label": "Quality (1-100):",
                 "jpeg_quality_label_tooltip": "JPEG quality (1-100). Higher means better quality/larger file.",
                 "jpeg_quality_entry_tooltip": "JPEG quality (1 low - 100 high). Converted to FFmpeg's 1 high - 31 low scale. Default 90.",
+                "frame_sampling_label": "Frame sampling:",
+                "frame_sampling_fps": "Fixed interval (fps filter)",
+                "frame_sampling_seek": "Fixed interval (seek)",
+                "frame_sampling_keyframes": "Keyframes only (scouting)",
+                "frame_sampling_sharpest": "Sharpest frame per interval",
+                "frame_sampling_motion": "Motion-adaptive (skip still segments)",
+                "motion_threshold_label": "Motion threshold:",
+                "motion_threshold_tooltip": "Motion-adaptive sampling: accumulated motion needed before the next frame is written.\nMotion is the mean brightness difference to the previous frame on a downscaled copy (minus a noise floor), summed up.\nLower values write more frames, higher values fewer.",
+                "motion_max_interval_label": "Max interval (s):",
+                "motion_max_interval_tooltip": "Motion-adaptive sampling: write at least one frame this often even without motion (0 = no limit).\nThe frame extraction interval is used as the minimum interval.",
+                "frame_sampling_tooltip": "How frames are picked for PNG/JPEG output.\nFixed interval (fps filter): decodes every frame and keeps one per interval (default).\nFixed interval (seek): seeks to each target time and decodes only up to that frame.\n  Faster when the interval is long compared to the keyframe spacing (e.g. 1-2 s at 60 fps).\nKeyframes only: decodes and writes keyframes only (the interval is ignored). A quick, coarse image set for a trial COLMAP run;\n  the real timestamp of each frame is recorded in *_frame_times.json.\nSharpest frame per interval: scores every frame (Laplacian variance on a downscaled copy, one decode)\n  and writes the least blurred frame of each interval for all viewpoints (requires NumPy).\n  Scores are saved next to the input as *.frame_analysis.json and reused by later runs.\nMotion-adaptive: measures motion from differences between downscaled frames and writes a frame only once\n  the accumulated motion passes the threshold, so standing-still segments produce few near-identical frames.\n  The extraction interval is the minimum spacing; the maximum is set in the field on the right (requires NumPy).",
                 "video_radio_label": "Video (HEVC/H.265)",
                 "video_radio_tooltip": "MP4 video with HEVC(H.265) codec. Video file for each viewpoint.",
                 "video_preset_label": "Preset:",
@@ -596,28 +775,58 @@ class UiStrings:
                 "parallel_processes_label": "Parallel Processes:",
                 "parallel_processes_label_tooltip_format": "Number of viewpoints to process simultaneously. Max: {cores} (logical cores)",
                 "parallel_processes_combo_tooltip": "Number of processes for parallel conversion.\nAdjust based on CPU cores and number of pitch angles.",
+                "decode_mode_label": "Decode:",
+                "decode_mode_per_viewpoint": "Per viewpoint",
+                "decode_mode_per_pitch": "Per pitch ring (split)",
+                "decode_mode_group_size": "Fixed group size (split)",
+                "decode_mode_single": "Once (split)",
+                "decode_mode_tooltip": "How the input video is decoded.\nPer viewpoint: one FFmpeg per viewpoint, each decoding the whole video.\nPer pitch ring: viewpoints sharing a pitch angle run in one FFmpeg that decodes once and feeds them through a split filter (default).\nFixed group size: groups of 'Views/decode' viewpoints per FFmpeg.\nOnce: a single FFmpeg decodes the video once for every viewpoint.\nLarger groups share more decode work; smaller groups give more parallelism.",
+                "views_per_decode_label": "Views/decode:",
+                "views_per_decode_tooltip": "Number of viewpoints handled by one FFmpeg (one decode) when 'Fixed group size' is selected.",
+                "time_segments_label": "Time segments:",
+                "time_segments_tooltip": "Splits the input duration into this many segments and converts each (viewpoint group, segment) pair as its own task (1 = no split).\nParallelism then scales with CPU cores even with few viewpoints. Each segment seeks to its start and\nwrites the same frame numbers a single full run would, so file names stay continuous and identical across cameras.\nAvailable for PNG/JPEG output (v360).",
+                "auto_plan_label": "Auto",
+                "auto_plan_tooltip": "When on, the parallel process count, decode mode and time segments are chosen at start from\nCPU cores, free memory, the input video (resolution/codec/duration), the viewpoint count and the output format (reasons are logged).\nConcurrency starts low and is raised toward that count while the measured output frames/s keeps improving and CPU/IO are not saturated.\nWhen off, your manual settings are used and the automatic plan is only logged as a suggestion.\nEach run's plan and elapsed time are appended to conversion_plan_history.jsonl so runs can be compared.",
                 "start_button_label": "Start Conversion",
                 "start_button_tooltip": "Start the conversion process based on current settings.",
+                "estimate_button_label": "Estimate",
+                "estimate_button_tooltip": "Log the expected output frames, disk usage and run time for the current settings without converting.\nThe estimate is calibrated from conversions completed on this PC.",
                 "cancel_button_label": "Cancel",
                 "cancel_button_tooltip": "Cancel the ongoing conversion process.",
                 "time_label_tooltip": "Displays elapsed and estimated remaining time for the conversion.",
                 "viewpoint_progress_label_tooltip": "Displays the number of processed viewpoints versus the total.",
+                "frame_progress_label_tooltip": "Output frames written so far (all viewpoints) versus the expected count, taken from FFmpeg's -progress output,\nwith the measured output frames/s, the average speed of the running jobs (relative to playback) and the progress of the viewpoint furthest behind.",
                 "progressbar_tooltip": "Indicates the overall progress of the conversion process.",
                 "log_tab_app_log_label": "Application Log",
                 "log_tab_app_log_tooltip": "Displays application operation logs and error messages.",
                 "log_tab_ffmpeg_log_label": "FFmpeg Output Log",
                 "log_tab_ffmpeg_log_tooltip": "Displays raw output from FFmpeg commands. Useful for detailed troubleshooting.",
+                "open_full_log_button_label": "Open Full Log",
+                "open_full_log_tooltip": "Opens the full log file of the selected tab.\nThe log view keeps only the latest {max_lines} lines; older lines are kept in the file.",
+                "log_full_log_missing_format": "The log file does not exist yet: {path}",
+                "log_open_full_log_failed_format": "Could not open the log file ({path}): {error}",
+                "ffmpeg_log_verbosity_label": "FFmpeg log:",
+                "ffmpeg_log_verbosity_quiet": "Quiet",
+                "ffmpeg_log_verbosity_errors": "Errors only",
+                "ffmpeg_log_verbosity_progress": "Errors + progress",
+                "ffmpeg_log_verbosity_full": "Full",
+                "ffmpeg_log_verbosity_tooltip": "How much FFmpeg output is sent to the FFmpeg Output Log during conversion (applies from the next conversion).\nQuiet: nothing.\nErrors only: error lines only.\nErrors + progress: warning/error lines and one progress summary line per FFmpeg run (default).\nFull: everything FFmpeg prints, including the banner and stats (previous behavior).\nWith any setting, the last warning/error lines of a failed task are shown in the Application Log.",
+                "log_task_error_tail_format": "FFmpeg output before the failure of viewpoint {index}:\n    {lines}",
                 "time_display_elapsed": "Elapsed",
                 "time_display_remaining_overall": "Overall Rem.",
                 "time_display_remaining_calculating": "Calculating...",
                 "time_display_not_started": "--:--:--",
                 "viewpoint_progress_format": "{completed} / {total} Viewpoints",
+                "frame_progress_format": "{done} / {expected} frames | {fps:.1f} fps | speed {speed} | slowest viewpoint {viewpoint}: {viewpoint_done} / {viewpoint_expected}",
                 "viewpoint_progress_status_completed": "Completed",
                 "viewpoint_progress_status_cancelled": "Cancelled",
                 "viewpoint_progress_status_error": "(Error)",
+                "viewpoint_progress_status_no_frames": "No frames selected",
+                "viewpoint_progress_status_analysis_failed": "Frame analysis failed",
 
                 # --- gui_app.py: Logging & Messages ---
                 "log_ffmpeg_found_format": "FFmpeg: {version_line}",
+                "log_ffmpeg_old_vsync_format": "FFmpeg {version} is older than 5.1; keyframe sampling, frame analysis and duplicate frame suppression use -vsync passthrough instead of -fps_mode.",
                 "log_ffmpeg_not_found_format": "FFmpeg not found: {path}. Check PATH or place it in the same directory.",
                 "log_ffmpeg_error_format": "FFmpeg execution error (version check): {error}",
                 "log_ffmpeg_unexpected_error_format": "Unexpected error while checking FFmpeg: {error}",
@@ -641,10 +850,15 @@ class UiStrings:
                 "validate_error_frame_interval_positive": "Frame extraction interval must be a positive value.",
                 "validate_warning_frame_interval_too_long_format": "Frame extraction interval ({interval:.2f}s) exceeds video duration ({duration:.2f}s). Only one frame might be extracted.",
                 "validate_error_frame_interval_numeric": "Frame extraction interval must be a number.",
+                "validate_error_motion_numeric": "Motion threshold and max interval must be numbers.",
+                "validate_error_motion_threshold_positive": "Motion threshold must be greater than 0.",
+                "validate_error_motion_max_interval_format": "Max interval must be 0 (no limit) or at least the frame extraction interval ({interval}s).",
                 "validate_error_jpeg_quality_range": "JPEG quality must be an integer between 1 and 100.",
                 "validate_error_jpeg_quality_integer": "JPEG quality must be an integer.",
                 "validate_error_video_quality_range": "Video quality (CQ/CRF) must be between 0 and 51.",
                 "validate_error_video_quality_integer": "Video quality (CQ/CRF) must be an integer.",
+                "validate_error_views_per_decode_positive": "Views/decode must be a positive integer.",
+                "validate_error_time_segments_positive": "Time segments must be a positive integer.",
                 "validate_error_resolution_positive": "Output resolution must be a positive value.",
                 "validate_error_resolution_invalid_numeric": "Output resolution value is invalid. Please enter a number.",
                 "validate_error_resolution_general_format": "Error validating output resolution: {error}",
@@ -680,6 +894,12 @@ class UiStrings:
                 "log_colmap_pipeline_command_exception_format": "COLMAP command exception: {command} ({error})",
                 "log_glomap_pipeline_command_exception_format": "GLOMAP command exception: {command} ({error})",
                 "log_colmap_pipeline_cancelled": "COLMAP pipeline cancelled.",
+                "log_colmap_dedup_start_format": "Checking for near-duplicate frames (removing Hamming distance <= {threshold})...",
+                "log_colmap_dedup_result_format": "Removed {removed} of {checked} frames. Report: {report} / moved to: {removed_dir}",
+                "log_colmap_dedup_failed_format": "Duplicate frame check failed (continuing without removal): {error}",
+                "log_colmap_dedup_numpy_unavailable": "NumPy was not found; skipping near-duplicate frame removal.",
+                "log_colmap_dedup_ffmpeg_unavailable": "FFmpeg was not found; skipping near-duplicate frame removal.",
+                "validate_error_colmap_dedup_threshold": "Duplicate distance must be an integer from 0 to 64.",
                 "log_colmap_pipeline_cancel_requested": "COLMAP pipeline cancellation requested.",
                 "log_colmap_pipeline_completed_format": "COLMAP pipeline completed. Postshot output: {path}",
                 "log_colmap_pipeline_sparse_not_found_format": "Sparse model not found: {path}",
@@ -718,6 +938,76 @@ class UiStrings:
                 "log_multiprocessing_init_error_format": "Failed to initialize parallel processing: {error}",
                 "log_cuda_fallback_all_cpu": "CUDA fallback triggered. All viewpoints will be processed with CPU.",
                 "log_cuda_compatibility_not_confirmed_cpu": "CUDA compatibility not clearly confirmed. Processing with CPU for safety.",
+                "log_decode_groups_format": "Converting {count} viewpoints in {groups} decode group(s) (split filter).",
+                "log_reprojection_numpy_unavailable": "NumPy was not found; reprojecting with FFmpeg v360 instead.",
+                "log_reprojection_input_size_unknown": "The input video resolution is unknown; reprojecting with FFmpeg v360 instead.",
+                "log_reprojection_interp_approximated_format": "NumPy LUT does not support interpolation '{interp}'; approximating with linear.",
+                "log_prescale_format": "Auto pre-scale: for {count}/{total} viewpoints the {input_width}x{input_height} input is scaled to at most {width}x{height} before v360 (resolution loss: up to {loss:.1f}% at the corners, up to {center_loss:.1f}% at the centre).",
+                "log_prescale_not_applied_format": "Auto pre-scale: at {max_loss:g}% max loss the {input_width}x{input_height} input cannot be reduced enough; v360 uses it as is.",
+                "log_prescale_invalid_loss_format": "Invalid max loss value; using 0% (no resolution loss): {value}",
+                "log_prescale_remap_ignored": "Auto pre-scale is only available with FFmpeg v360. NumPy LUT runs without pre-scaling.",
+                "log_reprojection_remap_format": "Reprojecting with NumPy LUT ({groups} decode group(s), table cache: {cache_dir}).",
+                "log_frame_sampling_seek_format": "Seek sampling: {count} frames ({interval}s interval).",
+                "log_frame_sampling_duration_unknown": "The video duration is unknown; sampling with the fps filter instead.",
+                "log_frame_sampling_keyframes": "Extracting keyframes only (the extraction interval is not used).",
+                "log_time_segments_format": "Splitting the input into {segments} time segments converted in parallel.",
+                "log_time_segments_unsupported": "Time segments are not available for these output settings; converting without splitting (requires PNG/JPEG output with v360, not keyframe sampling).",
+                "log_time_segments_duration_unknown": "Video duration is unknown; converting without time segments.",
+                "log_resume_manifest_format": "Resuming an interrupted conversion: skipping {skipped} finished viewpoints and converting {samples} / {total} frames for the remaining {remaining} (record: {path})",
+                "log_resume_manifest_new_format": "Resume record: {path}",
+                "log_resume_manifest_error_format": "Could not read the resume record; converting from the start: {error}",
+                "log_incremental_reuse_format": "Reusing the previous output of {reused} / {total} unchanged viewpoints; converting {converting}.",
+                "log_incremental_rig_session_format": "COLMAP Rig: continuing the previous session {prefix} (moved the folders of {moved} renumbered viewpoints).",
+                "log_incremental_rig_move_failed_format": "COLMAP Rig: could not move the previous output; converting everything as a new session: {error}",
+                "log_incremental_rig_replaced_format": "COLMAP Rig: moved {count} files of the continued session whose cameras now hold other viewpoints to {path} (nothing was deleted).",
+                "log_incremental_rig_staging_recovered_format": "COLMAP Rig: recovered {count} files from an interrupted folder move of the previous run into {path}.",
+                "log_incremental_rig_staging_recover_failed_format": "COLMAP Rig: could not recover an interrupted folder move of the previous run: {error}",
+                "log_incremental_fingerprint_error_format": "Could not compute output fingerprints; converting every viewpoint: {error}",
+                "log_incremental_fingerprint_write_failed_format": "Could not save the fingerprint of viewpoint {index} (it will be converted again next time): {error}",
+                "log_run_cost_estimate_format": "Estimate: {frames} output frames ({per_view} per viewpoint x {views} viewpoints), about {size} on disk, about {duration} with {parallel} parallel jobs",
+                "log_run_cost_calibrated_format": "The estimate is calibrated from conversions completed on this PC (time: {time_runs} runs, size: {bytes_runs} runs).",
+                "log_run_cost_uncalibrated": "No measured runs on this PC yet; using the default model (it is calibrated after each completed conversion).",
+                "log_run_cost_free_space_format": "Free space on the output drive: {free}",
+                "log_run_cost_free_space_unknown": "Could not read the free space of the output drive. Skipping the space check.",
+                "log_run_cost_duration_unknown": "The video duration is unknown, so no estimate can be shown.",
+                "log_run_cost_failed_format": "Could not estimate the run: {error}",
+                "log_run_cost_disk_needed_format": "New space needed on the output drive: about {size} (reused viewpoints and existing files that are overwritten or kept by a resumed run are excluded)",
+                "log_run_cost_disk_insufficient_format": "The space needed on the output drive ({size}) exceeds its free space ({free}). Reduce the viewpoints, resolution, frame interval or quality, or choose another output folder.",
+                "log_run_cost_disk_warn_format": "The space needed on the output drive ({size}) uses more than {percent:.0f}% of its free space ({free}).",
+                "log_run_cost_disk_override": "Starting the conversion despite the disk space warning.",
+                "run_cost_disk_insufficient_title": "Not Enough Disk Space",
+                "run_cost_disk_insufficient_message_format": "The space needed on the output drive ({size}) exceeds its free space ({free}). The conversion fails if the drive fills up.\nIf you know the estimate is too high, you can start anyway. Start the conversion?\n{path}",
+                "run_cost_disk_warn_title": "Confirm",
+                "run_cost_disk_warn_message_format": "The space needed on the output drive ({size}) is close to its free space ({free}). Start the conversion?\n{path}",
+                "log_conversion_plan_format": "Parallelization plan (auto): {strategy} / {parallel} processes / decode mode {decode_mode} / {segments} time segments / {threads} FFmpeg threads",
+                "log_conversion_plan_suggested_format": "Parallelization plan (suggestion; manual settings are used): {strategy} / {parallel} processes / decode mode {decode_mode} / {segments} time segments / {threads} FFmpeg threads",
+                "log_conversion_plan_replaced_format": "The automatic parallelization plan changed {setting} from {old} to {new}.",
+                "log_conversion_plan_failed_format": "Could not determine a parallelization plan; using manual settings: {error}",
+                "log_conversion_plan_record_failed_format": "Could not record the parallelization plan history: {error}",
+                "log_thread_budget_format": "CPU thread budget: {cores} threads split across {workers} concurrent jobs ({threads} per job = decode {decode} / filter {filter} / encode {encode} per output). Threads freed by finished jobs are given to jobs that start later.",
+                "log_thread_budget_init_error_format": "Could not set up the CPU thread budget; workers use the previous thread count: {error}",
+                "log_concurrency_adaptive_start_format": "Adaptive concurrency: starting with {jobs} jobs and adjusting up to {max_jobs} from the measured output frames/s and CPU usage (measured only while the running job count matches the target).",
+                "log_concurrency_increase_format": "Raising concurrency {previous} -> {jobs} (currently {fps:.1f} frames/s).",
+                "log_concurrency_no_gain_format": "The extra job did not increase throughput ({fps:.1f} frames/s); going back {previous} -> {jobs} and keeping it.",
+                "log_concurrency_hold_cpu_saturated_format": "CPU usage is {cpu:.0f}%; keeping concurrency at {jobs} ({fps:.1f} frames/s).",
+                "log_concurrency_hold_io_saturated_format": "IO wait is {io_wait:.0f}% (disk/network saturated); keeping concurrency at {jobs} ({fps:.1f} frames/s).",
+                "plan_reason_decode_format": "Plan: decoding costs {ratio:.1f}x one output view ({codec}), so decode mode {mode} ({jobs} jobs) was chosen.",
+                "plan_reason_memory_limit_format": "Plan: {free_gb:.1f} GB free memory (about {process_mb:.0f} MB per process) limits parallelism to {limit}.",
+                "plan_reason_time_slice_unavailable": "Plan: time segments are not available for these output settings, so parallelism is limited to the job count.",
+                "plan_reason_time_slice_too_short_format": "Plan: too few output frames ({samples}) to split into time segments.",
+                "plan_reason_time_slice_format": "Plan: fewer jobs ({jobs}) than available parallelism ({cores}), so the input is split into {segments} time segments.",
+                "log_frame_analysis_numpy_unavailable": "NumPy was not found; sampling with the fps filter instead.",
+                "log_frame_analysis_starting": "Analyzing frames to choose which ones to extract...",
+                "log_frame_analysis_progress_format": "Analyzing frames: {frames} frames ({position:.1f}s)",
+                "log_frame_analysis_cached_format": "Using saved frame analysis: {path}",
+                "log_frame_analysis_saved_format": "Frame analysis saved: {path}",
+                "log_frame_analysis_selected_format": "Selected {count} frames ({interval}s windows).",
+                "log_frame_analysis_selected_motion_format": "Selected {count} frames by motion (threshold {threshold}, interval {min_interval}-{max_interval}s).",
+                "log_frame_analysis_failed_format": "Frame analysis failed: {error}",
+                "log_frame_analysis_no_samples": "No frames matched the sampling criteria; the run ends without writing any images (check the extraction interval or motion threshold).",
+                "log_frame_sampling_uses_v360": "This frame sampling mode reprojects with FFmpeg v360 (NumPy LUT is not used).",
+                "log_frame_server_format": "Frame server: one decode feeds {workers} reprojection worker(s) through a shared-memory ring buffer ({slots} frames, {buffer_mb:.0f} MB).",
+                "log_frame_server_init_error_format": "Could not create the frame server buffer ({error}); each decode group decodes the input itself.",
                 "log_task_completed_format": "Viewpoint {index} completed. (Processing time: {duration:.2f}s)",
                 "log_task_cancelled_format": "Viewpoint {index} was cancelled.",
                 "log_task_error_format": "Viewpoint {index} error: {error_message}",
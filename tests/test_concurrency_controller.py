@@ -0,0 +1,81 @@
+# tests/test_concurrency_controller.py
+# 同時実行数の山登り制御: 合成したスループットで目標の同時実行数がどう動くかの確認
+
+import unittest
+
+from concurrency_controller import (
+    CONCURRENCY_REASON_NO_GAIN,
+    CONCURRENCY_REASON_PROBE,
+    AdaptiveConcurrencyController
+)
+
+FRAMES_PER_JOB_PER_SEC = 10.0
+
+
+class _SimulatedPool:
+    # Jobs start immediately when the target rises; after a step down the extra jobs take `drain_sec` to finish.
+    def __init__(self, controller, throughput_for_jobs, drain_sec=0.0):
+        self.controller = controller
+        self.throughput_for_jobs = throughput_for_jobs
+        self.drain_sec = drain_sec
+        self.running = controller.target
+        self.drain_until = None
+        self.frames = 0.0
+        self.decisions = []
+
+    def run(self, seconds, step=0.5):
+        now = 0.0
+        while now < seconds:
+            self.frames += self.throughput_for_jobs(self.running) * step
+            now += step
+            if self.running > self.controller.target and now >= (self.drain_until or 0.0):
+                self.running = self.controller.target
+            decision = self.controller.observe(now, self.frames, running_jobs=self.running)
+            if decision is None:
+                continue
+            self.decisions.append(decision)
+            if decision[0] > self.running:
+                self.running = decision[0]
+            elif decision[0] < self.running:
+                self.drain_until = now + self.drain_sec
+
+
+class AdaptiveConcurrencyControllerTest(unittest.TestCase):
+
+    def test_starts_at_initial_jobs(self):
+        controller = AdaptiveConcurrencyController(8)
+        self.assertEqual(controller.target, 4)
+        self.assertEqual(AdaptiveConcurrencyController(8, initial_jobs=2).target, 2)
+
+    def test_linear_throughput_climbs_to_max_jobs(self):
+        controller = AdaptiveConcurrencyController(8, window_sec=4.0)
+        pool = _SimulatedPool(controller, lambda jobs: jobs * FRAMES_PER_JOB_PER_SEC)
+        pool.run(60.0)
+        self.assertEqual(controller.target, 8)
+        self.assertEqual(controller.ceiling, 8)
+        self.assertEqual([reason for _, reason in pool.decisions], [CONCURRENCY_REASON_PROBE] * 4)
+
+    def test_plateau_stops_one_above_and_goes_back(self):
+        controller = AdaptiveConcurrencyController(8, window_sec=4.0)
+        pool = _SimulatedPool(controller, lambda jobs: min(jobs, 5) * FRAMES_PER_JOB_PER_SEC, drain_sec=6.0)
+        pool.run(120.0)
+        self.assertEqual(controller.target, 5)
+        self.assertEqual(controller.ceiling, 5)
+        self.assertEqual(pool.decisions[-1], (5, CONCURRENCY_REASON_NO_GAIN))
+
+    def test_windows_during_a_transition_are_not_compared(self):
+        # The pool is still running more jobs than the target (e.g. jobs dispatched before a step down).
+        controller = AdaptiveConcurrencyController(8, window_sec=4.0)
+        for second in range(30):
+            self.assertIsNone(controller.observe(float(second), second * 80.0, running_jobs=8))
+        self.assertIsNone(controller.throughput)
+        self.assertEqual(controller.ceiling, 8)
+        # Once the running count matches, a full window is needed before the first decision.
+        self.assertIsNone(controller.observe(30.0, 2400.0, running_jobs=4))
+        self.assertIsNone(controller.observe(33.0, 2520.0, running_jobs=4))
+        self.assertEqual(controller.observe(34.0, 2560.0, running_jobs=4), (5, CONCURRENCY_REASON_PROBE))
+        self.assertAlmostEqual(controller.throughput, 40.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
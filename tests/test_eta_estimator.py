@@ -0,0 +1,82 @@
+# tests/test_eta_estimator.py
+# 残り時間の推定: FrameEtaEstimator の EWMA・実行中ジョブ数による換算と、フレームの進みを測れるまでの平均時間による推定
+
+import math
+import unittest
+
+from eta_estimator import (
+    ETA_RATE_SMOOTHING_SEC,
+    ETA_SMOOTHING_SEC,
+    FrameEtaEstimator,
+    task_average_remaining_seconds
+)
+
+
+class TaskAverageRemainingSecondsTest(unittest.TestCase):
+
+    def test_no_average_yet(self):
+        self.assertIsNone(task_average_remaining_seconds(0.0, 4, 2))
+
+    def test_divides_by_effective_parallelism(self):
+        self.assertAlmostEqual(task_average_remaining_seconds(10.0, 4, 2), 20.0)
+        self.assertAlmostEqual(task_average_remaining_seconds(10.0, 1, 4), 10.0) # Only one job left to run
+
+    def test_finished(self):
+        self.assertEqual(task_average_remaining_seconds(10.0, 0, 2), 0.0)
+
+
+class FrameEtaEstimatorTest(unittest.TestCase):
+
+    def test_first_sample_sets_rate_and_estimate(self):
+        estimator = FrameEtaEstimator(total_frames=1000)
+        self.assertIsNone(estimator.update(0.0, 0, running_jobs=1, concurrency=1, unfinished_jobs=1))
+        self.assertAlmostEqual(estimator.update(1.0, 100, running_jobs=1, concurrency=1, unfinished_jobs=1), 9.0)
+        self.assertAlmostEqual(estimator.frame_rate, 100.0)
+
+    def test_rate_is_smoothed_by_elapsed_time(self):
+        estimator = FrameEtaEstimator(total_frames=10000)
+        estimator.update(0.0, 0, 1, 1, 1)
+        estimator.update(1.0, 100, 1, 1, 1)
+        estimator.update(3.0, 500, 1, 1, 1) # 200 frames/s over 2 seconds
+        weight = 1.0 - math.exp(-2.0 / ETA_RATE_SMOOTHING_SEC)
+        self.assertAlmostEqual(estimator.frame_rate, 100.0 + weight * (200.0 - 100.0))
+
+    def test_estimate_is_smoothed_and_counts_down(self):
+        estimator = FrameEtaEstimator(total_frames=1000)
+        estimator.update(0.0, 0, 1, 1, 1)
+        first = estimator.update(1.0, 100, 1, 1, 1) # 9 s
+        self.assertAlmostEqual(estimator.current(4.0), first - 3.0)
+        second = estimator.update(2.0, 100, 1, 1, 1) # Stalled: the rate drops, the raw estimate rises
+        rate = 100.0 * math.exp(-1.0 / ETA_RATE_SMOOTHING_SEC)
+        previous = first - 1.0
+        expected = previous + (1.0 - math.exp(-1.0 / ETA_SMOOTHING_SEC)) * (900.0 / rate - previous)
+        self.assertAlmostEqual(second, expected)
+
+    def test_rate_is_per_running_job_and_scaled_by_future_parallelism(self):
+        # 4 jobs write 400 frames/s in total, i.e. 100 frames/s each.
+        estimator = FrameEtaEstimator(total_frames=2400)
+        estimator.update(0.0, 0, running_jobs=4, concurrency=4, unfinished_jobs=10)
+        self.assertAlmostEqual(estimator.update(1.0, 400, running_jobs=4, concurrency=4, unfinished_jobs=10), 5.0)
+        # The same measurement when only 2 jobs remain to run: the rest is spread over 2 jobs, not 4.
+        estimator = FrameEtaEstimator(total_frames=2400)
+        estimator.update(0.0, 0, running_jobs=4, concurrency=4, unfinished_jobs=2)
+        self.assertAlmostEqual(estimator.update(1.0, 400, running_jobs=4, concurrency=4, unfinished_jobs=2), 10.0)
+        # A concurrency raised above the running count is expected to add throughput.
+        estimator = FrameEtaEstimator(total_frames=2400)
+        estimator.update(0.0, 0, running_jobs=2, concurrency=4, unfinished_jobs=10)
+        self.assertAlmostEqual(estimator.update(1.0, 200, running_jobs=2, concurrency=4, unfinished_jobs=10), 5.5)
+
+    def test_falls_back_to_task_average_until_frames_arrive(self):
+        # Same order as App.process_mp_queues: the task average is used while the frame estimate is None.
+        estimator = FrameEtaEstimator(total_frames=300)
+        for now in (0.0, 1.0, 2.0, 3.0):
+            remaining = estimator.update(now, 0, running_jobs=2, concurrency=2, unfinished_jobs=3)
+            self.assertIsNone(remaining)
+            if remaining is None:
+                remaining = task_average_remaining_seconds(12.0, 3, 2)
+            self.assertAlmostEqual(remaining, 18.0)
+        self.assertIsNotNone(estimator.update(4.0, 60, running_jobs=2, concurrency=2, unfinished_jobs=3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# tests/test_ffmpeg_worker.py
+# ffmpeg_worker: NumPy リマップバックエンドのフレーム進捗 (PipedFrameProgressTracker と _run_remap_views) の確認
+
+import os
+import queue
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+
+from equirect_remap import is_numpy_available, pad_equirect_frame
+import ffmpeg_worker
+
+FAKE_ENCODER_SCRIPT = """#!{python}
+import sys
+sys.stdin.buffer.read()
+"""
+
+
+class _ListFrameSource:
+    # In-process stand-in for _DecoderFrameSource / _RingFrameSource.
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.output_tail = ffmpeg_worker._new_output_tail() # pylint: disable=protected-access
+
+    def start(self):
+        pass
+
+    def next_frame(self, cancel_event_mp): # pylint: disable=unused-argument
+        return self.frames.pop(0) if self.frames else None
+
+    def release(self):
+        pass
+
+    def stop(self, abandoned): # pylint: disable=unused-argument
+        return None
+
+    def kill(self):
+        pass
+
+
+def _drain(queue_mp):
+    entries = []
+    while not queue_mp.empty():
+        entries.append(queue_mp.get_nowait())
+    return entries
+
+
+class PipedFrameProgressTrackerTest(unittest.TestCase):
+
+    def test_counts_are_sent_per_output(self):
+        progress_queue = queue.Queue()
+        tracker = ffmpeg_worker.PipedFrameProgressTracker(progress_queue, "Remap group 1", [0, 1], frame_rate=30.0)
+        for _ in range(25):
+            tracker.add_frame(0)
+            tracker.add_frame(1)
+        tracker.send(final=True)
+        events = _drain(progress_queue)
+        self.assertEqual(len(events), 1)
+        self.assertEqual((events[0]["viewpoint_indices"], events[0]["frames"]), ([0, 1], 25))
+        self.assertTrue(events[0]["final"])
+
+    def test_views_with_different_counts_are_split(self):
+        progress_queue = queue.Queue()
+        tracker = ffmpeg_worker.PipedFrameProgressTracker(progress_queue, "Remap group 1", [0, 1, 2])
+        for _ in range(5):
+            tracker.add_frame(0)
+            tracker.add_frame(2)
+        tracker.add_frame(1)
+        tracker.send(final=True)
+        events = sorted(_drain(progress_queue), key=lambda event: event["frame"])
+        self.assertEqual([(event["viewpoint_indices"], event["frames"]) for event in events], [([1], 1), ([0, 2], 5)])
+        self.assertTrue(all(event["final"] for event in events))
+
+class RunRemapViewsTest(unittest.TestCase):
+
+    @unittest.skipUnless(is_numpy_available() and os.name == "posix", "needs NumPy and an executable script encoder")
+    def test_remap_views_report_frame_progress(self):
+        import numpy as np # pylint: disable=import-outside-toplevel
+        with tempfile.TemporaryDirectory() as temp_dir:
+            encoder_path = os.path.join(temp_dir, "fake_ffmpeg")
+            with open(encoder_path, "w", encoding="utf-8") as f:
+                f.write(FAKE_ENCODER_SCRIPT.format(python=sys.executable))
+            os.chmod(encoder_path, os.stat(encoder_path).st_mode | stat.S_IXUSR)
+            config = {"ffmpeg_path": encoder_path, "input_file": os.path.join(temp_dir, "input.mp4"),
+                      "output_folder": temp_dir, "output_resolution": (16, 16), "interp": "linear",
+                      "use_cuda": False, "output_format": "png", "output_mode": "standard", "frame_interval": 0,
+                      "png_pred_option": "3", "jpeg_quality": 90, "threads_ffmpeg": 1,
+                      "input_resolution": (64, 32), "input_fps": 30.0}
+            viewpoints = [{"pitch": 0.0, "yaw": 0.0, "fov": 90.0}, {"pitch": 0.0, "yaw": 90.0, "fov": 90.0}]
+            frames = [pad_equirect_frame(np.zeros((32, 64, 3), dtype=np.uint8)) for _ in range(12)]
+            log_queue, progress_queue = queue.Queue(), queue.Queue()
+            ffmpeg_worker._run_remap_views( # pylint: disable=protected-access
+                "Remap group 1", [0, 1], viewpoints, config, _ListFrameSource(frames),
+                log_queue, progress_queue, threading.Event())
+            entries = _drain(progress_queue)
+
+        results = [entry for entry in entries if entry["type"] == "task_result"]
+        self.assertEqual(sorted((entry["viewpoint_index"], entry["success"]) for entry in results),
+                         [(0, True), (1, True)])
+        progress = [entry for entry in entries if entry["type"] == "frame_progress"]
+        self.assertTrue(progress)
+        self.assertEqual(sum(entry["frames"] * len(entry["viewpoint_indices"]) for entry in progress), 24)
+        self.assertTrue(progress[-1]["final"])
+
+
+if __name__ == "__main__":
+    unittest.main()
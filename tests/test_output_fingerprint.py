@@ -0,0 +1,72 @@
+# tests/test_output_fingerprint.py
+# COLMAP Rig のセッション引き継ぎ: 使わなくなったファイルを削除せず replaced_outputs へ移すことの確認
+
+import json
+import os
+import tempfile
+import unittest
+
+from output_fingerprint import (
+    RIG_STAGING_DIR_NAME,
+    RIG_STAGING_MANIFEST_NAME,
+    recover_rig_staging,
+    reuse_rig_session,
+    rig_replaced_dir
+)
+
+SESSION = "input_rig1"
+
+
+class ReuseRigSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory() # pylint: disable=consider-using-with
+        self.rig_dir = os.path.join(self.temp_dir.name, "colmap_rig", "images", "rig1")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, camera_name, name, content):
+        camera_dir = os.path.join(self.rig_dir, camera_name)
+        os.makedirs(camera_dir, exist_ok=True)
+        with open(os.path.join(camera_dir, name), "w", encoding="utf-8") as f:
+            f.write(content)
+        return camera_dir
+
+    def _read(self, *parts):
+        with open(os.path.join(*parts), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_renumbered_cameras_are_swapped_and_unmatched_files_kept(self):
+        cam01 = self._write("cam01", f"{SESSION}_frame_00001.png", "view A")
+        cam02 = self._write("cam02", f"{SESSION}_frame_00001.png", "view B")
+        self._write("cam03", f"{SESSION}_frame_00001.png", "view C")
+        self._write("cam03", "other_frame_00001.png", "other session")
+
+        replaced = reuse_rig_session(self.rig_dir, SESSION, "frame", {cam01: cam02, cam02: cam01})
+
+        self.assertEqual(replaced, 1)
+        self.assertEqual(self._read(cam01, f"{SESSION}_frame_00001.png"), "view B")
+        self.assertEqual(self._read(cam02, f"{SESSION}_frame_00001.png"), "view A")
+        self.assertEqual(self._read(rig_replaced_dir(self.rig_dir), "cam03", f"{SESSION}_frame_00001.png"), "view C")
+        self.assertEqual(self._read(self.rig_dir, "cam03", "other_frame_00001.png"), "other session")
+        self.assertFalse(os.path.exists(os.path.join(self.rig_dir, RIG_STAGING_DIR_NAME)))
+
+    def test_interrupted_staging_is_recovered_into_replaced_outputs(self):
+        stage_dir = os.path.join(self.rig_dir, RIG_STAGING_DIR_NAME, "0")
+        os.makedirs(stage_dir)
+        with open(os.path.join(stage_dir, f"{SESSION}_frame_00001.png"), "w", encoding="utf-8") as f:
+            f.write("staged")
+        with open(os.path.join(self.rig_dir, RIG_STAGING_DIR_NAME, RIG_STAGING_MANIFEST_NAME), "w",
+                  encoding="utf-8") as f:
+            json.dump({"session_prefix": SESSION,
+                       "moves": [["0", os.path.join(self.rig_dir, "cam04"), os.path.join(self.rig_dir, "cam01")]]}, f)
+
+        self.assertEqual(recover_rig_staging(self.rig_dir), 1)
+        self.assertEqual(self._read(rig_replaced_dir(self.rig_dir), "cam04", f"{SESSION}_frame_00001.png"), "staged")
+        self.assertFalse(os.path.exists(os.path.join(self.rig_dir, RIG_STAGING_DIR_NAME)))
+        self.assertEqual(recover_rig_staging(self.rig_dir), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+# tests/test_run_cost_estimator.py
+# 変換開始時の空き容量の確認: 出力先で新たに必要な容量の見積もり
+
+import unittest
+
+from run_cost_estimator import additional_disk_bytes, check_disk_space
+
+
+class AdditionalDiskBytesTest(unittest.TestCase):
+
+    def test_new_outputs_need_their_full_share(self):
+        estimate = {"bytes": 3000.0, "viewpoints": 3}
+        self.assertAlmostEqual(additional_disk_bytes(estimate, [0, 0, 0]), 3000.0)
+
+    def test_reused_viewpoints_are_left_out(self):
+        estimate = {"bytes": 3000.0, "viewpoints": 3}
+        self.assertAlmostEqual(additional_disk_bytes(estimate, [0]), 1000.0)
+
+    def test_existing_files_are_subtracted(self):
+        # Partly written by an interrupted run, and overwritten by a larger earlier output.
+        estimate = {"bytes": 3000.0, "viewpoints": 3}
+        self.assertAlmostEqual(additional_disk_bytes(estimate, [400, 2500, 0]), 600.0 + 0.0 + 1000.0)
+
+    def test_status_uses_the_additional_bytes(self):
+        estimate = {"bytes": 3000.0, "viewpoints": 3}
+        self.assertEqual(check_disk_space(estimate["bytes"], 2000), "insufficient")
+        self.assertEqual(check_disk_space(additional_disk_bytes(estimate, [1000, 1000]), 2000), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
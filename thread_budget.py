@@ -0,0 +1,72 @@
+# thread_budget.py
+# 同時に動く FFmpeg ワーカー間で CPU スレッドを配分するヘルパー
+# 各ジョブの取り分を デコード (-threads, 入力側) / フィルター (-filter_threads) / エンコード (-threads, 出力側) に分けます。
+
+THREAD_BUDGET_DECODE_SHARE = 0.25 # Software decode of the equirect input
+THREAD_BUDGET_FILTER_SHARE = 0.5 # v360 is slice-threaded and is usually the most expensive stage
+# The encoders get the remainder, split across the outputs of a job.
+
+
+def split_thread_budget(threads, output_count=1, use_cuda=False):
+    """
+    1ジョブ分のスレッド数を デコード/フィルター/エンコード (出力1つあたり) に分けます。各値は最低1です。
+
+    Args:
+        threads (int): このジョブに割り当てるスレッド数。
+        output_count (int): このジョブが書き出す出力 (視点) の数。
+        use_cuda (bool): True ならデコードは GPU で行うため、デコード分もフィルターに回します。
+
+    Returns:
+        dict: {"decode", "filter", "encode"} (encode は出力1つあたり)。
+    """
+    threads = max(1, int(threads))
+    decode = 1 if use_cuda else max(1, int(round(threads * THREAD_BUDGET_DECODE_SHARE)))
+    filter_share = THREAD_BUDGET_FILTER_SHARE + (THREAD_BUDGET_DECODE_SHARE if use_cuda else 0.0)
+    filter_threads = max(1, int(round(threads * filter_share)))
+    encode_total = max(1, threads - filter_threads - (0 if use_cuda else decode))
+    encode = max(1, encode_total // max(1, int(output_count)))
+    return {"decode": decode, "filter": filter_threads, "encode": encode}
+
+
+class ThreadBudget:
+    """
+    全ワーカー共通のスレッド予算。Manager の Value/Lock で共有され、Pool の引数としてそのまま渡せます (pickle 可能)。
+
+    ジョブの取り分は 全スレッド数 / 同時実行ジョブ数 で、同時実行ジョブ数は
+    min(並列数, 実行中のジョブ数 + 未開始のジョブ数) です。終盤に未開始のジョブがなくなると分母が減るため、
+    後から開始するジョブ (およびシーク抽出のようにフレームごとに FFmpeg を起動するジョブ) は空いたコアを使えます。
+    並列数は実行中に set_concurrency で変更できます (同時実行数の自動調整)。
+    """
+
+    def __init__(self, manager, total_threads, concurrency, task_count):
+        self.total_threads = max(1, int(total_threads))
+        self.concurrency_value = manager.Value("i", max(1, int(concurrency)))
+        self.active = manager.Value("i", 0)
+        self.pending = manager.Value("i", max(0, int(task_count)))
+        self.lock = manager.Lock()
+
+    @property
+    def concurrency(self):
+        return self.concurrency_value.value
+
+    def set_concurrency(self, concurrency):
+        with self.lock:
+            self.concurrency_value.value = max(1, int(concurrency))
+
+    def start_task(self):
+        with self.lock:
+            self.active.value += 1
+            self.pending.value = max(0, self.pending.value - 1)
+
+    def finish_task(self):
+        with self.lock:
+            self.active.value = max(0, self.active.value - 1)
+
+    def threads_per_job(self):
+        with self.lock:
+            running = self.active.value + self.pending.value
+            concurrency = self.concurrency_value.value
+        return max(1, self.total_threads // max(1, min(concurrency, running)))
+
+    def allocation(self, output_count=1, use_cuda=False):
+        return split_thread_budget(self.threads_per_job(), output_count, use_cuda)
@@ -0,0 +1,53 @@
+# ui_update_bus.py
+# ワーカー/COLMAP スレッドからの UI 更新をまとめて、一定間隔でまとめて反映するためのバス
+# ログはウィジェットごとに溜めて1回の insert で書き込み、進捗表示のような更新は最新の1件だけを残します。
+
+import threading
+
+UI_FLUSH_INTERVAL_MS = 50 # 20 flushes per second
+UI_MAX_TEXT_CHUNKS_PER_FLUSH = 2000 # A flood is spread over several flushes instead of one long insert
+UI_MAX_QUEUE_ENTRIES_PER_POLL = 5000 # Worker log entries read from the multiprocessing queue per poll
+
+
+class UiUpdateBus:
+    """
+    どのスレッドからでも呼べる UI 更新の受け口。実際の反映は Tk のメインスレッドで take() した内容を使って行います。
+
+    append_text(channel, text): channel (ログ欄など) に追記するテキスト。到着順に保持します。
+    post_latest(key, callback, *args): 同じ key の更新は最新のものだけを残し、flush 時に1回だけ呼びます。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.text_chunks = {}
+        self.latest_updates = {}
+
+    def append_text(self, channel, text):
+        with self.lock:
+            self.text_chunks.setdefault(channel, []).append(text)
+
+    def post_latest(self, key, callback, *args):
+        with self.lock:
+            self.latest_updates[key] = (callback, args)
+
+    def take(self, max_chunks=UI_MAX_TEXT_CHUNKS_PER_FLUSH):
+        """
+        溜まっている更新を取り出します。
+
+        Returns:
+            tuple: ({channel: 連結済みテキスト}, [(callback, args), ...])。
+                   1チャンネルあたり max_chunks 件を超える分は次回に残します。
+        """
+        with self.lock:
+            texts = {}
+            for channel, chunks in self.text_chunks.items():
+                if chunks:
+                    texts[channel] = "".join(chunks[:max_chunks])
+                    del chunks[:max_chunks]
+            updates = list(self.latest_updates.values())
+            self.latest_updates.clear()
+        return texts, updates
+
+    def has_pending_text(self):
+        with self.lock:
+            return any(self.text_chunks.values())